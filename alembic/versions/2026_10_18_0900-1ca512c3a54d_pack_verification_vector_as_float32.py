@@ -0,0 +1,97 @@
+"""pack verification vector as float32
+
+Revision ID: 1ca512c3a54d
+Revises: 64d354410cea
+Create Date: 2026-10-18 09:00:00.000000
+
+"""
+from typing import Callable, Sequence, Union
+
+from alembic import op
+import numpy as np
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '1ca512c3a54d'
+down_revision: Union[str, None] = '64d354410cea'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+SCHEMA = 'lebedev_schema'
+TABLE = 'lebedev_user'
+COLUMN = 'verification_vector'
+NEW_COLUMN = 'verification_vector_new'
+BATCH_SIZE = 1000
+VECTOR_DTYPE = np.dtype('<f4')
+
+
+def to_float32(vector) -> bytes:
+    return np.asarray(vector, dtype=VECTOR_DTYPE).tobytes()
+
+
+def to_numeric(packed) -> list[float]:
+    vector = np.frombuffer(packed, dtype=VECTOR_DTYPE)
+    return [round(float(value), 7) for value in vector]
+
+
+def convert(
+    column_type: sa.types.TypeEngine,
+    convert_vector: Callable,
+) -> None:
+    """Перенос векторов в новый столбец пачками по id."""
+    users = sa.table(
+        TABLE,
+        sa.column('id', sa.BigInteger),
+        sa.column(COLUMN),
+        sa.column(NEW_COLUMN, column_type),
+        schema=SCHEMA,
+    )
+    connection = op.get_bind()
+    last_id = None
+    while True:
+        db_request = (
+            sa.select(users.c.id, users.c[COLUMN])
+            .where(users.c[COLUMN].is_not(None))
+            .order_by(users.c.id)
+            .limit(BATCH_SIZE)
+        )
+        if last_id is not None:
+            db_request = db_request.where(users.c.id > last_id)
+        rows = connection.execute(db_request).all()
+        if not rows:
+            return
+
+        connection.execute(
+            sa.update(users)
+            .where(users.c.id == sa.bindparam('user_id'))
+            .values({NEW_COLUMN: sa.bindparam('vector')}),
+            [
+                {'user_id': user_id, 'vector': convert_vector(vector)}
+                for user_id, vector in rows
+            ],
+        )
+        last_id = rows[-1].id
+
+
+def replace_column(
+    column_type: sa.types.TypeEngine,
+    convert_vector: Callable,
+) -> None:
+    op.add_column(
+        TABLE, sa.Column(NEW_COLUMN, column_type, nullable=True),
+        schema=SCHEMA,
+    )
+    convert(column_type, convert_vector)
+    op.drop_column(TABLE, COLUMN, schema=SCHEMA)
+    op.alter_column(TABLE, NEW_COLUMN, new_column_name=COLUMN, schema=SCHEMA)
+
+
+def upgrade() -> None:
+    replace_column(sa.LargeBinary(), to_float32)
+
+
+def downgrade() -> None:
+    replace_column(
+        sa.ARRAY(sa.Numeric(precision=8, scale=7)), to_numeric,
+    )
@@ -0,0 +1,95 @@
+import asyncio
+
+from opentracing import global_tracer
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.auth_service.password_hasher import hash_password, password_hasher
+from app.cache import TTLCache
+from app.config import settings
+from app.db.db_helper import db_helper
+from app.db.queries import (
+    UserCredentials,
+    get_user_credentials,
+    update_password,
+)
+from app.external.prometheus.metrics_updaters import db_query_saved_update
+from app.external.redis_client import get_redis_client
+
+# id и хеш пароля по имени пользователя для повторных входов без БД
+user_credentials: TTLCache[str, UserCredentials] = TTLCache(
+    name='credentials',
+    max_size=settings.credentials_cache_max_size,
+    ttl=settings.credentials_cache_ttl_seconds,
+)
+get_redis_client().invalidator.add_cache(
+    'credentials', user_credentials, str,
+)
+background_tasks: set[asyncio.Task] = set()
+rehashing_users: set[int] = set()
+
+
+async def found_user(
+    username: str,
+    session: AsyncSession,
+) -> UserCredentials | None:
+    """Получение учётных данных пользователя по имени."""
+    with global_tracer().start_active_span('found_user'):
+        return await get_user_credentials(username, session)
+
+
+async def found_user_credentials(
+    username: str,
+    session: AsyncSession,
+) -> UserCredentials | None:
+    """Получение учётных данных пользователя через локальный кеш."""
+    user = user_credentials.get(username)
+    if user is not None:
+        db_query_saved_update('found_user')
+        return user
+
+    user = await found_user(username, session)
+    if user is not None:
+        user_credentials.set(username, user)
+    return user
+
+
+async def invalidate_credentials(username: str) -> None:
+    """Сброс кеша учётных данных пользователя во всех экземплярах."""
+    user_credentials.pop(username)
+    await get_redis_client().invalidator.publish('credentials', username)
+
+
+async def store_rehashed_password(
+    user: UserCredentials,
+    password: str,
+) -> None:
+    """Сохранение хеша пароля с целевой стоимостью и сброс кешей."""
+    hashed_password = await password_hasher.run(
+        hash_password, password, password_hasher.rounds,
+    )
+    async with db_helper.session_factory() as session:
+        await update_password(user.id, hashed_password, session)
+    await invalidate_credentials(user.name)
+
+
+async def rehash_password(user: UserCredentials, password: str) -> None:
+    """Перехеширование пароля с целевой стоимостью."""
+    with global_tracer().start_active_span('rehash_password') as scope:
+        scope.span.set_tag('user_id', str(user.id))
+        try:
+            await store_rehashed_password(user, password)
+        except Exception as ex:
+            scope.span.set_tag('error', str(ex))
+        finally:
+            rehashing_users.discard(user.id)
+
+
+def schedule_rehash(user: UserCredentials, password: str) -> None:
+    """Запуск фонового перехеширования пароля."""
+    if user.id in rehashing_users:
+        return
+
+    rehashing_users.add(user.id)
+    task = asyncio.create_task(rehash_password(user, password))
+    background_tasks.add(task)
+    task.add_done_callback(background_tasks.discard)
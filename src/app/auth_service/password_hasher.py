@@ -0,0 +1,160 @@
+import asyncio
+import time
+from concurrent.futures import (
+    Executor,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+)
+from typing import Any, Callable, TypeVar
+
+import bcrypt
+from fastapi import HTTPException, status
+
+from app.config import settings
+from app.external.prometheus.metrics_updaters import (
+    hash_queue_depth_update,
+    hash_rejected_update,
+    hash_rounds_update,
+    hash_wait_time_update,
+)
+
+ResultT = TypeVar('ResultT')
+
+DEFAULT_ROUNDS = 12
+CALIBRATION_ATTEMPTS = 3
+# Пустая часть, версия, стоимость и соль с хешем
+BCRYPT_HASH_PARTS = 4
+
+executor_types: dict[str, type[Executor]] = {
+    'thread': ThreadPoolExecutor,
+    'process': ProcessPoolExecutor,
+}
+
+
+def measure_hash_time(rounds: int) -> float:
+    """Время вычисления одного хеша с заданной стоимостью."""
+    salt = bcrypt.gensalt(rounds)
+    start_time = time.perf_counter()
+    bcrypt.hashpw(b'calibration', salt)
+    return time.perf_counter() - start_time
+
+
+def hash_password(password: str, rounds: int = DEFAULT_ROUNDS) -> bytes:
+    """Хеширование пароля."""
+    salt = bcrypt.gensalt(rounds)
+    return bcrypt.hashpw(password.encode(), salt)
+
+
+def verify_password(password: str, hashed_password: bytes) -> bool:
+    """Проверка пароля."""
+    return bcrypt.checkpw(password.encode(), hashed_password)
+
+
+def get_password_rounds(hashed_password: bytes) -> int | None:
+    """Получение стоимости bcrypt из сохранённого хеша."""
+    parts = hashed_password.split(b'$')
+    if len(parts) != BCRYPT_HASH_PARTS or not parts[2].isdigit():
+        return None
+    return int(parts[2])
+
+
+def needs_rehash(hashed_password: bytes) -> bool:
+    """Проверка, что стоимость хеша ниже целевой или отличается от hash_rounds.
+
+    Калиброванная стоимость своя на каждом узле, поэтому при ней хеш
+    только усиливается: иначе на узлах разной мощности пароль
+    перехешировался бы при каждом входе.
+    """
+    rounds = get_password_rounds(hashed_password)
+    if rounds is None:
+        return False
+    if settings.hash_rounds is not None:
+        return rounds != settings.hash_rounds
+    return rounds < password_hasher.rounds
+
+
+class PasswordHasher:
+    """Пул для хеширования паролей вне цикла событий."""
+
+    def __init__(
+        self,
+        executor_type: str,
+        max_workers: int,
+        max_queue_size: int,
+        rounds: int | None = None,
+    ) -> None:
+        if executor_type not in executor_types:
+            raise ValueError(f'Unknown hash executor type: {executor_type}')
+
+        self.executor_type = executor_type
+        self.max_workers = max_workers
+        self.max_queue_size = max_queue_size
+        self.pending = 0
+        self.rounds = rounds or DEFAULT_ROUNDS
+        hash_rounds_update(self.rounds)
+        self._slots = asyncio.Semaphore(max_workers)
+        self._executor: Executor | None = None
+
+    @property
+    def executor(self) -> Executor:
+        """Пул потоков или процессов, создаётся при первом обращении."""
+        if self._executor is None:
+            executor_class = executor_types[self.executor_type]
+            self._executor = executor_class(max_workers=self.max_workers)
+        return self._executor
+
+    async def run(self, func: Callable[..., ResultT], *args: Any) -> ResultT:
+        """Выполнение функции в пуле с ограничением очереди."""
+        if self.pending >= self.max_workers + self.max_queue_size:
+            hash_rejected_update()
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail='Too many password hashing requests',
+            )
+
+        self.pending += 1
+        hash_queue_depth_update(self.pending)
+        enqueued_at = time.perf_counter()
+        try:  # noqa: WPS501
+            async with self._slots:
+                hash_wait_time_update(time.perf_counter() - enqueued_at)
+                loop = asyncio.get_running_loop()
+                return await loop.run_in_executor(self.executor, func, *args)
+        finally:
+            self.pending -= 1
+            hash_queue_depth_update(self.pending)
+
+    async def calibrate(
+        self,
+        target_time: float,
+        min_rounds: int,
+        max_rounds: int,
+    ) -> int:
+        """Подбор стоимости bcrypt под бюджет времени на один хеш."""
+        elapsed = min([
+            await self.run(measure_hash_time, min_rounds)
+            for _ in range(CALIBRATION_ATTEMPTS)
+        ])
+        rounds = min_rounds
+        # Каждый следующий раунд удваивает время хеширования
+        while rounds < max_rounds and elapsed * 2 <= target_time:
+            rounds += 1
+            elapsed *= 2
+
+        self.rounds = rounds
+        hash_rounds_update(rounds)
+        return rounds
+
+    def shutdown(self) -> None:
+        """Остановка пула."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+password_hasher = PasswordHasher(
+    executor_type=settings.hash_executor_type,
+    max_workers=settings.hash_max_workers,
+    max_queue_size=settings.hash_max_queue_size,
+    rounds=settings.hash_rounds,
+)
@@ -1,4 +1,8 @@
-from pydantic import BaseModel
+from enum import StrEnum
+
+from pydantic import BaseModel, Field
+
+from app.config import settings
 
 
 class UserSchema(BaseModel):
@@ -6,3 +10,70 @@ class UserSchema(BaseModel):
 
     name: str
     password: str
+
+
+class TokenStatus(StrEnum):
+    """Результат проверки токена."""
+
+    valid = 'valid'
+    expired = 'expired'
+    invalid = 'invalid'
+    not_found = 'not_found'
+
+
+class TokenBatchSchema(BaseModel):
+    """Схема пакетной проверки токенов."""
+
+    user_ids: list[int] = Field(
+        default=[], max_length=settings.check_token_batch_max_size,
+    )
+    tokens: list[str] = Field(
+        default=[], max_length=settings.check_token_batch_max_size,
+    )
+
+
+class TokenBatchResultSchema(BaseModel):
+    """Результат пакетной проверки токенов."""
+
+    users: dict[int, TokenStatus]
+    tokens: list[TokenStatus]
+
+
+class TokenClaimsSchema(BaseModel):
+    """Данные пользователя из проверенного токена."""
+
+    user_id: int
+    username: str
+
+
+class RefreshTokenSchema(BaseModel):
+    """Схема refresh токена."""
+
+    refresh_token: str
+
+
+class TokenPairSchema(BaseModel):
+    """Пара из access и refresh токенов."""
+
+    access_token: str
+    refresh_token: str
+
+
+class SimilarUsersSchema(BaseModel):
+    """Запрос поиска пользователей по вектору верификации."""
+
+    vector: list[float] = Field(min_length=1)
+    limit: int = Field(default=10, ge=1, le=settings.vector_index_max_limit)
+
+
+class SimilarUserSchema(BaseModel):
+    """Пользователь с косинусной близостью вектора к запросу."""
+
+    user_id: int
+    score: float
+
+
+class SimilarUsersResultSchema(BaseModel):
+    """Найденные пользователи по убыванию близости."""
+
+    users: list[SimilarUserSchema]
@@ -0,0 +1,39 @@
+from fastapi import HTTPException, status
+from opentracing import global_tracer
+
+from app.auth_service.schemas import (
+    SimilarUserSchema,
+    SimilarUsersResultSchema,
+    SimilarUsersSchema,
+)
+from app.auth_service.user_vector_index import (
+    IndexNotLoadedError,
+    user_vector_index,
+)
+
+
+async def similar_users_view(
+    query: SimilarUsersSchema,
+) -> SimilarUsersResultSchema:
+    """Поиск пользователей с похожим вектором верификации."""
+    with global_tracer().start_active_span('similar_users_view') as scope:
+        scope.span.set_tag('limit', query.limit)
+        try:
+            found = await user_vector_index.search(query.vector, query.limit)
+        except IndexNotLoadedError:
+            scope.span.set_tag('error', 'Vector index is not loaded')
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail='Vector index is not loaded',
+            )
+        except ValueError as ex:
+            scope.span.set_tag('error', str(ex))
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail=str(ex),
+            )
+
+        return SimilarUsersResultSchema(users=[
+            SimilarUserSchema(user_id=user_id, score=score)
+            for user_id, score in found
+        ])
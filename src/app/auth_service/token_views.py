@@ -0,0 +1,203 @@
+import secrets
+
+from fastapi import Depends, HTTPException, status
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+from jwt import ExpiredSignatureError, InvalidTokenError
+from opentracing import Scope, global_tracer
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.auth_service.schemas import (
+    RefreshTokenSchema,
+    TokenBatchResultSchema,
+    TokenBatchSchema,
+    TokenClaimsSchema,
+    TokenPairSchema,
+    TokenStatus,
+)
+from app.auth_service.views import auth_view, create_and_put_token
+from app.db.queries import UserCredentials, execute_read, existing_user_ids
+from app.external.redis_client import RedisClient, get_redis_client
+from app.jwt_tokens.jwt_process import jwt_decode_cached
+
+bearer_scheme = HTTPBearer()
+# Длина refresh токена в байтах до кодирования
+REFRESH_TOKEN_BYTES = 32
+
+
+async def get_token(
+    user_id: int,
+    redis_client: RedisClient = Depends(get_redis_client),
+):
+    """Получение токена."""
+    with global_tracer().start_active_span('get_token') as scope:
+        # Токен выдаётся только существующему пользователю, поэтому
+        # отдельная проверка пользователя в БД не нужна
+        cashed_token = await redis_client.get_token(user_id)
+
+        if cashed_token is None:
+            scope.span.set_tag('error', 'Token not found')
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail='Token not found',
+            )
+
+        return cashed_token
+
+
+def decode_token(token: str | bytes, scope: Scope) -> dict:
+    """Расшифровка токена с ошибкой 401 для невалидных токенов."""
+    try:
+        return jwt_decode_cached(token)
+    except ExpiredSignatureError:
+        scope.span.set_tag('error', 'token expired')
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail='token expired',
+        )
+    except InvalidTokenError:
+        scope.span.set_tag('error', 'invalid token')
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail='invalid token',
+        )
+
+
+async def validate_token(token: str = Depends(get_token)) -> None:
+    """Валидация токена."""
+    with global_tracer().start_active_span('validate_token') as scope:
+        decode_token(token, scope)
+
+
+async def validate_bearer_token(
+    credentials: HTTPAuthorizationCredentials = Depends(bearer_scheme),
+) -> TokenClaimsSchema:
+    """Локальная проверка токена по публичному ключу без обращения к БД."""
+    with global_tracer().start_active_span('validate_bearer_token') as scope:
+        claims = decode_token(credentials.credentials, scope)
+        user_id = claims.get('sub')
+        username = claims.get('username')
+        if not isinstance(user_id, str) or not user_id.isdigit():
+            scope.span.set_tag('error', 'no user id in token')
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail='invalid token',
+            )
+        if not isinstance(username, str):
+            scope.span.set_tag('error', 'no username in token')
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail='invalid token',
+            )
+
+        return TokenClaimsSchema(user_id=int(user_id), username=username)
+
+
+async def found_user_ids(user_ids: list[int], session: AsyncSession) -> set:
+    """Получение id существующих пользователей одним запросом."""
+    with global_tracer().start_active_span('found_user_ids'):
+        rows = await execute_read(
+            session,
+            existing_user_ids,
+            {'user_ids': user_ids},
+            min_rows=len(set(user_ids)),
+        )
+        return {row.id for row in rows}
+
+
+def check_token_status(token: str | bytes) -> TokenStatus:
+    """Проверка токена без исключений."""
+    try:
+        jwt_decode_cached(token)
+    except ExpiredSignatureError:
+        return TokenStatus.expired
+    except InvalidTokenError:
+        return TokenStatus.invalid
+    return TokenStatus.valid
+
+
+async def check_tokens_view(
+    batch: TokenBatchSchema,
+    redis_client: RedisClient,
+    session: AsyncSession,
+) -> TokenBatchResultSchema:
+    """Пакетная проверка токенов."""
+    with global_tracer().start_active_span('check_tokens_view') as scope:
+        user_ids = list(dict.fromkeys(batch.user_ids))
+        scope.span.set_tag('users_count', len(user_ids))
+        scope.span.set_tag('tokens_count', len(batch.tokens))
+
+        tokens = {}
+        if user_ids:
+            existing_ids = await found_user_ids(user_ids, session)
+            tokens = await redis_client.get_tokens(
+                [user_id for user_id in user_ids if user_id in existing_ids],
+            )
+
+        users = {
+            user_id: (
+                TokenStatus.not_found if user_id not in tokens
+                else check_token_status(tokens[user_id])
+            )
+            for user_id in user_ids
+        }
+        return TokenBatchResultSchema(
+            users=users,
+            tokens=[check_token_status(token) for token in batch.tokens],
+        )
+
+
+async def create_refresh_token(
+    user: UserCredentials,
+    redis_client: RedisClient,
+) -> str:
+    """Создание refresh токена."""
+    refresh_token = secrets.token_urlsafe(REFRESH_TOKEN_BYTES)
+    await redis_client.set_refresh_token(refresh_token, user.id, user.name)
+    return refresh_token
+
+
+async def token_pair_view(
+    user: UserCredentials,
+    redis_client: RedisClient,
+) -> TokenPairSchema:
+    """Выдача access и refresh токенов после проверки пароля."""
+    with global_tracer().start_active_span('token_pair_view') as scope:
+        scope.span.set_tag('user_id', str(user.id))
+        return TokenPairSchema(
+            access_token=await auth_view(user, redis_client),
+            refresh_token=await create_refresh_token(user, redis_client),
+        )
+
+
+async def refresh_view(
+    refresh_in: RefreshTokenSchema,
+    redis_client: RedisClient,
+) -> TokenPairSchema:
+    """Обновление токенов по refresh токену без проверки пароля."""
+    with global_tracer().start_active_span('refresh_view') as scope:
+        user_data = await redis_client.pop_refresh_token(
+            refresh_in.refresh_token,
+        )
+        if user_data is None:
+            scope.span.set_tag('error', 'Refresh token not found')
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail='invalid refresh token',
+            )
+
+        user_id, username = user_data
+        scope.span.set_tag('user_id', str(user_id))
+        user = UserCredentials(user_id, username)
+        return TokenPairSchema(
+            access_token=await create_and_put_token(user, redis_client),
+            refresh_token=await create_refresh_token(user, redis_client),
+        )
+
+
+async def revoke_view(
+    refresh_in: RefreshTokenSchema,
+    redis_client: RedisClient,
+) -> None:
+    """Отзыв refresh токена."""
+    with global_tracer().start_active_span('revoke_view'):
+        await redis_client.delete_refresh_token(refresh_in.refresh_token)
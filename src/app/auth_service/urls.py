@@ -1,17 +1,32 @@
 from fastapi import APIRouter, Depends, UploadFile, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.auth_service.schemas import UserSchema
-from app.auth_service.views import (
-    auth_view,
-    register_view,
-    validate_auth_user,
+from app.auth_service.schemas import (
+    RefreshTokenSchema,
+    SimilarUsersResultSchema,
+    SimilarUsersSchema,
+    TokenBatchResultSchema,
+    TokenBatchSchema,
+    TokenClaimsSchema,
+    TokenPairSchema,
+    UserSchema,
+)
+from app.auth_service.similar_users import similar_users_view
+from app.auth_service.token_views import (
+    check_tokens_view,
+    refresh_view,
+    revoke_view,
+    token_pair_view,
+    validate_bearer_token,
     validate_token,
 )
+from app.auth_service.views import auth_view, register_view, validate_auth_user
 from app.db.db_helper import db_helper
-from app.db.models import User
+from app.db.queries import UserCredentials
 from app.external.kafka import verify_view
 from app.external.redis_client import RedisClient, get_redis_client
+from app.jwt_tokens.jwks import get_jwks
+from app.photo_storage import PhotoStorage, get_photo_storage
 
 router = APIRouter(tags=['users'])
 
@@ -43,13 +58,49 @@ async def register(
     status_code=status.HTTP_201_CREATED,
 )
 async def auth(
-    user_in: User = Depends(validate_auth_user),
+    user_in: UserCredentials = Depends(validate_auth_user),
     redis_client: RedisClient = Depends(get_redis_client),
 ) -> str:
     """Авторизация пользователя."""
     return await auth_view(user_in, redis_client)
 
 
+@router.post(
+    '/token/',
+    status_code=status.HTTP_201_CREATED,
+)
+async def token(
+    user_in: UserCredentials = Depends(validate_auth_user),
+    redis_client: RedisClient = Depends(get_redis_client),
+) -> TokenPairSchema:
+    """Авторизация пользователя с выдачей refresh токена."""
+    return await token_pair_view(user_in, redis_client)
+
+
+@router.post(
+    '/refresh/',
+    status_code=status.HTTP_201_CREATED,
+)
+async def refresh(
+    refresh_in: RefreshTokenSchema,
+    redis_client: RedisClient = Depends(get_redis_client),
+) -> TokenPairSchema:
+    """Обновление токенов по refresh токену."""
+    return await refresh_view(refresh_in, redis_client)
+
+
+@router.post(
+    '/revoke/',
+    status_code=status.HTTP_204_NO_CONTENT,
+)
+async def revoke(
+    refresh_in: RefreshTokenSchema,
+    redis_client: RedisClient = Depends(get_redis_client),
+) -> None:
+    """Отзыв refresh токена."""
+    await revoke_view(refresh_in, redis_client)
+
+
 @router.get(
     '/check_token/',
     status_code=status.HTTP_200_OK,
@@ -60,10 +111,56 @@ async def check_token(user_id: int) -> None:
     return None
 
 
+@router.get(
+    '/check_bearer_token/',
+    status_code=status.HTTP_200_OK,
+)
+async def check_bearer_token(
+    claims: TokenClaimsSchema = Depends(validate_bearer_token),
+) -> TokenClaimsSchema:
+    """Локальная проверка токена из заголовка Authorization."""
+    return claims
+
+
+@router.get(
+    '/.well-known/jwks.json',
+    status_code=status.HTTP_200_OK,
+)
+async def jwks() -> dict:
+    """Публичные ключи для проверки токенов."""
+    return get_jwks()
+
+
+@router.post(
+    '/check_tokens/',
+    status_code=status.HTTP_200_OK,
+)
+async def check_tokens(
+    batch: TokenBatchSchema,
+    redis_client: RedisClient = Depends(get_redis_client),
+    session: AsyncSession = Depends(db_helper.scoped_session_dependency),
+) -> TokenBatchResultSchema:
+    """Пакетная проверка токенов."""
+    return await check_tokens_view(batch, redis_client, session)
+
+
 @router.post(
     '/verify/',
     status_code=status.HTTP_201_CREATED,
 )
-async def verify(user_photo: UploadFile, user_id: int) -> dict:
+async def verify(
+    user_photo: UploadFile,
+    user_id: int,
+    storage: PhotoStorage = Depends(get_photo_storage),
+) -> dict:
     """Подтверждение пользователя."""
-    return await verify_view(user_photo, user_id)
+    return await verify_view(user_photo, user_id, storage)
+
+
+@router.post(
+    '/similar_users/',
+    status_code=status.HTTP_200_OK,
+)
+async def similar_users(query: SimilarUsersSchema) -> SimilarUsersResultSchema:
+    """Поиск пользователей по вектору верификации."""
+    return await similar_users_view(query)
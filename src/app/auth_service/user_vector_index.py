@@ -0,0 +1,196 @@
+import asyncio
+import time
+
+import numpy as np
+from opentracing import global_tracer
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+
+from app.auth_service.user_vector_store import UserVectorStore
+from app.backoff import Backoff
+from app.config import settings
+from app.db.models import User
+from app.external.prometheus.metrics_updaters import (
+    vector_index_size_update,
+    vector_search_time_update,
+)
+from app.vector_index import BruteForceIndex, LockedIndex
+
+# Ключ изменённых в транзакции векторов в Session.info
+VECTOR_UPDATES = 'vector_updates'
+
+
+class IndexNotLoadedError(Exception):
+    """Индекс ещё не загружен."""
+
+
+def update_size_metric(index: LockedIndex | None) -> None:
+    """Обновление метрики размера индекса."""
+    if index is not None:
+        vector_index_size_update(index.kind, len(index))
+
+
+class UserVectorIndex:
+    """Индекс векторов верификации пользователей для поиска похожих.
+
+    Индекс загружается из store, после загрузки сверка с БД повторяется
+    каждые refresh_interval секунд, так в индекс попадают векторы,
+    записанные другими сервисами. Векторы, записанные через ORM сессии
+    сервиса, попадают в индекс сразу после коммита, в том числе во время
+    загрузки. Замена уже проиндексированного вектора другими сервисами
+    видна только после перестроения.
+    """
+
+    def __init__(
+        self,
+        store: UserVectorStore,
+        backoff: Backoff = Backoff(
+            settings.vector_index_retry_min_seconds,
+            settings.vector_index_retry_max_seconds,
+        ),
+        refresh_interval: float = settings.vector_index_refresh_seconds,
+    ) -> None:
+        self.store = store
+        self.backoff = backoff
+        self.refresh_interval = refresh_interval
+        self.index: LockedIndex | None = None
+        self.is_loaded = False
+        self._is_loading = False
+        self._pending: dict[int, np.ndarray | None] = {}
+        self._loader: asyncio.Task | None = None
+
+    def start_loading(self) -> None:
+        """Фоновая загрузка индекса и периодическая сверка с БД."""
+        if self._loader is None:
+            self._loader = asyncio.create_task(keep_refreshed(self))
+
+    async def stop(self) -> None:
+        """Остановка сверки и сохранение индекса для быстрого запуска."""
+        if self._loader is not None:
+            self._loader.cancel()
+            self._loader = None
+        if self.index is not None:
+            await asyncio.to_thread(self.index.save, self.store.path)
+
+    async def load(self) -> None:
+        """Загрузка индекса, при ошибке повтор с растущей задержкой."""
+        self._is_loading = True
+        attempts = 0
+        while True:
+            tracer = global_tracer()
+            with tracer.start_active_span('vector_index_load') as scope:
+                try:
+                    index = await self.store.read_or_build(scope)
+                except Exception as ex:
+                    scope.span.set_tag('error', str(ex))
+                    scope.span.set_tag('attempt', attempts)
+                else:
+                    break
+            await asyncio.sleep(self.backoff.get_delay(attempts))
+            attempts += 1
+
+        self._is_loading = False
+        self.index = index
+        self.is_loaded = True
+        pending = self._pending
+        self._pending = {}
+        for user_id, vector in pending.items():
+            self.update(user_id, vector)
+        update_size_metric(self.index)
+
+    async def refresh(self) -> None:
+        """Сверка загруженного индекса с БД."""
+        tracer = global_tracer()
+        with tracer.start_active_span('vector_index_refresh') as scope:
+            try:
+                index = await self.store.refresh(self.index, scope)
+            except Exception as ex:
+                scope.span.set_tag('error', str(ex))
+            else:
+                # Пока индекс строился, его мог создать update
+                if self.index is None:
+                    self.index = index
+        update_size_metric(self.index)
+
+    def update(self, user_id: int, vector: np.ndarray | None) -> None:
+        """Добавление, замена или удаление вектора пользователя."""
+        if self._is_loading:
+            self._pending[user_id] = vector
+            return
+        if not self.is_loaded:
+            return
+
+        if self.index is None and vector is not None:
+            self.index = LockedIndex(BruteForceIndex(len(vector)))
+        if self.index is None:
+            return
+        if vector is None:
+            self.index.remove(user_id)
+        elif len(vector) == self.index.dimension:
+            self.index.add(user_id, vector)
+        update_size_metric(self.index)
+
+    async def search(
+        self,
+        vector: list[float],
+        limit: int,
+    ) -> list[tuple[int, float]]:
+        """Поиск limit пользователей с наиболее похожими векторами."""
+        if not self.is_loaded:
+            raise IndexNotLoadedError
+        index = self.index
+        if index is None:
+            return []
+        if len(vector) != index.dimension:
+            raise ValueError(
+                f'Vector dimension must be {index.dimension}',
+            )
+
+        start_time = time.perf_counter()
+        # Перемножение матриц numpy отпускает GIL
+        found = await asyncio.to_thread(index.search, np.array(vector), limit)
+        vector_search_time_update(
+            index.kind, time.perf_counter() - start_time,
+        )
+        return found
+
+
+async def keep_refreshed(vector_index: UserVectorIndex) -> None:
+    """Загрузка индекса, затем сверка с БД до отмены задачи."""
+    await vector_index.load()
+    while True:  # noqa: WPS457
+        await asyncio.sleep(vector_index.refresh_interval)
+        await vector_index.refresh()
+
+
+user_vector_index = UserVectorIndex(
+    UserVectorStore(settings.vector_index_path),
+)
+
+
+@event.listens_for(Session, 'after_flush')
+def collect_vector_updates(session: Session, flush_context) -> None:
+    """Запоминание изменённых векторов до коммита транзакции."""
+    updates = session.info.setdefault(VECTOR_UPDATES, {})
+    for user in session.new | session.dirty:
+        if not isinstance(user, User):
+            continue
+        history = inspect(user).attrs.verification_vector.history
+        if history.added:
+            updates[user.id] = history.added[0]
+    for deleted in session.deleted:
+        if isinstance(deleted, User):
+            updates[deleted.id] = None
+
+
+@event.listens_for(Session, 'after_commit')
+def apply_vector_updates(session: Session) -> None:
+    """Обновление индекса векторами из закоммиченной транзакции."""
+    for user_id, vector in session.info.pop(VECTOR_UPDATES, {}).items():
+        user_vector_index.update(user_id, vector)
+
+
+@event.listens_for(Session, 'after_soft_rollback')
+def discard_vector_updates(session: Session, previous_transaction) -> None:
+    """Сброс векторов отменённой транзакции."""
+    session.info.pop(VECTOR_UPDATES, None)
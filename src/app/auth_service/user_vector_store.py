@@ -0,0 +1,137 @@
+import asyncio
+from pathlib import Path
+from typing import AsyncIterator
+
+import numpy as np
+from opentracing import Scope
+from sqlalchemy import Row, Select, select
+
+from app.config import settings
+from app.db.db_helper import db_helper
+from app.db.models import User
+from app.db.sharding import split_by_shard
+from app.external.prometheus.metrics_updaters import (
+    vector_index_skipped_update,
+)
+from app.vector_index import (
+    ID_DTYPE,
+    LockedIndex,
+    build_index,
+    load_fresh_index,
+)
+
+LOAD_BATCH_SIZE = 10000
+
+
+class UserVectorStore:
+    """Источники индекса векторов: сохранённый файл и таблица пользователей.
+
+    Индекс из файла сверяется с таблицей по id: векторы новых
+    пользователей добавляются, удалённые убираются. Файл старше max_age
+    и отсутствующий файл приводят к построению индекса по таблице.
+    Векторы другой размерности пропускаются.
+    """
+
+    def __init__(  # noqa: WPS211
+        self,
+        path: Path,
+        ivf_threshold: int = settings.vector_index_ivf_threshold,
+        ivf_lists: int | None = settings.vector_index_ivf_lists,
+        ivf_probes: int = settings.vector_index_ivf_probes,
+        max_age: float = settings.vector_index_max_age_seconds,
+    ) -> None:
+        self.path = path
+        self.ivf_threshold = ivf_threshold
+        self.ivf_lists = ivf_lists
+        self.ivf_probes = ivf_probes
+        self.max_age = max_age
+
+    async def read_or_build(self, scope: Scope) -> LockedIndex | None:
+        """Индекс из файла, сверенный с БД, а без файла построенный по БД."""
+        index = await asyncio.to_thread(
+            load_fresh_index, self.path, self.max_age,
+        )
+        if index is None:
+            scope.span.set_tag('info', 'No fresh saved index, building')
+            return await self.build(scope)
+
+        locked_index = LockedIndex(index)
+        await self.reconcile(locked_index)
+        return locked_index
+
+    async def refresh(
+        self,
+        index: LockedIndex | None,
+        scope: Scope,
+    ) -> LockedIndex | None:
+        """Сверка индекса с БД, а без индекса построение по БД."""
+        if index is None:
+            return await self.build(scope)
+        await self.reconcile(index)
+        return index
+
+    async def build(self, scope: Scope) -> LockedIndex | None:
+        """Построение индекса по векторам преобладающей размерности в БД."""
+        db_request = select(User.id, User.verification_vector).where(
+            User.verification_vector.is_not(None),
+        )
+        rows = [row async for row in self.stream_rows(db_request)]
+        if not rows:
+            return None
+
+        # Строки другой размерности не должны ломать весь индекс
+        dimensions = np.array([len(vector) for _, vector in rows])
+        dimension = int(np.bincount(dimensions).argmax())
+        skipped = int(np.count_nonzero(dimensions != dimension))
+        if skipped:
+            scope.span.set_tag('skipped', skipped)
+            vector_index_skipped_update(skipped)
+            rows = [row for row in rows if len(row[1]) == dimension]
+
+        index = await asyncio.to_thread(
+            build_index,
+            np.array([user_id for user_id, _ in rows], dtype=ID_DTYPE),
+            np.stack([vector for _, vector in rows]),
+            self.ivf_threshold,
+            self.ivf_lists,
+            self.ivf_probes,
+        )
+        return LockedIndex(index)
+
+    async def reconcile(self, index: LockedIndex) -> None:
+        """Сверка id индекса с БД: добавление новых и удаление лишних."""
+        db_request = select(User.id).where(
+            User.verification_vector.is_not(None),
+        )
+        db_ids = {row[0] async for row in self.stream_rows(db_request)}
+        # Индекс меняется только в цикле событий, копия id не нужна
+        index_ids = set(index.index.ids.tolist())
+        for removed_id in index_ids - db_ids:
+            index.remove(removed_id)
+
+        skipped = 0
+        missing_ids = sorted(db_ids - index_ids)
+        for start in range(0, len(missing_ids), LOAD_BATCH_SIZE):
+            batch = missing_ids[start:start + LOAD_BATCH_SIZE]
+            db_request = select(User.id, User.verification_vector).where(
+                User.id.in_(batch),
+                User.verification_vector.is_not(None),
+            )
+            async for user_id, vector in self.stream_rows(db_request):
+                if len(vector) == index.dimension:
+                    index.add(user_id, vector)
+                else:
+                    skipped += 1
+        if skipped:
+            vector_index_skipped_update(skipped)
+
+    async def stream_rows(self, db_request: Select) -> AsyncIterator[Row]:
+        """Строки запроса со всех шардов пачками."""
+        async with db_helper.session_factory() as session:
+            db_request = db_request.execution_options(
+                yield_per=LOAD_BATCH_SIZE,
+            )
+            for shard_request in split_by_shard(db_request, session):
+                rows = await session.stream(shard_request)
+                async for row in rows:
+                    yield row
@@ -0,0 +1,155 @@
+import asyncio
+
+from opentracing import global_tracer
+from redis.exceptions import RedisError
+from sqlalchemy import Select, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.bloom_filter import BloomFilter
+from app.config import settings
+from app.db.db_helper import db_helper
+from app.db.models import User
+from app.db.sharding import split_by_shard
+from app.external.prometheus.metrics_updaters import (
+    username_filter_miss_update,
+    username_filter_update,
+)
+from app.external.redis_client import RedisBitmap, redis_client
+
+LOAD_BATCH_SIZE = 10000
+# Бит после битов фильтра, отмечает ключ, заполненный из БД целиком
+COMPLETE_MARKER = b'\x80'
+
+
+async def add_usernames(
+    bloom: BloomFilter,
+    session: AsyncSession,
+    shard_request: Select,
+) -> None:
+    """Добавление в фильтр имён из одного шарда."""
+    usernames = await session.stream_scalars(shard_request)
+    async for username in usernames:
+        bloom.add(username)
+
+
+async def fill_filter(
+    bloom: BloomFilter,
+    shared_client: RedisBitmap | None,
+    redis_key: str,
+) -> None:
+    """Заполнение фильтра именами из БД и объединение с общим фильтром."""
+    async with db_helper.session_factory() as session:
+        db_request = select(User.name).execution_options(
+            yield_per=LOAD_BATCH_SIZE,
+        )
+        for shard_request in split_by_shard(db_request, session):
+            await add_usernames(bloom, session, shard_request)
+
+    if shared_client is not None:
+        await shared_client.merge_bits(
+            redis_key, bytes(bloom.bits) + COMPLETE_MARKER,
+        )
+
+
+class UsernameFilter:
+    """Фильтр Блума зарегистрированных имён пользователей.
+
+    До окончания загрузки из БД фильтр отвечает, что имя может
+    существовать, и запросы идут в БД как обычно. Общий фильтр в Redis
+    используется, только если в нём стоит отметка о полной загрузке:
+    ключ, вытесненный и заново созданный отдельными set_bits, содержит
+    не все имена и перестраивается из БД.
+    """
+
+    def __init__(
+        self,
+        bloom: BloomFilter,
+        shared_client: RedisBitmap | None = None,
+        redis_key: str = settings.username_filter_redis_key,
+    ) -> None:
+        self.bloom = bloom
+        self.shared_client = shared_client
+        # Параметры фильтра в ключе, чтобы разные настройки не смешивались
+        self.redis_key = f'{redis_key}:{bloom.size}:{bloom.hash_count}'
+        self.complete_position = len(bloom.bits) * 8
+        self.is_loaded = False
+        self._loader: asyncio.Task | None = None
+        self._rebuilder: asyncio.Task | None = None
+
+    def start_loading(self) -> None:
+        """Фоновая загрузка имён пользователей из БД."""
+        if self._loader is None:
+            self._loader = asyncio.create_task(self.load())
+
+    def start_rebuilding(self) -> None:
+        """Фоновое перестроение общего фильтра, если оно ещё не идёт."""
+        if self._rebuilder is None or self._rebuilder.done():
+            self._rebuilder = asyncio.create_task(self.load())
+
+    async def load(self) -> None:
+        """Заполнение фильтра именами из таблицы пользователей."""
+        tracer = global_tracer()
+        with tracer.start_active_span('username_filter_load') as scope:
+            try:
+                await fill_filter(
+                    self.bloom, self.shared_client, self.redis_key,
+                )
+            except Exception as ex:
+                scope.span.set_tag('error', str(ex))
+                return
+
+            self.is_loaded = True
+            self.update_metrics()
+
+    async def might_exist(self, username: str, operation: str) -> bool:
+        """Проверка имени, False только если имя точно не занято."""
+        if not self.is_loaded or username in self.bloom:
+            return True
+
+        # Имя могло быть зарегистрировано другим экземпляром сервиса
+        if self.shared_client is not None:
+            try:
+                bits = await self.shared_client.get_bits(
+                    self.redis_key,
+                    [*self.bloom.positions(username), self.complete_position],
+                )
+            except RedisError:
+                return True
+            if bits is None or not bits[-1]:
+                self.start_rebuilding()
+                return True
+            if all(bits):
+                return True
+
+        username_filter_miss_update(operation)
+        return False
+
+    async def add(self, username: str) -> None:
+        """Добавление имени зарегистрированного пользователя."""
+        positions = self.bloom.add(username)
+        self.update_metrics()
+        if self.shared_client is not None:
+            try:
+                await self.shared_client.set_bits(self.redis_key, positions)
+            except RedisError:
+                return
+
+    def update_metrics(self) -> None:
+        """Обновление метрик заполнения фильтра."""
+        username_filter_update(
+            items=self.bloom.count,
+            memory_bytes=self.bloom.memory_bytes,
+            error_rate=self.bloom.estimated_error_rate,
+        )
+
+
+username_filter = UsernameFilter(
+    bloom=BloomFilter(
+        capacity=settings.username_filter_capacity,
+        error_rate=settings.username_filter_error_rate,
+    ),
+    shared_client=(
+        RedisBitmap(redis_client.client)
+        if settings.username_filter_shared else None
+    ),
+)
@@ -1,41 +1,49 @@
-import bcrypt  # noqa: WPS202
 from fastapi import Depends, HTTPException, status
-from jwt import ExpiredSignatureError, InvalidTokenError
+from jwt import ExpiredSignatureError
 from opentracing import global_tracer
-from sqlalchemy import Result, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.auth_service.credentials import (
+    found_user_credentials,
+    schedule_rehash,
+)
+from app.auth_service.password_hasher import (
+    hash_password,
+    needs_rehash,
+    password_hasher,
+    verify_password,
+)
 from app.auth_service.schemas import UserSchema
+from app.auth_service.username_filter import username_filter
 from app.db.db_helper import db_helper
-from app.db.models import User
-from app.external.redis_client import RedisClient, get_redis_client
-from app.jwt_tokens.jwt_process import jwt_decode, jwt_encode
+from app.db.queries import UserCredentials, insert_user, user_exists
+from app.external.redis_client import RedisClient
+from app.jwt_tokens.jwt_process import jwt_decode_cached, jwt_encode
 
 
-def hash_password(password: str) -> bytes:
-    """Хеширование пароля."""
-    salt = bcrypt.gensalt()
-    return bcrypt.hashpw(password.encode(), salt)
-
+async def create_and_put_token(
+    user: UserCredentials,
+    redis_client: RedisClient,
+) -> str:
+    """Создание токена."""
+    token = jwt_encode(user)
+    await redis_client.set_token(token, user.id)
+    return token
 
-def verify_password(password: str, hashed_password: bytes) -> bool:
-    """Проверка пароля."""
-    return bcrypt.checkpw(password.encode(), hashed_password)
 
+def user_exists_error() -> HTTPException:
+    """Ошибка регистрации существующего пользователя."""
+    return HTTPException(
+        status_code=status.HTTP_409_CONFLICT,
+        detail='Username already exists',
+    )
 
-async def found_user(username: str, session: AsyncSession) -> User | None:
-    """Получение пользователя по имени."""
-    with global_tracer().start_active_span('found_user'):
-        db_request = select(User).where(User.name == username)
-        founded_user: Result = await session.execute(db_request)
-        return founded_user.scalar()
 
-
-async def create_and_put_token(user: User, redis_client: RedisClient) -> str:
-    """Создание токена."""
-    token = jwt_encode(user)
-    redis_client.set_token(token, user.id)
-    return token
+async def is_username_taken(username: str, session: AsyncSession) -> bool:
+    """Проверка имени фильтром Блума и, если нужно, запросом к БД."""
+    if not await username_filter.might_exist(username, 'register'):
+        return False
+    return await user_exists(username, session)
 
 
 async def register_view(
@@ -46,29 +54,35 @@ async def register_view(
     """Регистрация пользователя."""
     with global_tracer().start_active_span('register_view') as scope:
         scope.span.set_tag('user_data', str(user_in))
-        if await found_user(user_in.name, session):
+        # Дешёвая проверка до bcrypt, чтобы повторы имён не тратили CPU
+        if await is_username_taken(user_in.name, session):
             scope.span.set_tag('error', 'User already exists')
-            raise HTTPException(
-                status_code=status.HTTP_409_CONFLICT,
-                detail='Username already exists',
-            )
+            raise user_exists_error()
+
+        hashed_password = await password_hasher.run(
+            hash_password, user_in.password, password_hasher.rounds,
+        )
 
-        hashed_password = hash_password(user_in.password)
+        user_id = await insert_user(user_in.name, hashed_password, session)
+        if user_id is None:
+            scope.span.set_tag('error', 'User already exists')
+            raise user_exists_error()
 
-        user = User(name=user_in.name, password=hashed_password)
-        session.add(user)
-        await session.commit()
+        await username_filter.add(user_in.name)
+        user = UserCredentials(user_id, user_in.name, hashed_password)
         return await create_and_put_token(user, redis_client)
 
 
 async def validate_auth_user(
     user_in: UserSchema,
     session: AsyncSession = Depends(db_helper.scoped_session_dependency),
-) -> User:
+) -> UserCredentials:
     """Валидация пользователя."""
     with global_tracer().start_active_span('validate_auth_user') as scope:
         scope.span.set_tag('user_data', str(user_in))
-        user_bd = await found_user(user_in.name, session)
+        user_bd = None
+        if await username_filter.might_exist(user_in.name, 'auth'):
+            user_bd = await found_user_credentials(user_in.name, session)
 
         if user_bd is None:
             scope.span.set_tag('error', 'User not found')
@@ -77,30 +91,37 @@ async def validate_auth_user(
                 detail='Invalid username or password',
             )
 
-        if not verify_password(user_in.password, user_bd.password):
+        is_password_valid = await password_hasher.run(
+            verify_password, user_in.password, user_bd.password,
+        )
+        if not is_password_valid:
             scope.span.set_tag('error', 'Wrong password')
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail='Invalid username or password',
             )
 
+        if needs_rehash(user_bd.password):
+            scope.span.set_tag('info', 'Password cost changed, rehashing')
+            schedule_rehash(user_bd, user_in.password)
+
         return user_bd
 
 
 async def is_token_expired(token: str) -> bool:
     """Проверка истечения срока действия токена."""
     try:
-        jwt_decode(token)
+        jwt_decode_cached(token)
     except ExpiredSignatureError:
         return True
     return False
 
 
-async def auth_view(user: User, redis_client: RedisClient) -> str:
+async def auth_view(user: UserCredentials, redis_client: RedisClient) -> str:
     """Авторизация пользователя."""
     with global_tracer().start_active_span('auth_view') as scope:
         scope.span.set_tag('user_id', str(user.id))
-        cashed_token = redis_client.get_token(user.id)
+        cashed_token = await redis_client.get_token(user.id)
         if cashed_token is None:
             scope.span.set_tag('info', 'Token not found, creating new')
             return await create_and_put_token(user, redis_client)
@@ -111,48 +132,3 @@ async def auth_view(user: User, redis_client: RedisClient) -> str:
 
         scope.span.set_tag('info', 'Token from cash healthy')
         return cashed_token
-
-
-async def get_token(
-    user_id: int,
-    redis_client: RedisClient = Depends(get_redis_client),
-    session: AsyncSession = Depends(db_helper.scoped_session_dependency),
-):
-    """Получение токена."""
-    with global_tracer().start_active_span('get_token') as scope:
-        user = await session.get(User, user_id)
-        if not user:
-            scope.span.set_tag('error', 'User not found')
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail='Token not found',
-            )
-        cashed_token = redis_client.get_token(user_id)
-
-        if cashed_token is None:
-            scope.span.set_tag('error', 'Token not found')
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail='Token not found',
-            )
-
-        return cashed_token
-
-
-async def validate_token(token: str = Depends(get_token)) -> None:
-    """Валидация токена."""
-    with global_tracer().start_active_span('validate_token') as scope:
-        try:
-            jwt_decode(token)
-        except ExpiredSignatureError:
-            scope.span.set_tag('error', 'token expired')
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail='token expired',
-            )
-        except InvalidTokenError:
-            scope.span.set_tag('error', 'invalid token')
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail='invalid token',
-            )
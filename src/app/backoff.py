@@ -0,0 +1,16 @@
+from typing import NamedTuple
+
+# Больший показатель не меняет задержку, только растит промежуточное число
+MAX_EXPONENT = 32
+
+
+class Backoff(NamedTuple):
+    """Задержка повторов, удваивающаяся с каждой попыткой до max_delay."""
+
+    min_delay: float
+    max_delay: float
+
+    def get_delay(self, attempts: int) -> float:
+        """Задержка перед повтором после attempts неудачных попыток."""
+        exponent = min(attempts, MAX_EXPONENT)
+        return min(self.max_delay, self.min_delay * 2 ** exponent)
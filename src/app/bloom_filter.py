@@ -0,0 +1,71 @@
+import hashlib
+import math
+
+LN2 = math.log(2)
+# Старший бит байта, с него начинается нумерация битов
+HIGH_BIT = 0x80
+# Размер blake2b, из половин которого берутся два хеша
+DIGEST_SIZE = 16
+HALF_DIGEST = DIGEST_SIZE // 2
+
+
+def bit_mask(position: int) -> int:
+    """Маска бита внутри его байта."""
+    return HIGH_BIT >> (position % 8)
+
+
+class BloomFilter:
+    """Фильтр Блума для строк.
+
+    Биты хранятся от старшего к младшему, как в битовых строках Redis,
+    поэтому содержимое можно напрямую объединять с ключом Redis.
+    """
+
+    def __init__(self, capacity: int, error_rate: float) -> None:
+        self.capacity = capacity
+        self.error_rate = error_rate
+        bits_per_item = -math.log(error_rate) / LN2 ** 2
+        self.size = math.ceil(capacity * bits_per_item)
+        self.hash_count = max(1, round(self.size / capacity * LN2))
+        self.bits = bytearray(math.ceil(self.size / 8))
+        self.count = 0
+
+    def __contains__(self, item: str) -> bool:
+        """Проверка, что все биты элемента установлены."""
+        return all(self.get_bit(position) for position in self.positions(item))
+
+    @property
+    def memory_bytes(self) -> int:
+        """Объём памяти под биты фильтра."""
+        return len(self.bits)
+
+    @property
+    def estimated_error_rate(self) -> float:
+        """Ожидаемая доля ложноположительных ответов при текущем заполнении."""
+        fill_ratio = self.hash_count * self.count / self.size
+        filled = 1 - math.exp(-fill_ratio)
+        return filled ** self.hash_count
+
+    def positions(self, item: str) -> list[int]:
+        """Номера битов элемента, двойное хеширование одного blake2b."""
+        digest = hashlib.blake2b(
+            item.encode(), digest_size=DIGEST_SIZE,
+        ).digest()
+        first_hash = int.from_bytes(digest[:HALF_DIGEST], 'little')
+        second_hash = int.from_bytes(digest[HALF_DIGEST:], 'little') | 1
+        return [
+            (first_hash + index * second_hash) % self.size
+            for index in range(self.hash_count)
+        ]
+
+    def get_bit(self, position: int) -> bool:
+        """Значение бита."""
+        return bool(self.bits[position // 8] & bit_mask(position))
+
+    def add(self, item: str) -> list[int]:
+        """Добавление элемента, возвращает номера его битов."""
+        positions = self.positions(item)
+        for position in positions:
+            self.bits[position // 8] |= bit_mask(position)
+        self.count += 1
+        return positions
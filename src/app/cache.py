@@ -0,0 +1,94 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Generic, Hashable, TypeVar
+
+from app.external.prometheus.metrics_updaters import (
+    cache_eviction_update,
+    cache_request_update,
+)
+
+KeyT = TypeVar('KeyT', bound=Hashable)
+ValueT = TypeVar('ValueT')
+
+
+class TTLCache(Generic[KeyT, ValueT]):
+    """Ограниченный по размеру LRU кеш с временем жизни записей.
+
+    Методы не содержат await и защищены блокировкой, поэтому кеш можно
+    использовать как из корутин, так и из потоков пула.
+    """
+
+    def __init__(self, name: str, max_size: int, ttl: float) -> None:
+        self.name = name
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: OrderedDict[KeyT, tuple[ValueT, float]] = (
+            OrderedDict()
+        )
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        """Число записей в кеше."""
+        return len(self._entries)
+
+    def get(self, key: KeyT) -> ValueT | None:
+        """Получение значения по ключу."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] <= time.time():
+                self._entries.pop(key)
+                cache_eviction_update(self.name, 'expired')
+                entry = None
+            elif entry is not None:
+                self._entries.move_to_end(key)
+
+        cache_request_update(self.name, is_hit=entry is not None)
+        return None if entry is None else entry[0]
+
+    def set(
+        self,
+        key: KeyT,
+        value: ValueT,
+        expire_at: float | None = None,
+    ) -> None:
+        """Установка значения, живущего не дольше expire_at."""
+        now = time.time()
+        max_expire_at = now + self.ttl
+        if expire_at is None or expire_at > max_expire_at:
+            expire_at = max_expire_at
+
+        with self._lock:
+            if expire_at <= now:
+                self._entries.pop(key, None)
+                return
+
+            self._entries[key] = (value, expire_at)
+            self._entries.move_to_end(key)
+            self._evict(now)
+
+    def pop(self, key: KeyT) -> None:
+        """Удаление значения по ключу."""
+        with self._lock:
+            entry = self._entries.pop(key, None)
+        if entry is not None:
+            cache_eviction_update(self.name, 'invalidated')
+
+    def clear(self) -> None:
+        """Очистка кеша."""
+        with self._lock:
+            self._entries.clear()
+
+    def _evict(self, now: float) -> None:
+        # Давно не использованные записи лежат в начале, поэтому истёкшие
+        # и лишние записи снимаются с головы без полного обхода кеша
+        while self._entries:
+            _, expire_at = next(iter(self._entries.values()))
+            is_expired = expire_at <= now
+            if not is_expired and len(self._entries) <= self.max_size:
+                return
+
+            self._entries.popitem(last=False)
+            cache_eviction_update(
+                self.name, 'expired' if is_expired else 'size',
+            )
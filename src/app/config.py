@@ -3,6 +3,8 @@ from pathlib import Path
 from pydantic_settings import BaseSettings
 
 BASE_DIR = Path(__file__).parent
+# Размер части загружаемого фото, читаемой за раз
+UPLOAD_CHUNK_KB = 256
 jwt_private_path = BASE_DIR / 'jwt_tokens' / 'jwt_private.pem'
 jwt_public_path = BASE_DIR / 'jwt_tokens' / 'jwt_public.pem'
 
@@ -16,16 +18,47 @@ class Settings(BaseSettings):
     # Настройки JWT
     jwt_private: str = jwt_private_path.read_text()
     jwt_public: str = jwt_public_path.read_text()
+    jwt_retired_public_keys: list[str] = []
     crypto_algorithm: str = 'RS256'
     jwt_auth_token_expiry_minutes: int = 10
+    jwt_refresh_token_expiry_days: int = 30
+    check_token_batch_max_size: int = 1000
+
+    # Настройки хеширования паролей
+    hash_executor_type: str = 'thread'
+    hash_max_workers: int = 4
+    hash_max_queue_size: int = 64
+    hash_rounds: int | None = None
+    hash_target_time_ms: int = 250
+    hash_min_rounds: int = 10
+    hash_max_rounds: int = 15
 
     # Настройки Kafka
     kafka_host: str = 'kafka'
     kafka_port: str = '9092'
     kafka_producer_topic: str = 'faces'
+    kafka_publish_async: bool = True
+    kafka_linger_ms: int = 5
+    kafka_handoff_size: int = 100
+    kafka_max_batch_bytes: int = 16384
+    kafka_compression_type: str | None = 'gzip'
+    kafka_max_queue_size: int = 10000
+    kafka_stop_timeout_seconds: float = 10
+    kafka_outbox_enabled: bool = True
+    kafka_outbox_path: str = '/usr/photos/outbox.sqlite3'
+    kafka_outbox_batch_size: int = 500
+    kafka_outbox_retry_min_seconds: float = 1
+    kafka_outbox_retry_max_seconds: float = 60
+    kafka_outbox_poll_seconds: float = 1
     file_encoding: str = 'utf-8'
     file_compression_quality: int = 1
 
+    # Настройки загрузки фото
+    upload_chunk_size: int = UPLOAD_CHUNK_KB * 1024
+    upload_max_size: int = 10 * 1024 * 1024
+    photo_storage_backend: str = 'local'
+    photo_storage_dir: str = '/usr/photos'
+
     # Настройки db
     db_user: str = 'postgres'
     db_password: str = 'postgres'
@@ -34,11 +67,58 @@ class Settings(BaseSettings):
     db_name: str = 'credit_card'
     db_echo: bool = False
     db_schema: str = 'lebedev_schema'
+    db_pool_size: int = 10
+    db_max_overflow: int = 20
+    db_pool_timeout: float = 30.0
+    db_pool_recycle: int = -1
+    db_pool_pre_ping: bool = False
+    db_query_cache_size: int = 500
+    db_prepared_statement_cache_size: int = 100
+    db_replica_urls: list[str] = []
+    db_replica_balancing: str = 'round_robin'
+    db_replica_retry_after: float = 30.0
+    db_shard_urls: list[str] = []
+    db_shard_schemas: list[str] = []
 
     # Настройки Redis
     redis_host: str = 'redis'
     redis_port: int = 6379
     redis_db_number: int = 1
+    redis_max_connections: int = 50
+    redis_pool_timeout: float = 1.0
+    redis_socket_timeout: float = 1.0
+    redis_connect_timeout: float = 1.0
+    redis_invalidation_channel: str = 'lebedev_auth:invalidation'
+    redis_reconnect_delay: float = 1.0
+
+    # Настройки фильтра Блума имён пользователей
+    username_filter_enabled: bool = True
+    username_filter_capacity: int = 1000000
+    username_filter_error_rate: float = 0.01
+    username_filter_shared: bool = True
+    username_filter_redis_key: str = 'lebedev_auth:usernames'
+
+    # Настройки локального кеша токенов
+    token_cache_max_size: int = 10000
+    token_cache_ttl_seconds: int = 60
+    decoded_token_cache_max_size: int = 10000
+    decoded_token_cache_ttl_seconds: int = 600
+
+    # Настройки локального кеша учётных данных пользователей
+    credentials_cache_max_size: int = 10000
+    credentials_cache_ttl_seconds: int = 300
+
+    # Настройки индекса векторов верификации
+    vector_index_enabled: bool = True
+    vector_index_path: Path = BASE_DIR.parent / 'vector_index'
+    vector_index_ivf_threshold: int = 50000
+    vector_index_ivf_lists: int | None = None
+    vector_index_ivf_probes: int = 8
+    vector_index_max_limit: int = 100
+    vector_index_max_age_seconds: float = 24 * 60 * 60
+    vector_index_retry_min_seconds: float = 1
+    vector_index_retry_max_seconds: float = 60
+    vector_index_refresh_seconds: float = 60
 
     # Настройки Jaeger
     jaeger_agent_host: str = 'jaeger'
@@ -1,48 +1,194 @@
-from asyncio import current_task
 from typing import AsyncGenerator
 
+from sqlalchemy import event, make_url
+from sqlalchemy.engine import default
 from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
     AsyncSession,
-    async_scoped_session,
     async_sessionmaker,
     create_async_engine,
 )
+from sqlalchemy.ext.horizontal_shard import ShardedSession
 
 from app.config import settings
+from app.db.pool import InstrumentedPool
+from app.db.replicas import REPLICAS, ReplicaSet
+from app.db.sharding import SHARD_RING, ShardRing, get_shard_id
+from app.external.prometheus.metrics_updaters import cache_request_update
+
+
+def observe_query_cache(context, **kwargs) -> None:
+    """Учёт попаданий в кеш скомпилированных запросов SQLAlchemy."""
+    if context.cache_hit in {default.CACHE_HIT, default.CACHE_MISS}:
+        cache_request_update(
+            'sql_compiled', is_hit=context.cache_hit == default.CACHE_HIT,
+        )
+
+
+def create_engine(  # noqa: WPS211
+    url: str,
+    echo: bool,
+    name: str,
+    pool_size: int,
+    max_overflow: int,
+    pool_timeout: float,
+    pool_recycle: int,
+    pool_pre_ping: bool,
+    query_cache_size: int,
+    prepared_statement_cache_size: int,
+) -> AsyncEngine:
+    """Создание движка с пулом соединений и кешами запросов.
+
+    Подготовленные выражения asyncpg переиспользуются в пределах
+    соединения, кеш скомпилированных запросов SQLAlchemy общий на движок.
+    """
+    connect_args = {}
+    if make_url(url).get_driver_name() == 'asyncpg':
+        connect_args = {
+            'prepared_statement_cache_size': prepared_statement_cache_size,
+        }
+    engine = create_async_engine(
+        url=url,
+        echo=echo,
+        poolclass=InstrumentedPool,
+        pool_logging_name=name,
+        pool_size=pool_size,
+        max_overflow=max_overflow,
+        pool_timeout=pool_timeout,
+        pool_recycle=pool_recycle,
+        pool_pre_ping=pool_pre_ping,
+        query_cache_size=query_cache_size,
+        connect_args=connect_args,
+    )
+    event.listen(
+        engine.sync_engine,
+        'before_cursor_execute',
+        observe_query_cache,
+        named=True,
+    )
+    return engine
+
+
+def create_shards(
+    urls: list[str],
+    schemas: list[str],
+    name: str,
+    pool_settings: dict,
+) -> dict[str, AsyncEngine]:
+    """Движки шардов, шарды в одной БД делят один пул."""
+    if schemas and len(schemas) != len(urls):
+        raise ValueError('Shard schemas must match shard urls')
+
+    engines: dict[str, AsyncEngine] = {}
+    shards = {}
+    for index, url in enumerate(urls):
+        if url not in engines:
+            pool_index = len(engines)
+            engines[url] = create_engine(
+                url, name=f'{name}_shard_{pool_index}', **pool_settings,
+            )
+        engine = engines[url]
+        if schemas:
+            engine = engine.execution_options(
+                schema_translate_map={settings.db_schema: schemas[index]},
+            )
+        shards[get_shard_id(index)] = engine
+    return shards
 
 
 class DatabaseHelper:
-    """Подключение к базе данных."""
-
-    def __init__(self, url: str, echo: bool = False) -> None:
-        self.engine = create_async_engine(
-            url=url,
-            echo=echo,
-            pool_size=10,
-            max_overflow=20,  # noqa: WPS432
+    """Подключение к базе данных.
+
+    Реплики используются только запросами через execute_read,
+    остальные запросы идут в основную БД. При заданных shard_urls
+    пользователи распределяются по шардам, а сессии направляют запросы
+    на шард по имени или id пользователя.
+    """
+
+    def __init__(  # noqa: WPS211
+        self,
+        url: str,
+        echo: bool = False,
+        name: str = 'primary',
+        pool_size: int = settings.db_pool_size,
+        max_overflow: int = settings.db_max_overflow,
+        pool_timeout: float = settings.db_pool_timeout,
+        pool_recycle: int = settings.db_pool_recycle,
+        pool_pre_ping: bool = settings.db_pool_pre_ping,
+        query_cache_size: int = settings.db_query_cache_size,
+        prepared_statement_cache_size: int = (
+            settings.db_prepared_statement_cache_size
+        ),
+        replica_urls: list[str] = settings.db_replica_urls,
+        replica_balancing: str = settings.db_replica_balancing,
+        replica_retry_after: float = settings.db_replica_retry_after,
+        shard_urls: list[str] = settings.db_shard_urls,
+        shard_schemas: list[str] = settings.db_shard_schemas,
+    ) -> None:
+        if shard_urls and replica_urls:
+            raise ValueError('Read replicas are not supported with shards')
+
+        pool_settings = {
+            'echo': echo,
+            'pool_size': pool_size,
+            'max_overflow': max_overflow,
+            'pool_timeout': pool_timeout,
+            'pool_recycle': pool_recycle,
+            'pool_pre_ping': pool_pre_ping,
+            'query_cache_size': query_cache_size,
+            'prepared_statement_cache_size': prepared_statement_cache_size,
+        }
+        self.engine = create_engine(url, name=name, **pool_settings)
+        self.replicas = ReplicaSet(
+            engines=[
+                create_engine(
+                    replica_url,
+                    name=f'{name}_replica_{index}',
+                    **pool_settings,
+                )
+                for index, replica_url in enumerate(replica_urls)
+            ],
+            balancing=replica_balancing,
+            retry_after=replica_retry_after,
+        )
+        self.shards = create_shards(
+            shard_urls, shard_schemas, name, pool_settings,
         )
+        self.shard_ring = ShardRing(list(self.shards)) if shard_urls else None
         self.session_factory = async_sessionmaker(
             bind=self.engine,
             autoflush=False,
             autocommit=False,
             expire_on_commit=False,
+            info={REPLICAS: self.replicas, SHARD_RING: self.shard_ring},
+            **self.get_shard_options(),
         )
 
-    def get_scoped_session(self) -> async_scoped_session[AsyncSession]:
-        """Получение сессии."""
-        session = async_scoped_session(
-            session_factory=self.session_factory,
-            scopefunc=current_task,
-        )
-        return session
+    def get_shard_options(self) -> dict:
+        """Параметры сессии для шардирования."""
+        if self.shard_ring is None:
+            return {}
+        return {
+            'sync_session_class': ShardedSession,
+            'shards': {
+                shard_id: engine.sync_engine
+                for shard_id, engine in self.shards.items()
+            },
+            'shard_chooser': self.shard_ring.shard_chooser,
+            'identity_chooser': self.shard_ring.identity_chooser,
+            'execute_chooser': self.shard_ring.execute_chooser,
+        }
 
     async def scoped_session_dependency(
         self,
-    ) -> AsyncGenerator[async_scoped_session[AsyncSession], None]:
-        """Зависимость для получения сессии."""
-        session = self.get_scoped_session()
-        yield session
-        await session.close()
+    ) -> AsyncGenerator[AsyncSession, None]:
+        """Зависимость для получения сессии на время запроса.
+
+        Соединение берётся из пула только при первом запросе к БД,
+        поэтому ответы из кеша не занимают соединений.
+        """
+        async with self.session_factory() as session:
+            yield session
 
 
 db_helper = DatabaseHelper(
@@ -1,8 +1,10 @@
+import numpy as np
 from sqlalchemy import MetaData, String
 from sqlalchemy.orm import Mapped, declarative_base, mapped_column
-from sqlalchemy.types import ARRAY, BigInteger, Boolean, Numeric
+from sqlalchemy.types import BigInteger, Boolean
 
 from app.config import settings
+from app.db.types import Float32Vector
 
 schema = settings.db_schema
 
@@ -28,6 +30,7 @@ class User(BaseTable):
     password: Mapped[bytes]
     balance: Mapped[int] = mapped_column(BigInteger, default=0)
     is_verified: Mapped[bool] = mapped_column(Boolean, default=False)
-    verification_vector: Mapped[list[float] | None] = mapped_column(
-        ARRAY(Numeric(8, 7)),
+    # Загружается только по запросу: undefer или явный выбор столбца
+    verification_vector: Mapped[np.ndarray | None] = mapped_column(
+        Float32Vector, deferred=True,
     )
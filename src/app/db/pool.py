@@ -0,0 +1,76 @@
+import time
+
+from sqlalchemy import event
+from sqlalchemy.pool import (
+    AsyncAdaptedQueuePool,
+    ConnectionPoolEntry,
+    PoolProxiedConnection,
+)
+
+from app.external.prometheus.metrics_updaters import (
+    db_connection_lifetime_update,
+    db_pool_usage_update,
+    db_pool_wait_time_update,
+)
+
+POOL_NAME = 'pool_name'
+CONNECTED_AT = 'connected_at'
+
+
+def set_connected_at(dbapi_connection, connection_record) -> None:
+    """Запоминание времени открытия соединения."""
+    connection_record.info[CONNECTED_AT] = time.time()
+
+
+def observe_lifetime(dbapi_connection, connection_record) -> None:
+    """Время жизни закрытого соединения."""
+    connected_at = connection_record.info.get(CONNECTED_AT)
+    if connected_at is not None:
+        db_connection_lifetime_update(
+            connection_record.record_info.get(POOL_NAME, 'default'),
+            time.time() - connected_at,
+        )
+
+
+class InstrumentedPool(AsyncAdaptedQueuePool):
+    """Пул соединений с метриками prometheus.
+
+    Имя пула для метрик берётся из pool_logging_name движка, оно
+    сохраняется при пересоздании пула.
+    """
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        # При пересоздании слушатели копируются из старого пула
+        if set_connected_at not in list(self.dispatch.connect):
+            event.listen(self, 'connect', set_connected_at)
+            event.listen(self, 'close', observe_lifetime)
+
+    @property
+    def name(self) -> str:
+        """Имя пула в метриках."""
+        return self._orig_logging_name or 'default'
+
+    def connect(self) -> PoolProxiedConnection:
+        """Получение соединения из пула."""
+        start_time = time.perf_counter()
+        try:  # noqa: WPS501
+            return super().connect()
+        finally:
+            db_pool_wait_time_update(
+                self.name, time.perf_counter() - start_time,
+            )
+            self.update_usage()
+
+    def update_usage(self) -> None:
+        """Обновление метрик занятости пула."""
+        db_pool_usage_update(self.name, self.checkedout(), self.overflow())
+
+    def _return_conn(self, record: ConnectionPoolEntry) -> None:
+        super()._return_conn(record)
+        self.update_usage()
+
+    def _create_connection(self) -> ConnectionPoolEntry:
+        record = super()._create_connection()
+        record.record_info[POOL_NAME] = self.name
+        return record
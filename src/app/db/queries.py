@@ -0,0 +1,150 @@
+from typing import NamedTuple, Sequence
+
+from opentracing import global_tracer
+from sqlalchemy import Executable, Result, Row, bindparam, select, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.models import User
+from app.db.replicas import REPLICAS, ReplicaSet
+from app.db.sharding import new_user_values, route_by_id, route_by_name
+from app.external.prometheus.metrics_updaters import (
+    db_read_fallback_update,
+    db_read_update,
+)
+
+
+class UserCredentials(NamedTuple):
+    """Учётные данные пользователя без ORM объекта."""
+
+    id: int  # noqa: WPS125
+    name: str
+    password: bytes | None = None
+
+
+# Запросы собираются один раз при импорте. Скомпилированный вид
+# SQLAlchemy кеширует и для запросов, построенных заново, экономится
+# только построение выражения и его ключа кеша на каждый вызов
+credentials_by_name = select(User.id, User.name, User.password).where(
+    User.name == bindparam('username'),
+)
+user_id_by_name = select(User.id).where(User.name == bindparam('username'))
+existing_user_ids = select(User.id).where(
+    User.id.in_(bindparam('user_ids', expanding=True)),
+)
+
+
+async def read_replica(
+    session: AsyncSession,
+    statement: Executable,
+    params: dict | None,
+    min_rows: int,
+) -> Sequence[Row] | None:
+    """Запрос к реплике, None если его нужно повторить на основной БД."""
+    replicas: ReplicaSet | None = session.info.get(REPLICAS)
+    replica = None if replicas is None else replicas.choose()
+    if replicas is None or replica is None:
+        return None
+
+    try:
+        replica_result = await session.execute(
+            statement,
+            params,
+            bind_arguments={'bind': replica.sync_engine},
+        )
+    except (SQLAlchemyError, OSError):
+        replicas.mark_unhealthy(replica)
+        await session.rollback()
+        db_read_fallback_update('error')
+        return None
+
+    db_read_update('replica')
+    rows = replica_result.all()
+    if len(rows) >= min_rows:
+        return rows
+    db_read_fallback_update('not_found')
+    return None
+
+
+async def execute_read(
+    session: AsyncSession,
+    statement: Executable,
+    params: dict | None = None,
+    min_rows: int = 0,
+) -> Sequence[Row]:
+    """Запрос на чтение к реплике с повтором на основной БД.
+
+    Повтор выполняется при ошибке реплики и если реплика вернула меньше
+    min_rows строк, например ещё не получив данные, записанные любым
+    экземпляром сервиса. Вход с незарегистрированным именем отсекает
+    фильтр имён, поэтому промахи при входе редки. При ошибке сессия
+    откатывается, поэтому функция вызывается только до изменений в сессии.
+    """
+    rows = await read_replica(session, statement, params, min_rows)
+    if rows is not None:
+        return rows
+
+    db_read_update('primary')
+    primary_result = await session.execute(statement, params)
+    return primary_result.all()
+
+
+async def get_user_credentials(
+    username: str,
+    session: AsyncSession,
+) -> UserCredentials | None:
+    """Получение id, имени и хеша пароля пользователя по имени."""
+    db_request = route_by_name(credentials_by_name, session, username)
+    rows = await execute_read(
+        session, db_request, {'username': username}, min_rows=1,
+    )
+    return UserCredentials(*rows[0]) if rows else None
+
+
+async def update_password(
+    user_id: int,
+    hashed_password: bytes,
+    session: AsyncSession,
+) -> None:
+    """Замена хеша пароля пользователя."""
+    db_request = update(User).where(User.id == user_id).values(
+        password=hashed_password,
+    )
+    await session.execute(route_by_id(db_request, session, user_id))
+    await session.commit()
+
+
+async def user_exists(username: str, session: AsyncSession) -> bool:
+    """Проверка существования пользователя без загрузки строки.
+
+    Отставание реплики здесь не опасно: занятое имя отклонит INSERT.
+    """
+    with global_tracer().start_active_span('user_exists'):
+        db_request = route_by_name(user_id_by_name, session, username)
+        return bool(await execute_read(
+            session, db_request, {'username': username},
+        ))
+
+
+async def insert_user(
+    username: str,
+    hashed_password: bytes,
+    session: AsyncSession,
+) -> int | None:
+    """Добавление пользователя, None если имя уже занято."""
+    with global_tracer().start_active_span('insert_user'):
+        insert_request = insert(User).values(
+            name=username,
+            password=hashed_password,
+            **new_user_values(session, username),
+        )
+        db_request = insert_request.on_conflict_do_nothing(
+            index_elements=[User.name],
+        ).returning(User.id)
+        inserted_id: Result = await session.execute(
+            route_by_name(db_request, session, username),
+        )
+        user_id = inserted_id.scalar()
+        await session.commit()
+        return user_id
@@ -0,0 +1,166 @@
+import argparse
+import asyncio
+import logging
+
+from sqlalchemy import delete, select, text
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.engine import RowMapping
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+
+from app.config import settings
+from app.db.db_helper import db_helper
+from app.db.models import Base, User
+from app.db.sharding import (
+    BUCKETS,
+    ShardRing,
+    create_user_id_sequence,
+    get_moved_buckets,
+    get_shard_id,
+)
+
+users = User.__table__
+logger = logging.getLogger(__name__)
+
+
+class RebalanceError(Exception):
+    """Перенос пользователей остановлен, данные требуют проверки."""
+
+
+async def init_shards(shards: dict[str, AsyncEngine]) -> None:
+    """Создание схемы, таблиц и последовательности id на каждом шарде."""
+    for index, engine in enumerate(shards.values()):
+        async with engine.begin() as conn:
+            translate_map = conn.get_execution_options().get(
+                'schema_translate_map', {},
+            )
+            schema = translate_map.get(settings.db_schema, settings.db_schema)
+            await conn.execute(text(f'CREATE SCHEMA IF NOT EXISTS "{schema}"'))
+            await conn.run_sync(Base.metadata.create_all)
+            await conn.run_sync(
+                create_user_id_sequence(index).create, checkfirst=True,
+            )
+        shard_id = get_shard_id(index)
+        logger.info(f'{shard_id}: initialized')
+
+
+async def copy_users(target: AsyncEngine, rows: list[RowMapping]) -> set[int]:
+    """Запись пользователей на шард с заменой старых копий, возвращает id."""
+    statement = insert(users).values([dict(row) for row in rows])
+    statement = statement.on_conflict_do_update(
+        index_elements=[users.c.id],
+        set_={
+            column.name: statement.excluded[column.name]
+            for column in users.c
+            if not column.primary_key
+        },
+    ).returning(users.c.id)
+    try:
+        async with target.begin() as target_conn:
+            return set((await target_conn.execute(statement)).scalars())
+    except IntegrityError as ex:
+        # Имя занято другим пользователем на новом шарде
+        raise RebalanceError(
+            f'Name conflict on target shard: {ex.orig}',
+        ) from ex
+
+
+async def move_batch(
+    bucket: int,
+    source_conn: AsyncConnection,
+    target: AsyncEngine,
+    batch_size: int,
+) -> int:
+    """Перенос одной пачки корзины, возвращает число пользователей."""
+    batch_request = select(users).where(
+        users.c.id % BUCKETS == bucket,
+    ).order_by(users.c.id).limit(batch_size).with_for_update()
+    batch_result = await source_conn.execute(batch_request)
+    rows = batch_result.mappings().all()
+    if not rows:
+        return 0
+
+    user_ids = {row['id'] for row in rows}
+    copied_ids = await copy_users(target, rows)
+    if copied_ids != user_ids:
+        confirmed = len(copied_ids)
+        expected = len(user_ids)
+        raise RebalanceError(
+            f'Bucket {bucket}: {confirmed} of {expected} users copied',
+        )
+    await source_conn.execute(
+        delete(users).where(users.c.id.in_(copied_ids)),
+    )
+    return len(rows)
+
+
+async def move_bucket(
+    bucket: int,
+    source: AsyncEngine,
+    target: AsyncEngine,
+    batch_size: int,
+) -> int:
+    """Перенос пользователей корзины с шарда на шард пачками.
+
+    Строки пачки блокируются на старом шарде до удаления, на новый шард
+    записываются их текущие значения. Удаляются только id, запись
+    которых подтвердил новый шард, поэтому после сбоя перенос можно
+    повторить: оставшаяся копия будет перезаписана.
+    """
+    moved = 0
+    while True:
+        async with source.begin() as source_conn:
+            batch_moved = await move_batch(
+                bucket, source_conn, target, batch_size,
+            )
+        if not batch_moved:
+            return moved
+        moved += batch_moved
+
+
+async def rebalance(
+    shards: dict[str, AsyncEngine],
+    old_shard_count: int,
+    batch_size: int,
+) -> None:
+    """Перенос корзин после добавления шардов в конец списка."""
+    shard_ids = list(shards)
+    old_ring = ShardRing(shard_ids[:old_shard_count])
+    new_ring = ShardRing(shard_ids)
+    moved_buckets = get_moved_buckets(old_ring, new_ring)
+    buckets_count = len(moved_buckets)
+    logger.info(f'Buckets to move: {buckets_count} of {BUCKETS}')
+
+    for bucket, (old_shard, new_shard) in moved_buckets.items():
+        moved = await move_bucket(
+            bucket, shards[old_shard], shards[new_shard], batch_size,
+        )
+        if moved:
+            logger.info(
+                f'bucket {bucket}: {moved} users {old_shard} -> {new_shard}',
+            )
+
+
+async def main(args: argparse.Namespace) -> None:
+    """Запуск команды."""
+    if not db_helper.shards:
+        logger.error('Sharding is disabled, set db_shard_urls')
+        return
+
+    if args.command == 'init':
+        await init_shards(db_helper.shards)
+    else:
+        await rebalance(db_helper.shards, args.old_shards, args.batch_size)
+    for engine in db_helper.shards.values():
+        await engine.dispose()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    subparsers.add_parser('init')
+    rebalance_parser = subparsers.add_parser('rebalance')
+    rebalance_parser.add_argument('--old-shards', type=int, required=True)
+    rebalance_parser.add_argument('--batch-size', type=int, default=1000)
+    logging.basicConfig(level=logging.INFO, format='{message}', style='{')
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,89 @@
+import itertools
+import time
+
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.external.prometheus.metrics_updaters import db_replica_health_update
+
+# Ключ набора реплик в Session.info
+REPLICAS = 'replicas'
+balancing_types = ('round_robin', 'least_connections')
+
+
+def get_pool_name(engine: AsyncEngine) -> str:
+    """Имя пула движка в метриках."""
+    return getattr(engine.sync_engine.pool, 'name', 'default')
+
+
+class ReplicaSet:
+    """Реплики БД для запросов на чтение.
+
+    Реплика, на которой произошла ошибка, исключается из выбора
+    на retry_after секунд.
+    """
+
+    def __init__(
+        self,
+        engines: list[AsyncEngine],
+        balancing: str = 'round_robin',
+        retry_after: float = 30.0,
+    ) -> None:
+        if balancing not in balancing_types:
+            raise ValueError(f'Unknown replica balancing: {balancing}')
+
+        self.engines = engines
+        self.balancing = balancing
+        self.retry_after = retry_after
+        self.unhealthy_until: dict[int, float] = {}
+        self._order = itertools.cycle(range(len(engines)))
+        for engine in engines:
+            db_replica_health_update(get_pool_name(engine), is_healthy=True)
+
+    def __len__(self) -> int:
+        """Число реплик."""
+        return len(self.engines)
+
+    def is_healthy(self, index: int) -> bool:
+        """Проверка доступности реплики по номеру."""
+        unhealthy_until = self.unhealthy_until.get(index)
+        if unhealthy_until is None:
+            return True
+        if unhealthy_until > time.monotonic():
+            return False
+
+        self.unhealthy_until.pop(index)
+        db_replica_health_update(
+            get_pool_name(self.engines[index]), is_healthy=True,
+        )
+        return True
+
+    def choose(self) -> AsyncEngine | None:
+        """Выбор реплики для запроса, None если доступных реплик нет."""
+        if self.balancing == 'least_connections':
+            healthy = [
+                engine
+                for index, engine in enumerate(self.engines)
+                if self.is_healthy(index)
+            ]
+            return min(
+                healthy,
+                key=lambda engine: engine.sync_engine.pool.checkedout(),
+                default=None,
+            )
+
+        for _ in self.engines:
+            index = next(self._order)
+            if self.is_healthy(index):
+                return self.engines[index]
+        return None
+
+    def mark_unhealthy(self, engine: AsyncEngine) -> None:
+        """Исключение реплики из выбора после ошибки."""
+        index = self.engines.index(engine)
+        self.unhealthy_until[index] = time.monotonic() + self.retry_after
+        db_replica_health_update(get_pool_name(engine), is_healthy=False)
+
+    async def dispose(self) -> None:
+        """Закрытие соединений со всеми репликами."""
+        for engine in self.engines:
+            await engine.dispose()
@@ -0,0 +1,184 @@
+import bisect
+import hashlib
+from typing import Any, TypeVar
+
+from sqlalchemy import Executable, Sequence
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.horizontal_shard import set_shard_id
+from sqlalchemy.sql.elements import ColumnElement
+
+from app.config import settings
+
+StatementT = TypeVar('StatementT', bound=Executable)
+
+# Ключ кольца шардов в Session.info
+SHARD_RING = 'shard_ring'
+# Число корзин пользователей, номер корзины хранится в младших битах id
+BUCKETS = 1024
+# Предел числа шардов, шаг последовательности id на каждом шарде
+MAX_SHARDS = 64
+VIRTUAL_NODES = 100
+
+user_id_sequence = Sequence(
+    'lebedev_user_shard_id_seq',
+    schema=settings.db_schema,
+)
+
+
+def get_hash(key: str) -> int:
+    """Стабильный между процессами хеш строки."""
+    digest = hashlib.blake2b(key.encode(), digest_size=8).digest()
+    return int.from_bytes(digest, 'big')
+
+
+def get_name_bucket(username: str) -> int:
+    """Корзина пользователя по имени."""
+    return get_hash(username) % BUCKETS
+
+
+def get_id_bucket(user_id: int) -> int:
+    """Корзина пользователя по id."""
+    return user_id % BUCKETS
+
+
+def get_shard_id(index: int) -> str:
+    """Идентификатор шарда по его номеру в настройках."""
+    return f'shard_{index}'
+
+
+class ShardRing:
+    """Кольцо консистентного хеширования корзин пользователей по шардам.
+
+    Имя пользователя определяет корзину, корзина записана в id, поэтому
+    шард находится и по имени, и по id. При добавлении шарда на него
+    переезжает примерно 1/N корзин, id пользователей не меняются.
+    """
+
+    def __init__(
+        self,
+        shard_ids: list[str],
+        virtual_nodes: int = VIRTUAL_NODES,
+    ) -> None:
+        if not shard_ids or len(shard_ids) > MAX_SHARDS:
+            raise ValueError(f'Shard count must be from 1 to {MAX_SHARDS}')
+
+        self.shard_ids = shard_ids
+        ring = sorted(
+            (get_hash(f'{shard_id}:{node}'), shard_id)
+            for shard_id in shard_ids
+            for node in range(virtual_nodes)
+        )
+        self._points = [point for point, _ in ring]
+        self._owners = [shard_id for _, shard_id in ring]
+        self.bucket_shards = [
+            self._find_owner(get_hash(f'bucket:{bucket}'))
+            for bucket in range(BUCKETS)
+        ]
+
+    def shard_for_name(self, username: str) -> str:
+        """Шард пользователя по имени."""
+        return self.bucket_shards[get_name_bucket(username)]
+
+    def shard_for_id(self, user_id: int) -> str:
+        """Шард пользователя по id."""
+        return self.bucket_shards[get_id_bucket(user_id)]
+
+    def shard_chooser(self, mapper, instance, clause=None) -> str:
+        """Шард для сохранения объекта пользователя."""
+        if instance is not None and instance.id is not None:
+            return self.shard_for_id(instance.id)
+        if instance is not None and instance.name is not None:
+            return self.shard_for_name(instance.name)
+        raise ValueError('Can not choose shard without user')
+
+    def identity_chooser(self, mapper, primary_key, **kwargs) -> list[str]:
+        """Шард для session.get по id пользователя."""
+        return [self.shard_for_id(primary_key[0])]
+
+    def execute_chooser(self, orm_context) -> list[str]:
+        """Шарды для запроса без явного шарда - все шарды."""
+        return self.shard_ids
+
+    def _find_owner(self, point: int) -> str:
+        index = bisect.bisect(self._points, point) % len(self._points)
+        return self._owners[index]
+
+
+def get_moved_buckets(
+    old_ring: ShardRing,
+    new_ring: ShardRing,
+) -> dict[int, tuple]:
+    """Корзины, меняющие шард, с парой (старый шард, новый шард)."""
+    shard_pairs = zip(old_ring.bucket_shards, new_ring.bucket_shards)
+    return {
+        bucket: (old_shard, new_shard)
+        for bucket, (old_shard, new_shard) in enumerate(shard_pairs)
+        if old_shard != new_shard
+    }
+
+
+def get_shard_ring(session: AsyncSession) -> ShardRing | None:
+    """Кольцо шардов сессии, None без шардирования."""
+    return session.info.get(SHARD_RING)
+
+
+def route_by_name(
+    statement: StatementT,
+    session: AsyncSession,
+    username: str,
+) -> StatementT:
+    """Направление запроса на шард пользователя по имени."""
+    ring = get_shard_ring(session)
+    if ring is None:
+        return statement
+    return statement.options(  # type: ignore
+        set_shard_id(ring.shard_for_name(username)),
+    )
+
+
+def route_by_id(
+    statement: StatementT,
+    session: AsyncSession,
+    user_id: int,
+) -> StatementT:
+    """Направление запроса на шард пользователя по id."""
+    ring = get_shard_ring(session)
+    if ring is None:
+        return statement
+    return statement.options(  # type: ignore
+        set_shard_id(ring.shard_for_id(user_id)),
+    )
+
+
+def split_by_shard(
+    statement: StatementT,
+    session: AsyncSession,
+) -> list[StatementT]:
+    """Отдельный запрос на каждый шард."""
+    ring = get_shard_ring(session)
+    if ring is None:
+        return [statement]
+    return [
+        statement.options(set_shard_id(shard_id))  # type: ignore
+        for shard_id in ring.shard_ids
+    ]
+
+
+def new_user_values(session: AsyncSession, username: str) -> dict[str, Any]:
+    """Значения id нового пользователя, корзина записана в младших битах."""
+    if get_shard_ring(session) is None:
+        return {}
+    user_id: ColumnElement = (
+        user_id_sequence.next_value() * BUCKETS + get_name_bucket(username)
+    )
+    return {'id': user_id}
+
+
+def create_user_id_sequence(shard_index: int) -> Sequence:
+    """Последовательность id шарда, не пересекающаяся с другими шардами."""
+    return Sequence(
+        user_id_sequence.name,
+        schema=user_id_sequence.schema,
+        start=shard_index + 1,
+        increment=MAX_SHARDS,
+    )
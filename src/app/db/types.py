@@ -0,0 +1,36 @@
+from typing import Any, Iterable
+
+import numpy as np
+from sqlalchemy.types import LargeBinary, TypeDecorator
+
+# Little-endian float32 независимо от платформы
+VECTOR_DTYPE = np.dtype('<f4')
+
+
+def pack_vector(vector: Iterable[float] | np.ndarray) -> bytes:
+    """Упаковка вектора в байты float32."""
+    return np.asarray(vector, dtype=VECTOR_DTYPE).tobytes()
+
+
+def unpack_vector(packed: bytes) -> np.ndarray:
+    """Вектор поверх байтов из БД без копирования, только для чтения."""
+    return np.frombuffer(packed, dtype=VECTOR_DTYPE)
+
+
+class Float32Vector(TypeDecorator):
+    """Вектор float32, хранящийся в bytea."""
+
+    impl = LargeBinary
+    cache_ok = True
+
+    def process_bind_param(self, value: Any, dialect) -> bytes | None:
+        """Упаковка вектора перед записью в БД."""
+        if value is None:
+            return None
+        return pack_vector(value)
+
+    def process_result_value(self, value: Any, dialect) -> np.ndarray | None:
+        """Вектор из байтов, прочитанных из БД."""
+        if value is None:
+            return None
+        return unpack_vector(value)
@@ -0,0 +1,88 @@
+import asyncio
+from typing import Any, Callable, Hashable
+
+from opentracing import global_tracer
+from redis.asyncio import Redis
+from redis.exceptions import ConnectionError as RedisConnectionError
+from redis.exceptions import TimeoutError as RedisTimeoutError
+
+from app.cache import TTLCache
+from app.config import settings
+
+# Преобразование ключа из сообщения в ключ локального кеша
+KeyParser = Callable[[str], Hashable]
+
+
+class CacheInvalidator:
+    """Инвалидация локальных кешей экземпляров через Redis pub/sub."""
+
+    def __init__(self, client: Redis, instance_id: str) -> None:
+        self.client = client
+        self.instance_id = instance_id
+        self.caches: dict[str, tuple[TTLCache, KeyParser]] = {}
+
+    def add_cache(
+        self,
+        kind: str,
+        cache: TTLCache,
+        parse_key: KeyParser = str,
+    ) -> None:
+        """Регистрация локального кеша, инвалидируемого через pub/sub."""
+        self.caches[kind] = (cache, parse_key)
+
+    async def publish(self, kind: str, key: Any) -> None:
+        """Оповещение других экземпляров об изменении значения."""
+        await self.client.publish(
+            settings.redis_invalidation_channel,
+            f'{self.instance_id}:{kind}:{key}',
+        )
+
+    def handle(self, message: bytes | str) -> None:
+        """Удаление значения из локального кеша по сообщению.
+
+        Ошибочное сообщение в общем канале пропускается, иначе оно
+        остановило бы прослушивание и инвалидацию кешей экземпляра.
+        """
+        try:
+            self.invalidate(message)
+        except Exception as ex:
+            tracer = global_tracer()
+            with tracer.start_active_span('cache_invalidation') as scope:
+                scope.span.set_tag('error', str(ex))
+
+    def invalidate(self, message: bytes | str) -> None:
+        """Разбор сообщения и удаление значения из локального кеша."""
+        if isinstance(message, bytes):
+            message = message.decode()
+        instance_id, kind, key = message.split(':', 2)
+        if instance_id == self.instance_id:
+            return
+
+        cache_info = self.caches.get(kind)
+        if cache_info is not None:
+            cache, parse_key = cache_info
+            cache.pop(parse_key(key))
+
+    async def listen(self) -> None:
+        """Прослушивание сообщений об инвалидации кешей."""
+        # Прослушивание идёт до отмены задачи при закрытии клиента
+        while True:  # noqa: WPS457
+            try:
+                await self._listen()
+            except (RedisConnectionError, RedisTimeoutError, OSError):
+                await asyncio.sleep(settings.redis_reconnect_delay)
+
+    async def _listen(self) -> None:
+        async with self.client.pubsub() as pubsub:
+            await pubsub.subscribe(settings.redis_invalidation_channel)
+            # Пока подписки не было, сообщения могли быть пропущены
+            for cache, _ in self.caches.values():
+                cache.clear()
+
+            while True:  # noqa: WPS457
+                message = await pubsub.get_message(
+                    ignore_subscribe_messages=True,
+                    timeout=settings.redis_socket_timeout,
+                )
+                if message is not None:
+                    self.handle(message['data'])
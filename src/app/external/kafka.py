@@ -1,17 +1,60 @@
 import asyncio
+from functools import partial
 
-import aiofiles
 import brotli
 from aiokafka import AIOKafkaProducer
 from fastapi import HTTPException, UploadFile, status
-from opentracing import global_tracer
+from opentracing import Scope, global_tracer
 
+from app.backoff import Backoff
 from app.config import settings
+from app.external.kafka_publisher import KafkaPublisher, PublishQueueFullError
+from app.external.outbox import Outbox, OutboxJournal
+from app.photo_storage import PhotoStorage, StoredPhoto
+from app.uploads import UploadTooLargeError
 
 loop = asyncio.get_event_loop()
 producer = AIOKafkaProducer(
-    loop=loop, bootstrap_servers=settings.kafka_instance,
+    loop=loop,
+    bootstrap_servers=settings.kafka_instance,
+    linger_ms=settings.kafka_linger_ms,
+    max_batch_size=settings.kafka_max_batch_bytes,
+    compression_type=settings.kafka_compression_type,
 )
+publisher = KafkaPublisher(
+    producer,
+    topic=settings.kafka_producer_topic,
+    handoff_size=settings.kafka_handoff_size,
+    max_queue_size=settings.kafka_max_queue_size,
+    stop_timeout=settings.kafka_stop_timeout_seconds,
+)
+outbox = Outbox(
+    OutboxJournal(settings.kafka_outbox_path),
+    publisher,
+    batch_size=settings.kafka_outbox_batch_size,
+    backoff=Backoff(
+        settings.kafka_outbox_retry_min_seconds,
+        settings.kafka_outbox_retry_max_seconds,
+    ),
+    poll_interval=settings.kafka_outbox_poll_seconds,
+)
+background_tasks: set[asyncio.Task] = set()
+
+
+async def start_sending() -> None:
+    """Запуск отправки событий через журнал или сразу в Kafka."""
+    if settings.kafka_outbox_enabled:
+        await outbox.start()
+    else:
+        await publisher.start()
+
+
+async def stop_sending() -> None:
+    """Остановка отправки событий."""
+    if settings.kafka_outbox_enabled:
+        await outbox.stop()
+    else:
+        await publisher.stop()
 
 
 async def compress(message: str) -> bytes:
@@ -22,33 +65,85 @@ async def compress(message: str) -> bytes:
     )
 
 
+def mark_on_delivery(
+    storage: PhotoStorage,
+    user_id: int,
+    digest: str,
+    delivery: asyncio.Future,
+) -> None:
+    """Отметка об отправке фото после подтверждения брокером."""
+    if delivery.cancelled() or delivery.exception() is not None:
+        return
+    task = asyncio.create_task(storage.mark_submitted(user_id, digest))
+    background_tasks.add(task)
+    task.add_done_callback(background_tasks.discard)
+
+
+async def send_photo(
+    photo: StoredPhoto,
+    user_id: int,
+    storage: PhotoStorage,
+) -> None:
+    """Отправка события о фото и отметка об отправке."""
+    compressed_path = await compress(photo.path)
+    compressed_id = await compress(str(user_id))
+    if settings.kafka_outbox_enabled:
+        # Событие в журнале будет доставлено и после сбоя брокера
+        await outbox.append(compressed_id, compressed_path)
+    else:
+        delivery = publisher.publish(compressed_id, compressed_path)
+        if settings.kafka_publish_async:
+            delivery.add_done_callback(partial(
+                mark_on_delivery, storage, user_id, photo.digest,
+            ))
+            return
+        await delivery
+    await storage.mark_submitted(user_id, photo.digest)
+
+
+async def submit_photo(
+    user_photo: UploadFile,
+    user_id: int,
+    storage: PhotoStorage,
+    scope: Scope,
+) -> dict:
+    """Сохранение фото и отправка события о нём."""
+    photo = await storage.save(user_photo)
+    scope.span.set_tag('sha256', photo.digest)
+    if await storage.is_submitted(user_id, photo.digest):
+        scope.span.set_tag('info', 'Photo already submitted')
+        return {'message': 'File already submitted'}
+
+    await send_photo(photo, user_id, storage)
+    return {'message': 'File saved successfully'}
+
+
 async def verify_view(
     user_photo: UploadFile,
     user_id: int,
-    photo_dir: str = '/usr/photos',
+    storage: PhotoStorage,
 ) -> dict:
     """Подтверждение пользователя."""
     with global_tracer().start_active_span('verify_view') as scope:
         scope.span.set_tag('user_id', str(user_id))
-        file_path = f'{photo_dir}/{user_photo.filename}'
 
         try:
-            async with aiofiles.open(file_path, 'wb') as out_file:
-                file_content = await user_photo.read()
-                await out_file.write(file_content)
-
-                compressed_path = await compress(file_path)
-                compresed_id = await compress(str(user_id))
-                await producer.send_and_wait(
-                    topic=settings.kafka_producer_topic,
-                    key=compresed_id,
-                    value=compressed_path,
-                )
+            return await submit_photo(user_photo, user_id, storage, scope)
+        except UploadTooLargeError:
+            scope.span.set_tag('error', 'File too large')
+            raise HTTPException(
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                detail='File too large',
+            )
+        except PublishQueueFullError:
+            scope.span.set_tag('error', 'Kafka queue is full')
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail='Kafka queue is full',
+            )
         except Exception as ex:
             scope.span.set_tag('error', str(ex))
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail=str(ex),
             )
-
-        return {'message': 'File saved successfully'}
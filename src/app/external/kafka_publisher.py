@@ -0,0 +1,164 @@
+import asyncio
+import time
+from contextlib import suppress
+from typing import NamedTuple
+
+from aiokafka import AIOKafkaProducer
+from aiokafka.structs import RecordMetadata
+
+from app.external.prometheus.metrics_updaters import (
+    kafka_handoff_size_update,
+    kafka_in_flight_update,
+    kafka_send_latency_update,
+)
+
+
+class PublishQueueFullError(Exception):
+    """Очередь отправки в Kafka переполнена."""
+
+
+class PublishStoppedError(Exception):
+    """Отправка остановлена до подтверждения сообщения брокером."""
+
+
+class Message(NamedTuple):
+    """Сообщение в очереди отправки."""
+
+    key: bytes
+    value: bytes
+    future: asyncio.Future
+    enqueued_at: float
+
+
+def get_delivery_result(
+    delivery: asyncio.Future,
+) -> RecordMetadata | BaseException:
+    """Метаданные доставленного сообщения или ошибка доставки."""
+    if delivery.cancelled():
+        return asyncio.CancelledError()
+    return delivery.exception() or delivery.result()
+
+
+class KafkaPublisher:
+    """Отправка сообщений в Kafka без ожидания брокера.
+
+    publish кладёт сообщение в очередь и сразу возвращает future
+    с результатом доставки. Фоновая задача передаёт продюсеру всё,
+    что накопилось в очереди, но не больше handoff_size сообщений
+    за проход, и не ждёт подтверждений предыдущих сообщений. Пачки
+    Kafka по linger_ms и max_batch_size собирает сам продюсер.
+    """
+
+    def __init__(  # noqa: WPS211
+        self,
+        producer: AIOKafkaProducer,
+        topic: str,
+        handoff_size: int,
+        max_queue_size: int,
+        stop_timeout: float = 10,
+    ) -> None:
+        self.producer = producer
+        self.topic = topic
+        self.handoff_size = handoff_size
+        self.stop_timeout = stop_timeout
+        self.queue: asyncio.Queue[Message] = asyncio.Queue(max_queue_size)
+        # Сообщения в очереди и без подтверждения брокера
+        self.unconfirmed: set[Message] = set()
+        self._sender: asyncio.Task | None = None
+        self._deliveries: set[asyncio.Future] = set()
+
+    async def start(self) -> None:
+        """Запуск продюсера и фоновой отправки."""
+        await self.producer.start()
+        self._sender = asyncio.create_task(self.send_batches())
+
+    async def stop(self) -> None:
+        """Отправка накопленных сообщений не дольше stop_timeout.
+
+        Сообщения, не подтверждённые брокером за это время или так
+        и не отправленные, потому что продюсер не запустился,
+        завершаются ошибкой PublishStoppedError.
+        """
+        deadline = time.perf_counter() + self.stop_timeout
+        if self._sender is not None:
+            with suppress(asyncio.TimeoutError):
+                await asyncio.wait_for(self.queue.join(), self.stop_timeout)
+            self._sender.cancel()
+            self._sender = None
+        timeout = deadline - time.perf_counter()
+        if self._deliveries and timeout > 0:
+            await asyncio.wait(self._deliveries, timeout=timeout)
+
+        while not self.queue.empty():
+            self.queue.get_nowait()
+            self.queue.task_done()
+        for message in list(self.unconfirmed):
+            self.complete(message, PublishStoppedError())
+        await self.producer.stop()
+
+    def publish(self, key: bytes, value: bytes) -> asyncio.Future:
+        """Постановка сообщения в очередь, future завершится доставкой."""
+        message = Message(
+            key,
+            value,
+            asyncio.get_running_loop().create_future(),
+            time.perf_counter(),
+        )
+        # Между проверкой и put_nowait нет await, место не займут
+        if self.queue.full():
+            raise PublishQueueFullError
+        self.queue.put_nowait(message)
+        self.unconfirmed.add(message)
+        kafka_in_flight_update(len(self.unconfirmed))
+        return message.future
+
+    async def send_batches(self) -> None:
+        """Передача продюсеру всех накопленных в очереди сообщений."""
+        # Передача идёт до отмены задачи при остановке
+        while True:  # noqa: WPS457
+            handoff = [await self.queue.get()]
+            while len(handoff) < self.handoff_size and not self.queue.empty():
+                handoff.append(self.queue.get_nowait())
+
+            kafka_handoff_size_update(len(handoff))
+            for message in handoff:
+                await self.send(message)
+                self.queue.task_done()
+
+    async def send(self, message: Message) -> None:
+        """Передача сообщения продюсеру и отслеживание доставки."""
+        try:
+            delivery = await self.producer.send(
+                self.topic, key=message.key, value=message.value,
+            )
+        except Exception as ex:
+            self.complete(message, ex)
+            return
+
+        self._deliveries.add(delivery)
+        delivery.add_done_callback(self._deliveries.discard)
+        delivery.add_done_callback(
+            lambda done: self.complete(message, get_delivery_result(done)),
+        )
+
+    def complete(
+        self,
+        message: Message,
+        result: RecordMetadata | BaseException,
+    ) -> None:
+        """Завершение future сообщения и обновление метрик."""
+        if message not in self.unconfirmed:
+            # Уже завершено остановкой отправки
+            return
+        self.unconfirmed.discard(message)
+        is_error = isinstance(result, BaseException)
+        kafka_send_latency_update(
+            time.perf_counter() - message.enqueued_at, is_error=is_error,
+        )
+        kafka_in_flight_update(len(self.unconfirmed))
+        if message.future.done():
+            return
+        if is_error:
+            message.future.set_exception(result)
+        else:
+            message.future.set_result(result)
@@ -0,0 +1,219 @@
+import asyncio
+import sqlite3
+import threading
+import time
+from contextlib import suppress
+
+from opentracing import global_tracer
+
+from app.backoff import Backoff
+from app.external.kafka_publisher import KafkaPublisher, PublishQueueFullError
+from app.external.prometheus.metrics_updaters import (
+    outbox_backlog_update,
+    outbox_retry_update,
+)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS outbox (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    key BLOB NOT NULL,
+    value BLOB NOT NULL,
+    created_at REAL NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_attempt_at REAL NOT NULL DEFAULT 0
+)
+"""
+INSERT_EVENT = """
+INSERT INTO outbox (key, value, created_at) VALUES (?, ?, ?)
+"""
+SELECT_READY = """
+SELECT id, key, value, attempts FROM outbox
+WHERE next_attempt_at <= ? ORDER BY id LIMIT ?
+"""
+DELETE_SENT = 'DELETE FROM outbox WHERE id = ?'
+UPDATE_RETRY = """
+UPDATE outbox SET attempts = ?, next_attempt_at = ? WHERE id = ?
+"""
+SELECT_BACKLOG = 'SELECT count(*), min(created_at) FROM outbox'
+
+
+class OutboxJournal:
+    """Журнал событий в SQLite, доступный из потоков пула."""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.connection: sqlite3.Connection | None = None
+        self._lock = threading.Lock()
+
+    def open(self) -> None:
+        """Открытие журнала, синхронная запись на диск при каждом коммите."""
+        self.connection = sqlite3.connect(
+            self.path, isolation_level=None, check_same_thread=False,
+        )
+        self.connection.execute('PRAGMA journal_mode=WAL')
+        self.connection.execute('PRAGMA synchronous=FULL')
+        self.connection.execute(SCHEMA)
+
+    def close(self) -> None:
+        """Закрытие журнала."""
+        if self.connection is not None:
+            self.connection.close()
+            self.connection = None
+
+    def append(self, key: bytes, value: bytes) -> None:
+        """Запись события."""
+        with self._lock:
+            self.connection.execute(  # type: ignore
+                INSERT_EVENT, (key, value, time.time()),
+            )
+
+    def fetch_ready(self, limit: int) -> list[tuple]:
+        """События, время повтора которых наступило, по порядку записи."""
+        with self._lock:
+            return self.connection.execute(  # type: ignore
+                SELECT_READY, (time.time(), limit),
+            ).fetchall()
+
+    def complete(self, sent_ids: list[tuple], retries: list[tuple]) -> None:
+        """Удаление отправленных и перенос повторяемых событий."""
+        with self._lock:
+            connection: sqlite3.Connection = self.connection  # type: ignore
+            connection.execute('BEGIN')
+            connection.executemany(DELETE_SENT, sent_ids)
+            connection.executemany(UPDATE_RETRY, retries)
+            connection.execute('COMMIT')
+
+    def get_backlog(self) -> tuple[int, float | None]:
+        """Число событий и время записи самого старого из них."""
+        with self._lock:
+            return self.connection.execute(  # type: ignore
+                SELECT_BACKLOG,
+            ).fetchone()
+
+
+async def start_publisher(publisher: KafkaPublisher, backoff: Backoff) -> None:
+    """Запуск продюсера с повтором, пока брокер недоступен."""
+    attempts = 0
+    while True:
+        try:
+            return await publisher.start()
+        except Exception:
+            await asyncio.sleep(backoff.get_delay(attempts))
+            attempts += 1
+
+
+async def publish_events(
+    publisher: KafkaPublisher,
+    rows: list[tuple],
+) -> list[tuple[tuple, object]]:
+    """Отправка событий журнала, строки с результатами доставки.
+
+    Не поставленные в очередь события отправятся со следующей пачкой.
+    """
+    deliveries = []
+    for _, key, value_bytes, _ in rows:
+        try:
+            deliveries.append(publisher.publish(key, value_bytes))
+        except PublishQueueFullError:
+            break
+    results = await asyncio.gather(*deliveries, return_exceptions=True)
+    return list(zip(rows, results))
+
+
+async def wait_for_event(event: asyncio.Event, timeout: float) -> None:
+    """Ожидание события не дольше timeout секунд."""
+    with suppress(asyncio.TimeoutError):
+        await asyncio.wait_for(event.wait(), timeout)
+
+
+class Outbox:
+    """Журнал событий Kafka в SQLite с фоновой отправкой.
+
+    Запрос только дописывает событие в журнал, отправку пачками
+    выполняет фоновая задача. Недоставленные события повторяются
+    с экспоненциальной задержкой, поэтому доставка не меньше одного
+    раза, а порядок событий при повторах не сохраняется.
+    """
+
+    def __init__(  # noqa: WPS211
+        self,
+        journal: OutboxJournal,
+        publisher: KafkaPublisher,
+        batch_size: int,
+        backoff: Backoff,
+        poll_interval: float,
+    ) -> None:
+        self.journal = journal
+        self.publisher = publisher
+        self.batch_size = batch_size
+        self.backoff = backoff
+        self.poll_interval = poll_interval
+        self._appended = asyncio.Event()
+        self._flusher: asyncio.Task | None = None
+
+    async def start(self) -> None:
+        """Открытие журнала и запуск фоновой отправки."""
+        await asyncio.to_thread(self.journal.open)
+        self._flusher = asyncio.create_task(self.run())
+
+    async def stop(self) -> None:
+        """Остановка отправки, неотправленные события остаются в журнале."""
+        if self._flusher is not None:
+            self._flusher.cancel()
+            self._flusher = None
+        await self.publisher.stop()
+        await asyncio.to_thread(self.journal.close)
+
+    async def append(self, key: bytes, value: bytes) -> None:
+        """Запись события в журнал."""
+        await asyncio.to_thread(self.journal.append, key, value)
+        self._appended.set()
+
+    async def run(self) -> None:
+        """Запуск продюсера и отправка журнала до остановки."""
+        await start_publisher(self.publisher, self.backoff)
+        failures = 0
+        # Отправка идёт до отмены задачи при остановке
+        while True:  # noqa: WPS457
+            self._appended.clear()
+            try:
+                sent = await self.flush()
+            except Exception as ex:
+                # Ошибка журнала не должна останавливать отправку
+                with global_tracer().start_active_span('outbox') as scope:
+                    scope.span.set_tag('error', str(ex))
+                await asyncio.sleep(self.backoff.get_delay(failures))
+                failures += 1
+                continue
+            failures = 0
+            if sent < self.batch_size:
+                await wait_for_event(self._appended, self.poll_interval)
+
+    async def flush(self) -> int:
+        """Отправка пачки готовых событий и обновление метрик журнала."""
+        rows = await asyncio.to_thread(
+            self.journal.fetch_ready, self.batch_size,
+        )
+        delivered = await publish_events(self.publisher, rows)
+
+        sent_ids = []
+        retries = []
+        now = time.time()
+        for (event_id, _, _, attempts), result in delivered:
+            if isinstance(result, BaseException):
+                delay = self.backoff.get_delay(attempts)
+                retries.append((attempts + 1, now + delay, event_id))
+            else:
+                sent_ids.append((event_id,))
+        if delivered:
+            await asyncio.to_thread(self.journal.complete, sent_ids, retries)
+        if retries:
+            outbox_retry_update(len(retries))
+        await self.update_metrics()
+        return len(sent_ids)
+
+    async def update_metrics(self) -> None:
+        """Обновление метрик размера и возраста журнала."""
+        size, oldest = await asyncio.to_thread(self.journal.get_backlog)
+        oldest_age = 0 if oldest is None else time.time() - oldest
+        outbox_backlog_update(size, oldest_age)
@@ -23,3 +23,131 @@ AUTH_ATTEMPTS = Counter(
     documentation='Number of authentication attempts success/failure',
     labelnames=['outcome'],
 )
+HASH_QUEUE_DEPTH = Gauge(
+    name=f'{SERVICE_PREFIX}_hash_queue_depth',
+    documentation='Number of password hashing tasks queued or running',
+)
+HASH_WAIT_TIME = Histogram(
+    name=f'{SERVICE_PREFIX}_hash_wait_time',
+    documentation='Time password hashing tasks wait for a free worker',
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5),
+)
+HASH_REJECTED = Counter(
+    name=f'{SERVICE_PREFIX}_hash_rejected',
+    documentation='Number of password hashing tasks rejected by full queue',
+)
+HASH_ROUNDS = Gauge(
+    name=f'{SERVICE_PREFIX}_hash_rounds',
+    documentation='Current bcrypt work factor for new password hashes',
+)
+CACHE_REQUESTS = Counter(
+    name=f'{SERVICE_PREFIX}_cache_requests',
+    documentation='Number of in-process cache lookups hit/miss',
+    labelnames=['cache', 'result'],
+)
+CACHE_EVICTIONS = Counter(
+    name=f'{SERVICE_PREFIX}_cache_evictions',
+    documentation='Number of in-process cache entries removed',
+    labelnames=['cache', 'reason'],
+)
+USERNAME_FILTER_ITEMS = Gauge(
+    name=f'{SERVICE_PREFIX}_username_filter_items',
+    documentation='Number of usernames added to the Bloom filter',
+)
+USERNAME_FILTER_MEMORY = Gauge(
+    name=f'{SERVICE_PREFIX}_username_filter_memory_bytes',
+    documentation='Memory used by the username Bloom filter bits',
+)
+USERNAME_FILTER_ERROR_RATE = Gauge(
+    name=f'{SERVICE_PREFIX}_username_filter_error_rate',
+    documentation='Estimated false positive rate of the username Bloom filter',
+)
+USERNAME_FILTER_MISSES = Counter(
+    name=f'{SERVICE_PREFIX}_username_filter_misses',
+    documentation='Lookups answered by the username Bloom filter without DB',
+    labelnames=['operation'],
+)
+DB_QUERIES_SAVED = Counter(
+    name=f'{SERVICE_PREFIX}_db_queries_saved',
+    documentation='Number of DB queries avoided by answering from cache',
+    labelnames=['query'],
+)
+DB_POOL_CHECKED_OUT = Gauge(
+    name=f'{SERVICE_PREFIX}_db_pool_checked_out',
+    documentation='Number of DB connections checked out of the pool',
+    labelnames=['pool'],
+)
+DB_POOL_OVERFLOW = Gauge(
+    name=f'{SERVICE_PREFIX}_db_pool_overflow',
+    documentation='Number of DB connections opened above pool_size',
+    labelnames=['pool'],
+)
+DB_POOL_WAIT_TIME = Histogram(
+    name=f'{SERVICE_PREFIX}_db_pool_wait_time',
+    documentation='Time spent waiting for a DB connection from the pool',
+    labelnames=['pool'],
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 5, 30),
+)
+DB_CONNECTION_LIFETIME = Histogram(
+    name=f'{SERVICE_PREFIX}_db_connection_lifetime',
+    documentation='Lifetime of closed DB connections in seconds',
+    labelnames=['pool'],
+    buckets=(1, 10, 60, 300, 900, 1800, 3600, 7200, 21600, 86400),
+)
+DB_REPLICA_HEALTHY = Gauge(
+    name=f'{SERVICE_PREFIX}_db_replica_healthy',
+    documentation='Whether a DB read replica is used for queries',
+    labelnames=['replica'],
+)
+DB_READS = Counter(
+    name=f'{SERVICE_PREFIX}_db_reads',
+    documentation='Number of read-only DB queries by target database',
+    labelnames=['target'],
+)
+DB_READ_FALLBACKS = Counter(
+    name=f'{SERVICE_PREFIX}_db_read_fallbacks',
+    documentation='Number of replica reads repeated on the primary DB',
+    labelnames=['reason'],
+)
+VECTOR_INDEX_SIZE = Gauge(
+    name=f'{SERVICE_PREFIX}_vector_index_size',
+    documentation='Number of verification vectors in the search index',
+    labelnames=['kind'],
+)
+VECTOR_SEARCH_TIME = Histogram(
+    name=f'{SERVICE_PREFIX}_vector_search_time',
+    documentation='Time spent on a nearest verification vectors search',
+    labelnames=['kind'],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.5, 1),
+)
+VECTOR_INDEX_SKIPPED = Counter(
+    name=f'{SERVICE_PREFIX}_vector_index_skipped',
+    documentation='Number of verification vectors skipped for a dimension',
+)
+KAFKA_IN_FLIGHT = Gauge(
+    name=f'{SERVICE_PREFIX}_kafka_in_flight',
+    documentation='Number of Kafka messages queued or awaiting broker ack',
+)
+KAFKA_HANDOFF_SIZE = Histogram(
+    name=f'{SERVICE_PREFIX}_kafka_handoff_size',
+    documentation='Number of queued messages handed to the producer at once',
+    buckets=(1, 2, 5, 10, 25, 50, 100, 250, 500, 1000),
+)
+KAFKA_SEND_LATENCY = Histogram(
+    name=f'{SERVICE_PREFIX}_kafka_send_latency',
+    documentation='Time from enqueueing a Kafka message to broker ack',
+    labelnames=['result'],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30),
+)
+OUTBOX_BACKLOG = Gauge(
+    name=f'{SERVICE_PREFIX}_outbox_backlog',
+    documentation='Number of events in the local outbox not yet sent to Kafka',
+)
+OUTBOX_OLDEST_AGE = Gauge(
+    name=f'{SERVICE_PREFIX}_outbox_oldest_age_seconds',
+    documentation='Age of the oldest event in the local outbox',
+)
+OUTBOX_RETRIES = Counter(
+    name=f'{SERVICE_PREFIX}_outbox_retries',
+    documentation='Number of outbox events rescheduled after a failed send',
+)
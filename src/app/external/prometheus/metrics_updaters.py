@@ -2,9 +2,36 @@ from fastapi import status
 
 from app.external.prometheus.metrics import (
     AUTH_ATTEMPTS,
+    CACHE_EVICTIONS,
+    CACHE_REQUESTS,
+    DB_CONNECTION_LIFETIME,
+    DB_POOL_CHECKED_OUT,
+    DB_POOL_OVERFLOW,
+    DB_POOL_WAIT_TIME,
+    DB_QUERIES_SAVED,
+    DB_READ_FALLBACKS,
+    DB_READS,
+    DB_REPLICA_HEALTHY,
+    HASH_QUEUE_DEPTH,
+    HASH_REJECTED,
+    HASH_ROUNDS,
+    HASH_WAIT_TIME,
+    KAFKA_HANDOFF_SIZE,
+    KAFKA_IN_FLIGHT,
+    KAFKA_SEND_LATENCY,
+    OUTBOX_BACKLOG,
+    OUTBOX_OLDEST_AGE,
+    OUTBOX_RETRIES,
     READY_PROBE_STATUS,
     REQUEST_COUNT,
     REQUEST_DURATION,
+    USERNAME_FILTER_ERROR_RATE,
+    USERNAME_FILTER_ITEMS,
+    USERNAME_FILTER_MEMORY,
+    USERNAME_FILTER_MISSES,
+    VECTOR_INDEX_SIZE,
+    VECTOR_INDEX_SKIPPED,
+    VECTOR_SEARCH_TIME,
 )
 
 
@@ -47,3 +74,130 @@ def auth_attempts_update(status_code: int) -> None:
         AUTH_ATTEMPTS.labels(outcome='success').inc()
     else:
         AUTH_ATTEMPTS.labels(outcome='failure').inc()
+
+
+def hash_queue_depth_update(depth: int) -> None:
+    """Обновление метрики длины очереди хеширования."""
+    HASH_QUEUE_DEPTH.set(depth)
+
+
+def hash_wait_time_update(wait_time: float) -> None:
+    """Обновление метрики времени ожидания хеширования."""
+    HASH_WAIT_TIME.observe(wait_time)
+
+
+def hash_rejected_update() -> None:
+    """Обновление метрики отклонённых задач хеширования."""
+    HASH_REJECTED.inc()
+
+
+def hash_rounds_update(rounds: int) -> None:
+    """Обновление метрики стоимости хеширования."""
+    HASH_ROUNDS.set(rounds)
+
+
+def cache_request_update(cache: str, is_hit: bool) -> None:
+    """Обновление метрики обращений к кешу."""
+    CACHE_REQUESTS.labels(
+        cache=cache,
+        result='hit' if is_hit else 'miss',
+    ).inc()
+
+
+def cache_eviction_update(cache: str, reason: str) -> None:
+    """Обновление метрики вытеснения записей из кеша."""
+    CACHE_EVICTIONS.labels(cache=cache, reason=reason).inc()
+
+
+def username_filter_update(
+    items: int,
+    memory_bytes: int,
+    error_rate: float,
+) -> None:
+    """Обновление метрик фильтра Блума имён пользователей."""
+    USERNAME_FILTER_ITEMS.set(items)
+    USERNAME_FILTER_MEMORY.set(memory_bytes)
+    USERNAME_FILTER_ERROR_RATE.set(error_rate)
+
+
+def username_filter_miss_update(operation: str) -> None:
+    """Обновление метрики ответов фильтра Блума без обращения к БД."""
+    USERNAME_FILTER_MISSES.labels(operation=operation).inc()
+
+
+def db_query_saved_update(query: str) -> None:
+    """Обновление метрики запросов к БД, обслуженных из кеша."""
+    DB_QUERIES_SAVED.labels(query=query).inc()
+
+
+def db_pool_usage_update(pool: str, checked_out: int, overflow: int) -> None:
+    """Обновление метрик занятости пула соединений с БД."""
+    DB_POOL_CHECKED_OUT.labels(pool=pool).set(checked_out)
+    DB_POOL_OVERFLOW.labels(pool=pool).set(max(overflow, 0))
+
+
+def db_pool_wait_time_update(pool: str, wait_time: float) -> None:
+    """Обновление метрики ожидания соединения с БД."""
+    DB_POOL_WAIT_TIME.labels(pool=pool).observe(wait_time)
+
+
+def db_connection_lifetime_update(pool: str, lifetime: float) -> None:
+    """Обновление метрики времени жизни соединения с БД."""
+    DB_CONNECTION_LIFETIME.labels(pool=pool).observe(lifetime)
+
+
+def db_replica_health_update(replica: str, is_healthy: bool) -> None:
+    """Обновление метрики доступности реплики БД."""
+    DB_REPLICA_HEALTHY.labels(replica=replica).set(int(is_healthy))
+
+
+def db_read_update(target: str) -> None:
+    """Обновление метрики запросов на чтение к БД."""
+    DB_READS.labels(target=target).inc()
+
+
+def db_read_fallback_update(reason: str) -> None:
+    """Обновление метрики повторов чтения с реплики на основной БД."""
+    DB_READ_FALLBACKS.labels(reason=reason).inc()
+
+
+def vector_index_size_update(kind: str, size: int) -> None:
+    """Обновление метрики числа векторов в индексе."""
+    VECTOR_INDEX_SIZE.labels(kind=kind).set(size)
+
+
+def vector_index_skipped_update(skipped: int) -> None:
+    """Обновление метрики пропущенных векторов другой размерности."""
+    VECTOR_INDEX_SKIPPED.inc(skipped)
+
+
+def vector_search_time_update(kind: str, search_time: float) -> None:
+    """Обновление метрики времени поиска ближайших векторов."""
+    VECTOR_SEARCH_TIME.labels(kind=kind).observe(search_time)
+
+
+def kafka_in_flight_update(in_flight: int) -> None:
+    """Обновление метрики неподтверждённых сообщений Kafka."""
+    KAFKA_IN_FLIGHT.set(in_flight)
+
+
+def kafka_handoff_size_update(handoff_size: int) -> None:
+    """Обновление метрики числа сообщений, переданных продюсеру за проход."""
+    KAFKA_HANDOFF_SIZE.observe(handoff_size)
+
+
+def kafka_send_latency_update(latency: float, is_error: bool) -> None:
+    """Обновление метрики времени доставки сообщения Kafka."""
+    result = 'error' if is_error else 'success'
+    KAFKA_SEND_LATENCY.labels(result=result).observe(latency)
+
+
+def outbox_backlog_update(size: int, oldest_age: float) -> None:
+    """Обновление метрик размера и возраста журнала событий."""
+    OUTBOX_BACKLOG.set(size)
+    OUTBOX_OLDEST_AGE.set(oldest_age)
+
+
+def outbox_retry_update(retries: int) -> None:
+    """Обновление метрики повторных отправок событий журнала."""
+    OUTBOX_RETRIES.inc(retries)
@@ -1,36 +1,233 @@
-import redis
+import asyncio
+import hashlib
+import math
+import time
+import uuid
+from contextlib import suppress
+from typing import Any, NamedTuple
+
+from redis.asyncio import BlockingConnectionPool, Redis
+
+from app.cache import TTLCache
 from app.config import settings
+from app.external.cache_invalidation import CacheInvalidator
+from app.jwt_tokens.jwt_process import get_token_expiry
+
+
+class RedisPoolConfig(NamedTuple):
+    """Размер пула соединений с Redis и таймауты."""
+
+    max_connections: int = settings.redis_max_connections
+    pool_timeout: float = settings.redis_pool_timeout
+    socket_timeout: float = settings.redis_socket_timeout
+    connect_timeout: float = settings.redis_connect_timeout
 
 
 class BaseRedisClient:
     """Базовый класс для работы с Redis."""
 
-    def __init__(self, host, port, db_number) -> None:
-        self.client = redis.Redis(host=host, port=port, db=db_number)
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        db_number: int,
+        pool_config: RedisPoolConfig = RedisPoolConfig(),
+    ) -> None:
+        self.pool = BlockingConnectionPool(
+            host=host,
+            port=port,
+            db=db_number,
+            max_connections=pool_config.max_connections,
+            timeout=pool_config.pool_timeout,
+            socket_timeout=pool_config.socket_timeout,
+            socket_connect_timeout=pool_config.connect_timeout,
+        )
+        self.client = Redis(connection_pool=self.pool)
+        self.instance_id = uuid.uuid4().hex
+        self.invalidator = CacheInvalidator(self.client, self.instance_id)
+        self._listener: asyncio.Task | None = None
+
+    def open(self):
+        """Запуск прослушивания сообщений об инвалидации кешей."""
+        if self._listener is None:
+            self._listener = asyncio.create_task(self.invalidator.listen())
 
-    def close(self):
-        """Закрытие соединения с Redis."""
-        self.client.close()
+    async def close(self):
+        """Закрытие соединений с Redis."""
+        if self._listener is not None:
+            self._listener.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._listener
+            self._listener = None
 
-    def set(self, key, value):
-        """Установка значения по ключу."""
-        self.client.set(key, value)
+        await self.client.aclose()
+        await self.pool.disconnect()
 
-    def get(self, key):
+    async def set(self, key, value, ex: int | None = None):
+        """Установка значения по ключу с временем жизни в секундах."""
+        await self.client.set(key, value, ex=ex)
+
+    async def get(self, key):
         """Получение значения по ключу."""
-        return self.client.get(key)
+        return await self.client.get(key)
+
+    async def delete(self, key):
+        """Удаление значения по ключу."""
+        await self.client.delete(key)
+
+    async def get_memory_usage(self, pattern: str, sample_size: int) -> float:
+        """Средний объём памяти в байтах на ключ по выборке ключей."""
+        usages = []
+        async for key in self.client.scan_iter(match=pattern, count=1000):
+            usages.append(await self.client.memory_usage(key, samples=0))
+            if len(usages) >= sample_size:
+                break
+
+        if not usages:
+            return 0
+        return sum(usages) / len(usages)
+
+
+class RedisBitmap:
+    """Битовые строки в Redis, общие для экземпляров сервиса."""
+
+    def __init__(self, client: Redis) -> None:
+        self.client = client
+        self.instance_id = uuid.uuid4().hex
+
+    async def set_bits(self, key: str, positions: list[int]) -> None:
+        """Установка битов битовой строки одним запросом."""
+        async with self.client.pipeline(transaction=False) as pipe:
+            for position in positions:
+                pipe.setbit(key, position, 1)
+            await pipe.execute()
+
+    async def get_bits(
+        self,
+        key: str,
+        positions: list[int],
+    ) -> list[int] | None:
+        """Получение битов одним запросом, None если ключа нет."""
+        async with self.client.pipeline(transaction=False) as pipe:
+            pipe.exists(key)
+            for position in positions:
+                pipe.getbit(key, position)
+            is_key_exists, *bits = await pipe.execute()
+        return bits if is_key_exists else None
+
+    async def merge_bits(self, key: str, bits: bytes) -> None:
+        """Объединение битовой строки с ключом через OR."""
+        temp_key = f'{key}:merge:{self.instance_id}'
+        async with self.client.pipeline(transaction=True) as pipe:
+            pipe.set(temp_key, bits)
+            pipe.bitop('OR', key, key, temp_key)
+            pipe.delete(temp_key)
+            await pipe.execute()
+
+
+def token_key(user_id: int) -> str:
+    """Ключ токена пользователя."""
+    return f't:{user_id}'
+
+
+def refresh_token_key(refresh_token: str) -> str:
+    """Ключ refresh токена, сам токен в Redis не хранится."""
+    digest = hashlib.sha256(refresh_token.encode()).hexdigest()
+    return f'r:{digest}'
 
 
 class RedisClient(BaseRedisClient):
     """Класс для работы с Redis."""
 
-    def get_token(self, user_id: int):
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.token_cache: TTLCache[int, bytes | str] = TTLCache(
+            name='token',
+            max_size=settings.token_cache_max_size,
+            ttl=settings.token_cache_ttl_seconds,
+        )
+        self.invalidator.add_cache('token', self.token_cache, int)
+
+    async def get_token(self, user_id: int):
         """Получение токена."""
-        return self.get(f'user_id:{user_id}')
+        token = self.token_cache.get(user_id)
+        if token is not None:
+            return token
+
+        token = await self.get(token_key(user_id))
+        if token is not None:
+            self.token_cache.set(user_id, token, get_token_expiry(token))
+        return token
+
+    async def get_tokens(self, user_ids: list[int]) -> dict[int, Any]:
+        """Получение токенов нескольких пользователей одним запросом."""
+        tokens = {}
+        missed_ids = []
+        for user_id in user_ids:
+            token = self.token_cache.get(user_id)
+            if token is None:
+                missed_ids.append(user_id)
+            else:
+                tokens[user_id] = token
+
+        if not missed_ids:
+            return tokens
+
+        stored_tokens = await self.client.mget(
+            [token_key(missed_id) for missed_id in missed_ids],
+        )
+        for missed_id, stored_token in zip(missed_ids, stored_tokens):
+            if stored_token is not None:
+                tokens[missed_id] = stored_token
+                self.token_cache.set(
+                    missed_id, stored_token, get_token_expiry(stored_token),
+                )
+        return tokens
+
+    async def set_token(self, token: str, user_id: int):
+        """Установка токена."""
+        expire_at = get_token_expiry(token)
+        if expire_at is None:
+            ttl = settings.jwt_auth_token_expiry_minutes * 60
+        else:
+            ttl = math.ceil(expire_at - time.time())
+
+        if ttl > 0:
+            await self.set(token_key(user_id), token, ex=ttl)
+            self.token_cache.set(user_id, token, expire_at)
+        else:
+            await self.delete(token_key(user_id))
+            self.token_cache.pop(user_id)
+        await self.invalidator.publish('token', user_id)
+
+    async def set_refresh_token(
+        self,
+        refresh_token: str,
+        user_id: int,
+        username: str,
+    ) -> None:
+        """Сохранение refresh токена пользователя."""
+        await self.set(
+            refresh_token_key(refresh_token),
+            f'{user_id}:{username}',
+            ex=settings.jwt_refresh_token_expiry_days * 24 * 60 * 60,
+        )
+
+    async def pop_refresh_token(
+        self,
+        refresh_token: str,
+    ) -> tuple[int, str] | None:
+        """Получение и удаление refresh токена одной операцией."""
+        user_data = await self.client.getdel(refresh_token_key(refresh_token))
+        if user_data is None:
+            return None
+
+        user_id, username = user_data.decode().split(':', 1)
+        return int(user_id), username
 
-    def set_token(self, token: str, user_id: int):
-        """Установка id типа транзакции."""
-        self.set(f'user_id:{user_id}', token)
+    async def delete_refresh_token(self, refresh_token: str) -> None:
+        """Отзыв refresh токена."""
+        await self.delete(refresh_token_key(refresh_token))
 
 
 redis_client = RedisClient(
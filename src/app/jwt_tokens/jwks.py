@@ -0,0 +1,77 @@
+import base64
+import hashlib
+import json
+from functools import lru_cache
+from typing import Any
+
+from app.config import settings
+from app.jwt_tokens.keys import get_algorithm, load_key
+
+# Обязательные поля JWK для вычисления отпечатка по RFC 7638
+thumbprint_members: dict[str, tuple[str, ...]] = {
+    'RSA': ('e', 'kty', 'n'),
+    'EC': ('crv', 'kty', 'x', 'y'),
+    'OKP': ('crv', 'kty', 'x'),
+}
+
+
+def get_public_jwk(
+    key_pem: str,
+    algorithm: str = settings.crypto_algorithm,
+) -> dict:
+    """Публичная часть ключа в формате JWK."""
+    key = load_key(key_pem, algorithm)
+    jwk = get_algorithm(algorithm).to_jwk(key, as_dict=True)
+    return {
+        member: jwk[member]
+        for member in thumbprint_members[jwk['kty']]
+    }
+
+
+@lru_cache
+def get_key_id(
+    key_pem: str,
+    algorithm: str = settings.crypto_algorithm,
+) -> str:
+    """Идентификатор ключа (kid) - отпечаток JWK по RFC 7638."""
+    jwk = get_public_jwk(key_pem, algorithm)
+    canonical_jwk = json.dumps(jwk, separators=(',', ':'), sort_keys=True)
+    digest = hashlib.sha256(canonical_jwk.encode()).digest()
+    return base64.urlsafe_b64encode(digest).rstrip(b'=').decode()
+
+
+@lru_cache
+def get_public_keys(
+    algorithm: str = settings.crypto_algorithm,
+) -> dict[str, str]:
+    """PEM публичных ключей для проверки токенов по kid.
+
+    Кроме текущего ключа содержит выведенные из ротации ключи,
+    которыми ещё могут быть подписаны действующие токены.
+    """
+    public_keys = [settings.jwt_public, *settings.jwt_retired_public_keys]
+    return {
+        get_key_id(public_key, algorithm): public_key
+        for public_key in public_keys
+    }
+
+
+@lru_cache
+def get_verification_keys(
+    algorithm: str = settings.crypto_algorithm,
+) -> dict[str, Any]:
+    """Разобранные публичные ключи для проверки токенов по kid."""
+    return {
+        key_id: load_key(public_key, algorithm)
+        for key_id, public_key in get_public_keys(algorithm).items()
+    }
+
+
+def get_jwks(algorithm: str = settings.crypto_algorithm) -> dict:
+    """Набор публичных ключей сервиса в формате JWKS."""
+    keys = []
+    for key_id, public_key in get_public_keys(algorithm).items():
+        jwk = get_public_jwk(public_key, algorithm)
+        jwk.update(kid=key_id, alg=algorithm, use='sig')
+        keys.append(jwk)
+    return {'keys': keys}
@@ -1,30 +1,90 @@
+import hashlib
 from datetime import datetime, timedelta, timezone
+from typing import Any
 
 import jwt
 
+from app.cache import TTLCache
 from app.config import settings
 from app.db.models import User
+from app.db.queries import UserCredentials
+from app.jwt_tokens.jwks import get_key_id, get_verification_keys
+from app.jwt_tokens.keys import load_key
+
+decoded_tokens: TTLCache[bytes, dict] = TTLCache(
+    name='decoded_token',
+    max_size=settings.decoded_token_cache_max_size,
+    ttl=settings.decoded_token_cache_ttl_seconds,
+)
 
 
 def jwt_encode(
-    user: User,
+    user: User | UserCredentials,
     private_key: str = settings.jwt_private,
     algorithm: str = settings.crypto_algorithm,
     expire_minutes: int = settings.jwt_auth_token_expiry_minutes,
 ) -> str:
     """Создание токена."""
     to_encode = {'username': user.name}
+    if user.id is not None:
+        to_encode.update(sub=str(user.id))
     now = datetime.now(timezone.utc)
     expire = now + timedelta(minutes=expire_minutes)
 
     to_encode.update(exp=expire, iat=now)  # type: ignore
-    return jwt.encode(to_encode, private_key, algorithm=algorithm)
+    return jwt.encode(
+        to_encode,
+        load_key(private_key, algorithm),
+        algorithm=algorithm,
+        headers={'kid': get_key_id(private_key, algorithm)},
+    )
+
+
+def get_token_public_key(
+    token: str | bytes,
+    algorithm: str = settings.crypto_algorithm,
+) -> Any:
+    """Выбор публичного ключа для проверки токена по kid."""
+    key_id = jwt.get_unverified_header(token).get('kid')
+    if key_id is None:
+        return load_key(settings.jwt_public, algorithm)
+
+    public_key = get_verification_keys(algorithm).get(key_id)
+    if public_key is None:
+        raise jwt.InvalidTokenError(f'Unknown key id: {key_id}')
+    return public_key
 
 
 def jwt_decode(
     token: str | bytes,
-    public_key: str = settings.jwt_public,
+    public_key: str | None = None,
     algorithm: str = settings.crypto_algorithm,
 ) -> dict:
     """Расшифровка токена."""
-    return jwt.decode(token, public_key, algorithms=[algorithm])
+    if public_key is None:
+        verification_key = get_token_public_key(token, algorithm)
+    else:
+        verification_key = load_key(public_key, algorithm)
+    return jwt.decode(token, verification_key, algorithms=[algorithm])
+
+
+def jwt_decode_cached(token: str | bytes) -> dict:
+    """Расшифровка токена с запоминанием проверенных токенов до их exp."""
+    if isinstance(token, str):
+        token = token.encode()
+    token_digest = hashlib.sha256(token).digest()
+
+    claims = decoded_tokens.get(token_digest)
+    if claims is None:
+        claims = jwt_decode(token)
+        decoded_tokens.set(token_digest, claims, claims.get('exp'))
+    return dict(claims)
+
+
+def get_token_expiry(token: str | bytes) -> float | None:
+    """Получение времени истечения токена без проверки подписи."""
+    try:
+        claims = jwt.decode(token, options={'verify_signature': False})
+    except jwt.InvalidTokenError:
+        return None
+    return claims.get('exp')
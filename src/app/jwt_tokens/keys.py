@@ -0,0 +1,44 @@
+from functools import lru_cache
+from typing import Any, Callable
+
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec, ed25519, rsa
+from jwt.algorithms import get_default_algorithms
+
+supported_algorithms = ('RS256', 'ES256', 'EdDSA')
+
+key_factories: dict[str, Callable] = {
+    'RS256': lambda: rsa.generate_private_key(
+        public_exponent=65537, key_size=2048,  # noqa: WPS432
+    ),
+    'ES256': lambda: ec.generate_private_key(ec.SECP256R1()),
+    'EdDSA': ed25519.Ed25519PrivateKey.generate,
+}
+
+
+def generate_key_pair(algorithm: str) -> tuple[str, str]:
+    """Новая пара PEM ключей для алгоритма."""
+    private_key = key_factories[algorithm]()
+    private_pem = private_key.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption(),
+    ).decode()
+    public_pem = private_key.public_key().public_bytes(
+        serialization.Encoding.PEM,
+        serialization.PublicFormat.SubjectPublicKeyInfo,
+    ).decode()
+    return private_pem, public_pem
+
+
+def get_algorithm(algorithm: str) -> Any:
+    """Реализация алгоритма подписи из PyJWT."""
+    if algorithm not in supported_algorithms:
+        raise ValueError(f'Unsupported crypto algorithm: {algorithm}')
+    return get_default_algorithms()[algorithm]
+
+
+@lru_cache
+def load_key(key_pem: str, algorithm: str) -> Any:
+    """Объект ключа cryptography, PEM разбирается один раз."""
+    return get_algorithm(algorithm).prepare_key(key_pem)
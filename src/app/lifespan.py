@@ -0,0 +1,44 @@
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI
+
+from app.auth_service.password_hasher import password_hasher
+from app.auth_service.user_vector_index import user_vector_index
+from app.auth_service.username_filter import username_filter
+from app.config import settings
+from app.external.jaeger import initialize_jaeger_tracer
+from app.external.kafka import start_sending, stop_sending
+from app.external.redis_client import get_redis_client
+
+
+async def startup() -> None:
+    """Подключения и фоновые задачи при запуске приложения."""
+    initialize_jaeger_tracer()
+    if settings.hash_rounds is None:
+        await password_hasher.calibrate(
+            target_time=settings.hash_target_time_ms / 1000,
+            min_rounds=settings.hash_min_rounds,
+            max_rounds=settings.hash_max_rounds,
+        )
+    get_redis_client().open()
+    if settings.username_filter_enabled:
+        username_filter.start_loading()
+    if settings.vector_index_enabled:
+        user_vector_index.start_loading()
+    await start_sending()
+
+
+async def shutdown() -> None:
+    """Остановка фоновых задач и закрытие подключений."""
+    await stop_sending()
+    await user_vector_index.stop()
+    await get_redis_client().close()
+    password_hasher.shutdown()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Настройка при запуске и остановке приложения."""
+    await startup()
+    yield
+    await shutdown()
@@ -0,0 +1,118 @@
+import abc
+import asyncio
+import uuid
+from pathlib import Path
+from typing import NamedTuple
+
+from aiofiles import os as aio_os
+from fastapi import UploadFile
+
+from app.config import settings
+from app.uploads import save_upload
+
+# Уровни вложенных каталогов по два символа хеша, до 65536 каталогов
+FAN_OUT_LEVELS = 2
+FAN_OUT_CHARS = 2
+USER_DIRS = 1000
+
+
+async def touch(path: Path) -> None:
+    """Создание пустого файла, если его ещё нет."""
+    await asyncio.to_thread(path.touch, exist_ok=True)
+
+
+async def move_file(source: Path, target: Path) -> None:
+    """Перенос файла, если на месте target файла ещё нет."""
+    if await aio_os.path.exists(target):
+        await aio_os.remove(source)
+    else:
+        await aio_os.makedirs(target.parent, exist_ok=True)
+        await aio_os.replace(source, target)
+
+
+class StoredPhoto(NamedTuple):
+    """Сохранённое фото."""
+
+    path: str
+    digest: str
+
+
+class PhotoStorage(abc.ABC):
+    """Хранилище фото, адресуемых по sha256 содержимого."""
+
+    @abc.abstractmethod
+    async def save(self, upload: UploadFile) -> StoredPhoto:
+        """Сохранение фото, одинаковое содержимое хранится один раз."""
+
+    @abc.abstractmethod
+    async def is_submitted(self, user_id: int, digest: str) -> bool:
+        """Отправлялось ли фото пользователем на проверку."""
+
+    @abc.abstractmethod
+    async def mark_submitted(self, user_id: int, digest: str) -> None:
+        """Отметка об отправке фото пользователем на проверку."""
+
+
+class LocalPhotoStorage(PhotoStorage):
+    """Хранилище фото в локальной файловой системе.
+
+    Файл пишется во временный каталог на том же диске и переносится
+    на место переименованием, поэтому по пути хеша всегда лежит
+    полный файл. Отправленные пользователем фото отмечаются пустыми
+    файлами в каталоге пользователя.
+    """
+
+    def __init__(self, root: str) -> None:
+        self.root = Path(root)
+        self.tmp_dir = self.root / 'tmp'
+
+    def get_path(self, digest: str) -> Path:
+        """Путь к фото по хешу: ab/cd/abcd..."""
+        prefix_size = FAN_OUT_LEVELS * FAN_OUT_CHARS
+        fan_out = [
+            digest[start:start + FAN_OUT_CHARS]
+            for start in range(0, prefix_size, FAN_OUT_CHARS)
+        ]
+        return self.root.joinpath('photos', *fan_out, digest)
+
+    def get_mark_path(self, user_id: int, digest: str) -> Path:
+        """Путь к отметке об отправке фото пользователем."""
+        user_dir = user_id % USER_DIRS
+        return self.root.joinpath(
+            'users', f'{user_dir:03d}', str(user_id), digest,
+        )
+
+    async def save(self, upload: UploadFile) -> StoredPhoto:
+        """Запись во временный файл и перенос на путь хеша."""
+        await aio_os.makedirs(self.tmp_dir, exist_ok=True)
+        tmp_path = self.tmp_dir / uuid.uuid4().hex
+        digest = await save_upload(upload, str(tmp_path))
+
+        path = self.get_path(digest)
+        await move_file(tmp_path, path)
+        return StoredPhoto(str(path), digest)
+
+    async def is_submitted(self, user_id: int, digest: str) -> bool:
+        """Проверка наличия отметки в каталоге пользователя."""
+        return await aio_os.path.exists(
+            self.get_mark_path(user_id, digest),
+        )
+
+    async def mark_submitted(self, user_id: int, digest: str) -> None:
+        """Пустой файл отметки в каталоге пользователя."""
+        mark_path = self.get_mark_path(user_id, digest)
+        await aio_os.makedirs(mark_path.parent, exist_ok=True)
+        await touch(mark_path)
+
+
+photo_storage_backends: dict[str, type[PhotoStorage]] = {
+    'local': LocalPhotoStorage,
+}
+photo_storage = photo_storage_backends[settings.photo_storage_backend](
+    settings.photo_storage_dir,
+)
+
+
+def get_photo_storage() -> PhotoStorage:
+    """Получение хранилища фото."""
+    return photo_storage
@@ -0,0 +1,56 @@
+import asyncio
+import hashlib
+import os
+
+import aiofiles
+from fastapi import UploadFile
+
+from app.config import settings
+
+
+class UploadTooLargeError(Exception):
+    """Загруженный файл больше допустимого размера."""
+
+
+async def write_chunks(
+    upload: UploadFile,
+    file_path: str,
+    chunk_size: int,
+    max_size: int,
+) -> str:
+    """Запись загруженного файла на диск по частям, возвращает sha256."""
+    digest = hashlib.sha256()
+    size = 0
+    async with aiofiles.open(file_path, 'wb') as out_file:
+        while True:
+            chunk = await upload.read(chunk_size)
+            if not chunk:
+                break
+            size += len(chunk)
+            if size > max_size:
+                raise UploadTooLargeError
+            digest.update(chunk)
+            await out_file.write(chunk)
+    return digest.hexdigest()
+
+
+async def save_upload(
+    upload: UploadFile,
+    file_path: str,
+    chunk_size: int = settings.upload_chunk_size,
+    max_size: int = settings.upload_max_size,
+) -> str:
+    """Запись загруженного файла на диск по частям, возвращает sha256.
+
+    В памяти одновременно находится не больше одной части файла.
+    Недописанный файл удаляется, в том числе при отмене запроса.
+    """
+    if upload.size is not None and upload.size > max_size:
+        raise UploadTooLargeError
+
+    try:
+        return await write_chunks(upload, file_path, chunk_size, max_size)
+    except (Exception, asyncio.CancelledError):
+        if os.path.exists(file_path):
+            os.remove(file_path)
+        raise
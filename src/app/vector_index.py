@@ -0,0 +1,415 @@
+import json
+import math
+import shutil
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+
+from app.db.types import VECTOR_DTYPE
+
+ID_DTYPE = np.dtype('<i8')
+# Строк на одно перемножение матриц при обучении IVF, ограничивает память
+CHUNK_SIZE = 65536
+MIN_CAPACITY = 16
+# Для обучения достаточно выборки в несколько сотен точек на список
+SAMPLE_PER_LIST = 256
+KMEANS_ITERATIONS = 10
+KMEANS_SEED = 0
+
+
+def normalize(vector: np.ndarray) -> np.ndarray:
+    """Вектор единичной длины, скалярное произведение равно косинусу."""
+    vector = np.asarray(vector, dtype=VECTOR_DTYPE)
+    norm = np.linalg.norm(vector, axis=-1, keepdims=True)
+    return vector / np.where(norm == 0, 1, norm)
+
+
+def top_k(
+    ids: np.ndarray,
+    scores: np.ndarray,
+    limit: int,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Первые limit идентификаторов с наибольшей близостью по убыванию."""
+    limit = min(limit, len(scores))
+    if limit == 0:
+        return ids[:0], scores[:0]
+    best = np.argpartition(-scores, limit - 1)[:limit]
+    best = best[np.argsort(-scores[best], kind='stable')]
+    return ids[best], scores[best]
+
+
+def reserve(
+    ids: np.ndarray,
+    vectors: np.ndarray,
+    count: int,
+    size: int,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Массивы для записи ёмкостью не меньше size с первыми count строками.
+
+    Массивы из файла только для чтения, поэтому копируются даже
+    при достаточной ёмкости.
+    """
+    capacity = len(ids)
+    if size <= capacity and vectors.flags.writeable:
+        return ids, vectors
+    if size > capacity:
+        capacity = max(size, capacity * 2, MIN_CAPACITY)
+
+    new_ids = np.empty(capacity, dtype=ID_DTYPE)
+    new_vectors = np.empty((capacity, vectors.shape[1]), dtype=VECTOR_DTYPE)
+    np.copyto(new_ids[:count], ids[:count])
+    np.copyto(new_vectors[:count], vectors[:count])
+    return new_ids, new_vectors
+
+
+class BruteForceIndex:
+    """Точный поиск полным перебором по матрице нормированных векторов.
+
+    Матрица может быть отображённым в память файлом только для чтения,
+    при первом изменении она копируется в память с запасом по размеру.
+    """
+
+    kind = 'flat'
+
+    def __init__(
+        self,
+        dimension: int,
+        ids: np.ndarray | None = None,
+        vectors: np.ndarray | None = None,
+    ) -> None:
+        self.dimension = dimension
+        if ids is None or vectors is None:
+            ids = np.empty(0, dtype=ID_DTYPE)
+            vectors = np.empty((0, dimension), dtype=VECTOR_DTYPE)
+        self._ids = ids
+        self._vectors = vectors
+        self.count = len(ids)
+        user_ids = ids.tolist()
+        self.positions = dict(zip(user_ids, range(self.count)))
+
+    def __len__(self) -> int:
+        """Число векторов в индексе."""
+        return self.count
+
+    @property
+    def ids(self) -> np.ndarray:
+        """Идентификаторы векторов."""
+        return self._ids[:self.count]
+
+    @property
+    def vectors(self) -> np.ndarray:
+        """Нормированные векторы."""
+        return self._vectors[:self.count]
+
+    def add(self, user_id: int, vector: np.ndarray) -> None:
+        """Добавление или замена нормированного вектора."""
+        # Новый вектор записывается в конец, существующий на своё место
+        position = self.positions.setdefault(user_id, self.count)
+        ids, vectors = reserve(
+            self._ids, self._vectors, self.count, position + 1,
+        )
+        ids[position] = user_id
+        vectors[position] = vector
+        self._ids = ids
+        self._vectors = vectors
+        self.count = max(self.count, position + 1)
+
+    def remove(self, user_id: int) -> None:
+        """Удаление вектора, на его место переносится последний."""
+        position = self.positions.pop(user_id, None)
+        if position is None:
+            return
+
+        ids, vectors = reserve(self._ids, self._vectors, self.count, 0)
+        last = self.count - 1
+        if position != last:
+            last_id = int(ids[last])
+            ids[position] = last_id
+            vectors[position] = vectors[last]
+            self.positions[last_id] = position
+        self._ids = ids
+        self._vectors = vectors
+        self.count = last
+
+    def search(
+        self,
+        query: np.ndarray,
+        limit: int,
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Поиск limit ближайших по косинусу векторов к нормированному."""
+        return top_k(self.ids, self.vectors @ query, limit)
+
+
+class IVFIndex:
+    """Приближённый поиск по инвертированным спискам (IVF).
+
+    Векторы разбиты на списки по ближайшему центроиду k-means, запрос
+    перебирает только n_probe списков с ближайшими центроидами. Новые
+    векторы попадают в список ближайшего центроида без переобучения.
+    """
+
+    kind = 'ivf'
+
+    def __init__(
+        self,
+        centroids: np.ndarray,
+        lists: list[BruteForceIndex],
+        n_probe: int,
+    ) -> None:
+        self.dimension = centroids.shape[1]
+        self.centroids = centroids
+        self.lists = lists
+        self.n_probe = n_probe
+        self.list_numbers = {
+            user_id: number
+            for number, inverted_list in enumerate(lists)
+            for user_id in inverted_list.positions
+        }
+
+    def __len__(self) -> int:
+        """Число векторов в индексе."""
+        return len(self.list_numbers)
+
+    @property
+    def ids(self) -> np.ndarray:
+        """Идентификаторы векторов по порядку списков."""
+        return np.concatenate([
+            inverted_list.ids for inverted_list in self.lists
+        ])
+
+    @property
+    def vectors(self) -> np.ndarray:
+        """Нормированные векторы по порядку списков."""
+        return np.concatenate([
+            inverted_list.vectors for inverted_list in self.lists
+        ])
+
+    def add(self, user_id: int, vector: np.ndarray) -> None:
+        """Добавление или замена нормированного вектора."""
+        number = int(np.argmax(self.centroids @ vector))
+        old_number = self.list_numbers.get(user_id)
+        if old_number is not None and old_number != number:
+            self.lists[old_number].remove(user_id)
+        self.lists[number].add(user_id, vector)
+        self.list_numbers[user_id] = number
+
+    def remove(self, user_id: int) -> None:
+        """Удаление вектора."""
+        number = self.list_numbers.pop(user_id, None)
+        if number is not None:
+            self.lists[number].remove(user_id)
+
+    def search(
+        self,
+        query: np.ndarray,
+        limit: int,
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Приближённые limit ближайших по косинусу векторов."""
+        n_probe = min(self.n_probe, len(self.lists))
+        probes, _ = top_k(
+            np.arange(len(self.lists)), self.centroids @ query, n_probe,
+        )
+        found = [
+            self.lists[number].search(query, limit) for number in probes
+        ]
+        return top_k(
+            np.concatenate([ids for ids, _ in found]),
+            np.concatenate([scores for _, scores in found]),
+            limit,
+        )
+
+
+VectorIndex = BruteForceIndex | IVFIndex
+
+
+def assign(vectors: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+    """Номер ближайшего центроида для каждого вектора."""
+    assignment = np.empty(len(vectors), dtype=np.intp)
+    for start in range(0, len(vectors), CHUNK_SIZE):
+        chunk = vectors[start:start + CHUNK_SIZE]
+        np.argmax(
+            chunk @ centroids.T,
+            axis=1,
+            out=assignment[start:start + CHUNK_SIZE],
+        )
+    return assignment
+
+
+def train_ivf(  # noqa: WPS210
+    ids: np.ndarray,
+    vectors: np.ndarray,
+    n_lists: int,
+    n_probe: int,
+) -> IVFIndex:
+    """Обучение центроидов сферическим k-means и раскладка векторов."""
+    rng = np.random.default_rng(KMEANS_SEED)
+    n_lists = max(1, min(n_lists, len(vectors)))
+    sample_size = min(len(vectors), n_lists * SAMPLE_PER_LIST)
+    sample = vectors[rng.choice(len(vectors), sample_size, replace=False)]
+    centroids = sample[:n_lists].copy()
+
+    for _ in range(KMEANS_ITERATIONS):
+        assignment = assign(sample, centroids)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assignment, sample)
+        counts = np.bincount(assignment, minlength=n_lists)
+        # Пустые списки сохраняют прежний центроид
+        non_empty = counts > 0
+        centroids[non_empty] = normalize(sums[non_empty])
+
+    assignment = assign(vectors, centroids)
+    order = np.argsort(assignment, kind='stable')
+    offsets = np.searchsorted(assignment[order], np.arange(n_lists + 1))
+    return ivf_from_sorted(
+        centroids, ids[order], vectors[order], offsets, n_probe,
+    )
+
+
+def ivf_from_sorted(
+    centroids: np.ndarray,
+    ids: np.ndarray,
+    vectors: np.ndarray,
+    offsets: np.ndarray,
+    n_probe: int,
+) -> IVFIndex:
+    """IVF индекс из векторов, упорядоченных по номеру списка."""
+    lists = [
+        BruteForceIndex(
+            centroids.shape[1],
+            ids[start:end],
+            vectors[start:end],
+        )
+        for start, end in zip(offsets[:-1], offsets[1:])
+    ]
+    return IVFIndex(centroids, lists, n_probe)
+
+
+def list_offsets(index: IVFIndex) -> np.ndarray:
+    """Границы списков IVF индекса в его ids и vectors."""
+    sizes = [len(inverted_list) for inverted_list in index.lists]
+    return np.concatenate([[0], np.cumsum(sizes)]).astype(ID_DTYPE)
+
+
+def build_index(
+    ids: np.ndarray,
+    vectors: np.ndarray,
+    ivf_threshold: int,
+    ivf_lists: int | None = None,
+    ivf_probes: int = 8,
+) -> VectorIndex:
+    """Полный перебор для небольших наборов, IVF для больших."""
+    vectors = normalize(vectors)
+    ids = np.asarray(ids, dtype=ID_DTYPE)
+    if len(ids) < ivf_threshold:
+        return BruteForceIndex(vectors.shape[1], ids, vectors)
+    if ivf_lists is None:
+        ivf_lists = round(math.sqrt(len(ids)))
+    return train_ivf(ids, vectors, ivf_lists, ivf_probes)
+
+
+def write_index(index: VectorIndex, path: Path) -> None:
+    """Запись файлов .npy и описания индекса в каталог."""
+    meta = {'kind': index.kind, 'dimension': index.dimension}
+    np.save(path / 'ids.npy', index.ids)
+    np.save(path / 'vectors.npy', index.vectors)
+    if isinstance(index, IVFIndex):
+        meta['n_probe'] = index.n_probe
+        np.save(path / 'centroids.npy', index.centroids)
+        np.save(path / 'offsets.npy', list_offsets(index))
+    (path / 'meta.json').write_text(json.dumps(meta))
+
+
+def save_index(index: VectorIndex, path: Path) -> None:
+    """Сохранение индекса в каталог файлов .npy.
+
+    Каталог сначала пишется рядом и подменяет прежний переименованием,
+    поэтому при сбое на диске остаётся старый или новый индекс целиком.
+    """
+    tmp_path = path.with_name(f'{path.name}.tmp')
+    shutil.rmtree(tmp_path, ignore_errors=True)
+    tmp_path.mkdir(parents=True)
+    write_index(index, tmp_path)
+
+    old_path = path.with_name(f'{path.name}.old')
+    shutil.rmtree(old_path, ignore_errors=True)
+    if path.exists():
+        path.rename(old_path)
+    tmp_path.rename(path)
+    shutil.rmtree(old_path, ignore_errors=True)
+
+
+def load_index(path: Path) -> VectorIndex:
+    """Загрузка индекса, векторы отображаются в память без чтения."""
+    meta = json.loads((path / 'meta.json').read_text())
+    ids = np.load(path / 'ids.npy', mmap_mode='r')
+    vectors = np.load(path / 'vectors.npy', mmap_mode='r')
+    if meta['kind'] == IVFIndex.kind:
+        return ivf_from_sorted(
+            np.load(path / 'centroids.npy'),
+            ids,
+            vectors,
+            np.load(path / 'offsets.npy'),
+            meta['n_probe'],
+        )
+    return BruteForceIndex(meta['dimension'], ids, vectors)
+
+
+def load_fresh_index(path: Path, max_age: float) -> VectorIndex | None:
+    """Сохранённый индекс, если он есть и не старше max_age секунд."""
+    try:
+        saved_at = (path / 'meta.json').stat().st_mtime
+    except OSError:
+        return None
+    if time.time() - saved_at > max_age:
+        return None
+
+    try:
+        return load_index(path)
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+class LockedIndex:
+    """Индекс с блокировкой для поиска из потоков пула."""
+
+    def __init__(self, index: VectorIndex) -> None:
+        self.index = index
+        self.kind = index.kind
+        self.dimension = index.dimension
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        """Число векторов в индексе."""
+        return len(self.index)
+
+    def add(self, user_id: int, vector: np.ndarray) -> None:
+        """Добавление или замена вектора."""
+        vector = normalize(vector)
+        with self._lock:
+            self.index.add(user_id, vector)
+
+    def remove(self, user_id: int) -> None:
+        """Удаление вектора."""
+        with self._lock:
+            self.index.remove(user_id)
+
+    def search(
+        self,
+        query: np.ndarray,
+        limit: int,
+    ) -> list[tuple[int, float]]:
+        """Поиск limit ближайших пользователей с косинусной близостью."""
+        query = normalize(query)
+        with self._lock:
+            ids, scores = self.index.search(query, limit)
+        return [
+            (int(user_id), float(score))
+            for user_id, score in zip(ids, scores)
+        ]
+
+    def save(self, path: Path) -> None:
+        """Сохранение индекса."""
+        with self._lock:
+            save_index(self.index, path)
@@ -0,0 +1,44 @@
+import argparse
+import time
+from typing import Callable
+
+from app.db.models import User
+from app.jwt_tokens.jwt_process import jwt_decode, jwt_encode
+from app.jwt_tokens.keys import generate_key_pair, supported_algorithms
+
+
+def ops_per_second(func: Callable[[], object], iterations: int) -> float:
+    """Количество вызовов функции в секунду."""
+    start_time = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    return iterations / (time.perf_counter() - start_time)
+
+
+def run(iterations: int) -> None:
+    """Замер скорости подписи и проверки токенов для каждого алгоритма."""
+    user = User(id=1, name='user')
+    print(f'{"algorithm":<10}{"sign ops/s":>14}{"verify ops/s":>14}')
+    for algorithm in supported_algorithms:
+        private_pem, public_pem = generate_key_pair(algorithm)
+        token = jwt_encode(user, private_key=private_pem, algorithm=algorithm)
+        sign = ops_per_second(
+            lambda: jwt_encode(
+                user, private_key=private_pem, algorithm=algorithm,
+            ),
+            iterations,
+        )
+        verify = ops_per_second(
+            lambda: jwt_decode(
+                token, public_key=public_pem, algorithm=algorithm,
+            ),
+            iterations,
+        )
+        print(f'{algorithm:<10}{sign:>14.0f}{verify:>14.0f}')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--iterations', type=int, default=2000)
+    args = parser.parse_args()
+    run(args.iterations)
@@ -0,0 +1,107 @@
+import argparse
+import asyncio
+import time
+from typing import Callable
+
+from sqlalchemy import bindparam, select
+from sqlalchemy.dialects.postgresql import asyncpg
+
+from app.config import settings
+from app.db.db_helper import DatabaseHelper
+from app.db.models import User
+from app.db.queries import credentials_by_name, get_user_credentials
+
+dialect = asyncpg.dialect()
+
+
+def build_and_compile(username: str) -> None:
+    """Без кеша: построение и компиляция запроса на каждый вызов."""
+    select(User.id, User.name, User.password).where(
+        User.name == username,
+    ).compile(dialect=dialect)
+
+
+def build_cached(username: str) -> None:
+    """Кеш SQLAlchemy: запрос строится заново, компиляция из кеша."""
+    select(User.id, User.name, User.password).where(
+        User.name == bindparam('username'),
+    )._generate_cache_key()  # noqa: WPS437
+
+
+def prebuilt_cached(username: str) -> None:
+    """Заранее построенный запрос, компиляция из кеша."""
+    credentials_by_name._generate_cache_key()  # noqa: WPS437
+
+
+def measure(query: Callable[[str], None], iterations: int) -> float:
+    """Подготовленных запросов в секунду."""
+    start_time = time.perf_counter()
+    for index in range(iterations):
+        query(f'user_{index}')
+    return iterations / (time.perf_counter() - start_time)
+
+
+async def measure_db(
+    prepared_statement_cache_size: int,
+    usernames: list[str],
+    iterations: int,
+) -> float:
+    """Запросов учётных данных в секунду к БД."""
+    db_helper = DatabaseHelper(
+        url=settings.db_url,
+        pool_size=1,
+        prepared_statement_cache_size=prepared_statement_cache_size,
+    )
+    async with db_helper.session_factory() as session:
+        start_time = time.perf_counter()
+        for index in range(iterations):
+            await get_user_credentials(
+                usernames[index % len(usernames)], session,
+            )
+        lookups_per_second = iterations / (time.perf_counter() - start_time)
+    await db_helper.engine.dispose()
+    return lookups_per_second
+
+
+async def run_db(iterations: int) -> None:
+    """Сравнение запросов с подготовленными выражениями asyncpg и без."""
+    db_helper = DatabaseHelper(url=settings.db_url)
+    async with db_helper.session_factory() as session:
+        usernames = list(await session.scalars(
+            select(User.name).limit(1000),
+        ))
+    await db_helper.engine.dispose()
+    if not usernames:
+        print('No users in database')
+        return
+
+    for cache_size in (0, settings.db_prepared_statement_cache_size):
+        lookups_per_second = await measure_db(
+            cache_size, usernames, iterations,
+        )
+        print(
+            f'prepared_statement_cache_size={cache_size:<6}'
+            f'{lookups_per_second:>12.0f} lookups/s',
+        )
+
+
+def run(iterations: int) -> None:
+    """Сравнение подготовки запроса без кеша, с кешем и заранее."""
+    queries = {
+        'compile': build_and_compile,
+        'cached': build_cached,
+        'prebuilt': prebuilt_cached,
+    }
+    print(f'{"query":<10}{"queries/s":>12}')
+    for name, query in queries.items():
+        print(f'{name:<10}{measure(query, iterations):>12.0f}')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--iterations', type=int, default=20000)
+    parser.add_argument('--db', action='store_true')
+    args = parser.parse_args()
+    run(args.iterations)
+    if args.db:
+        asyncio.run(run_db(args.iterations))
@@ -0,0 +1,35 @@
+import argparse
+import asyncio
+
+from app.config import settings
+from app.external.redis_client import RedisClient
+
+USERS_PROJECTIONS = (1_000_000, 10_000_000, 50_000_000)
+BYTES_IN_GB = 1024 ** 3
+
+
+async def report(sample_size: int) -> None:
+    """Отчёт об объёме памяти Redis на одного пользователя с токеном."""
+    redis_client = RedisClient(
+        settings.redis_host,
+        settings.redis_port,
+        settings.redis_db_number,
+    )
+    try:
+        bytes_per_user = await redis_client.get_memory_usage(
+            't:*', sample_size,
+        )
+    finally:
+        await redis_client.close()
+
+    print(f'Bytes per cached user: {bytes_per_user:.0f}')
+    for users in USERS_PROJECTIONS:
+        total = bytes_per_user * users / BYTES_IN_GB
+        print(f'{users:>12,} users: {total:.2f} GB')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--sample-size', type=int, default=1000)
+    args = parser.parse_args()
+    asyncio.run(report(args.sample_size))
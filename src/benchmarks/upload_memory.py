@@ -0,0 +1,91 @@
+import argparse
+import asyncio
+import os
+import resource
+import subprocess  # noqa: S404
+import sys
+import tempfile
+import time
+
+import aiofiles
+from fastapi import UploadFile
+
+from app.config import settings
+from app.uploads import save_upload
+
+MB = 1024 * 1024
+
+
+async def read_all(upload: UploadFile, file_path: str) -> None:
+    """Прежний способ: весь файл читается в память одним вызовом."""
+    async with aiofiles.open(file_path, 'wb') as out_file:
+        await out_file.write(await upload.read())
+
+
+async def chunked(upload: UploadFile, file_path: str) -> None:
+    """Запись по частям с подсчётом sha256."""
+    await save_upload(upload, file_path, max_size=sys.maxsize)
+
+
+savers = {'read_all': read_all, 'chunked': chunked}
+
+
+def make_upload(size_mb: int) -> UploadFile:
+    """Загруженный файл на диске, как после разбора multipart."""
+    upload_file = tempfile.TemporaryFile()  # noqa: WPS515
+    chunk = os.urandom(MB)
+    for _ in range(size_mb):
+        upload_file.write(chunk)
+    upload_file.seek(0)
+    return UploadFile(file=upload_file, filename='photo.jpg')
+
+
+def get_max_rss_mb() -> float:
+    """Пиковый RSS процесса, на Linux ru_maxrss в КБ."""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+async def measure(mode: str, uploads: int, size_mb: int) -> None:
+    """Одновременная запись файлов и прирост пикового RSS."""
+    files = [make_upload(size_mb) for _ in range(uploads)]
+    with tempfile.TemporaryDirectory() as photo_dir:
+        rss_before = get_max_rss_mb()
+        start_time = time.perf_counter()
+        await asyncio.gather(*[
+            savers[mode](upload, f'{photo_dir}/{index}.jpg')
+            for index, upload in enumerate(files)
+        ])
+        total_time = time.perf_counter() - start_time
+        rss_growth = get_max_rss_mb() - rss_before
+    print(f'{mode:<10}{rss_growth:>16.1f}{total_time:>10.2f}')
+
+
+def run(uploads: int, size_mb: int) -> None:
+    """Каждый способ в отдельном процессе, так как пик RSS не сбросить."""
+    print(
+        f'{uploads} concurrent uploads of {size_mb} MB, '
+        f'chunk {settings.upload_chunk_size // 1024} KB',
+    )
+    print(f'{"mode":<10}{"peak RSS +MB":>16}{"time, s":>10}')
+    for mode in savers:
+        subprocess.run(  # noqa: S603
+            [
+                sys.executable, '-m', 'benchmarks.upload_memory',
+                '--mode', mode,
+                '--uploads', str(uploads),
+                '--size-mb', str(size_mb),
+            ],
+            check=True,
+        )
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--uploads', type=int, default=16)
+    parser.add_argument('--size-mb', type=int, default=8)
+    parser.add_argument('--mode', choices=list(savers))
+    args = parser.parse_args()
+    if args.mode is None:
+        run(args.uploads, args.size_mb)
+    else:
+        asyncio.run(measure(args.mode, args.uploads, args.size_mb))
@@ -0,0 +1,78 @@
+import argparse
+import asyncio
+import time
+import tracemalloc
+from typing import Any, Awaitable, Callable
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.db_helper import db_helper
+from app.db.models import User
+from app.db.queries import get_user_credentials
+
+Lookup = Callable[[str, AsyncSession], Awaitable[Any]]
+
+
+async def orm_lookup(username: str, session: AsyncSession) -> User | None:
+    """Прежний путь: полная ORM сущность пользователя."""
+    founded_user = await session.execute(
+        select(User).where(User.name == username),
+    )
+    return founded_user.scalar()
+
+
+async def measure(
+    lookup: Lookup,
+    usernames: list[str],
+    iterations: int,
+) -> tuple[float, float]:
+    """Запросов в секунду и пик памяти, выделенной на один запрос."""
+    async with db_helper.session_factory() as session:
+        start_time = time.perf_counter()
+        for index in range(iterations):
+            await lookup(usernames[index % len(usernames)], session)
+            session.expunge_all()
+        lookups_per_second = iterations / (time.perf_counter() - start_time)
+
+        tracemalloc.start()
+        allocated = 0
+        for index in range(iterations):
+            current, _ = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+            await lookup(usernames[index % len(usernames)], session)
+            allocated += tracemalloc.get_traced_memory()[1] - current
+            session.expunge_all()
+        tracemalloc.stop()
+    return lookups_per_second, allocated / iterations
+
+
+async def run(iterations: int, users: int) -> None:
+    """Сравнение ORM и Core запросов учётных данных пользователя."""
+    async with db_helper.session_factory() as session:
+        usernames = list(await session.scalars(
+            select(User.name).limit(users),
+        ))
+    if not usernames:
+        print('No users in database')
+        return
+
+    lookups: dict[str, Lookup] = {
+        'orm': orm_lookup,
+        'core': get_user_credentials,
+    }
+    print(f'{"query":<8}{"lookups/s":>12}{"peak bytes":>16}')
+    for name, lookup in lookups.items():
+        lookups_per_second, allocated = await measure(
+            lookup, usernames, iterations,
+        )
+        print(f'{name:<8}{lookups_per_second:>12.0f}{allocated:>16.0f}')
+    await db_helper.engine.dispose()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--iterations', type=int, default=5000)
+    parser.add_argument('--users', type=int, default=1000)
+    args = parser.parse_args()
+    asyncio.run(run(args.iterations, args.users))
@@ -0,0 +1,91 @@
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+from app.vector_index import (
+    BruteForceIndex,
+    IVFIndex,
+    load_index,
+    normalize,
+    save_index,
+)
+
+CLUSTERS = 1000
+K = 10
+
+
+def make_vectors(
+    size: int,
+    dimension: int,
+    queries: int,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Векторы с кластерами, как у нескольких фото одного лица."""
+    rng = np.random.default_rng(0)
+    centers = rng.normal(size=(CLUSTERS, dimension))
+    labels = rng.integers(0, CLUSTERS, size)
+    vectors = centers[labels] + rng.normal(scale=1.0, size=(size, dimension))
+    query_vectors = vectors[rng.choice(size, queries, replace=False)]
+    query_vectors = query_vectors + rng.normal(
+        scale=0.1, size=query_vectors.shape,
+    )
+    return normalize(vectors), normalize(query_vectors)
+
+
+def measure(
+    index: BruteForceIndex | IVFIndex,
+    queries: np.ndarray,
+    expected: list[set],
+) -> tuple[float, float]:
+    """Средняя доля найденных точных соседей и время запроса в мс."""
+    found = 0
+    start_time = time.perf_counter()
+    for query, expected_ids in zip(queries, expected):
+        ids, _ = index.search(query, K)
+        found += len(expected_ids.intersection(ids.tolist()))
+    search_time = (time.perf_counter() - start_time) / len(queries)
+    return found / (K * len(queries)), search_time * 1000
+
+
+def run(size: int, dimension: int, queries: int, lists: int) -> None:
+    """Сравнение полного перебора и IVF по полноте и задержке."""
+    vectors, query_vectors = make_vectors(size, dimension, queries)
+    ids = np.arange(size)
+
+    flat = BruteForceIndex(dimension, ids, vectors)
+    expected = [
+        set(flat.search(query, K)[0].tolist()) for query in query_vectors
+    ]
+    start_time = time.perf_counter()
+    ivf = IVFIndex.train(ids, vectors, lists, n_probe=1)
+    print(f'IVF training with {lists} lists: '
+          f'{time.perf_counter() - start_time:.1f} s')
+
+    print(f'{"index":<14}{"recall@10":>10}{"ms/query":>10}')
+    recall, search_time = measure(flat, query_vectors, expected)
+    print(f'{"flat":<14}{recall:>10.3f}{search_time:>10.2f}')
+    for n_probe in (1, 2, 4, 8, 16, 32, 64):
+        ivf.n_probe = n_probe
+        recall, search_time = measure(ivf, query_vectors, expected)
+        name = f'ivf probe={n_probe}'
+        print(f'{name:<14}{recall:>10.3f}{search_time:>10.2f}')
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = Path(tmp_dir) / 'index'
+        save_index(ivf, path)
+        start_time = time.perf_counter()
+        load_index(path)
+        print(f'Load from memory-mapped file: '
+              f'{(time.perf_counter() - start_time) * 1000:.0f} ms')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--size', type=int, default=200000)
+    parser.add_argument('--dimension', type=int, default=128)
+    parser.add_argument('--queries', type=int, default=200)
+    parser.add_argument('--lists', type=int, default=447)
+    args = parser.parse_args()
+    run(args.size, args.dimension, args.queries, args.lists)
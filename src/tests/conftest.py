@@ -1,11 +1,14 @@
 import asyncio
+import io
 from typing import AsyncGenerator
 from unittest.mock import Mock
 
 import pytest
 import pytest_asyncio
+from fastapi import UploadFile
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.auth_service.credentials import user_credentials
 from app.db.db_helper import DatabaseHelper, db_helper
 from app.db.models import BaseTable
 from app.main import app
@@ -30,6 +33,7 @@ async def reset_db():
     yield
     async with test_db_helper.engine.begin() as conn:
         await conn.run_sync(BaseTable.metadata.drop_all)
+    user_credentials.clear()
 
 
 @pytest.fixture(scope='session')
@@ -48,15 +52,41 @@ def db_helper():
 def get_redis_mock() -> Mock:
     redis_cashe: dict[str, str] = {}
 
-    def get_token(user_id: int):
+    async def get_token(user_id: int):
         return redis_cashe.get(f'user_id:{user_id}', None)
 
-    def set_token(token: str, user_id: int):
+    async def set_token(token: str, user_id: int):
         redis_cashe[f'user_id:{user_id}'] = token
 
+    async def get_tokens(user_ids: list[int]):
+        tokens = {
+            user_id: redis_cashe.get(f'user_id:{user_id}')
+            for user_id in user_ids
+        }
+        return {
+            user_id: token
+            for user_id, token in tokens.items()
+            if token is not None
+        }
+
+    async def set_refresh_token(
+        refresh_token: str, user_id: int, username: str,
+    ):
+        redis_cashe[f'refresh:{refresh_token}'] = (user_id, username)
+
+    async def pop_refresh_token(refresh_token: str):
+        return redis_cashe.pop(f'refresh:{refresh_token}', None)
+
+    async def delete_refresh_token(refresh_token: str):
+        redis_cashe.pop(f'refresh:{refresh_token}', None)
+
     redis_client = Mock()
     redis_client.get_token = get_token
+    redis_client.get_tokens = get_tokens
     redis_client.set_token = set_token
+    redis_client.set_refresh_token = set_refresh_token
+    redis_client.pop_refresh_token = pop_refresh_token
+    redis_client.delete_refresh_token = delete_refresh_token
 
     redis_client.get_cache = lambda: redis_cashe
 
@@ -68,5 +98,9 @@ def redis_mock() -> Mock:
     return get_redis_mock()
 
 
-rm = get_redis_mock()
-rm.set_token('token', 1)
+def make_upload(
+    data: bytes = b'photo',
+    filename: str = 'photo.jpg',
+    size: int | None = None,
+) -> UploadFile:
+    return UploadFile(file=io.BytesIO(data), filename=filename, size=size)
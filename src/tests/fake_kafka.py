@@ -0,0 +1,74 @@
+import asyncio
+from pathlib import Path
+
+from aiokafka.structs import RecordMetadata
+
+from app.backoff import Backoff
+from app.external.kafka_publisher import KafkaPublisher
+from app.external.outbox import Outbox, OutboxJournal
+
+# Задержка повторов и проверки новых событий журнала
+RETRY_DELAY = 0.01
+FAST_BACKOFF = Backoff(RETRY_DELAY, RETRY_DELAY)
+
+
+class FakeKafkaProducer:
+    """Продюсер Kafka в памяти с задержкой и ошибками брокера."""
+
+    def __init__(self, latency: float = 0) -> None:
+        """Продюсер, подтверждающий отправку через latency секунд."""
+        self.latency = latency
+        self.messages: list[tuple[str, bytes, bytes]] = []
+        self.errors: list[Exception] = []
+        self.start_errors: list[Exception] = []
+        self.is_started = False
+
+    async def start(self) -> None:
+        if self.start_errors:
+            raise self.start_errors.pop(0)
+        self.is_started = True
+
+    async def stop(self) -> None:
+        self.is_started = False
+
+    async def send(self, topic, value=None, key=None) -> asyncio.Future:
+        delivery = asyncio.get_running_loop().create_future()
+        error = self.errors.pop(0) if self.errors else None
+        asyncio.get_running_loop().call_later(
+            self.latency, self.deliver, delivery, topic, key, value, error,
+        )
+        return delivery
+
+    async def send_and_wait(self, topic, value=None, key=None):
+        return await (await self.send(topic, value, key))
+
+    def deliver(self, delivery, topic, key, value, error) -> None:
+        if error is not None:
+            delivery.set_exception(error)
+            return
+        self.messages.append((topic, key, value))
+        delivery.set_result(RecordMetadata(
+            topic=topic,
+            partition=0,
+            topic_partition=None,
+            offset=len(self.messages) - 1,
+            timestamp=None,
+            timestamp_type=0,
+            log_start_offset=None,
+        ))
+
+
+def make_outbox(
+    path: Path,
+    publisher: KafkaPublisher,
+    batch_size: int = 2,
+    backoff: Backoff = FAST_BACKOFF,
+) -> Outbox:
+    """Журнал событий с частой проверкой новых событий."""
+    return Outbox(
+        OutboxJournal(str(path)),
+        publisher,
+        batch_size=batch_size,
+        backoff=backoff,
+        poll_interval=RETRY_DELAY,
+    )
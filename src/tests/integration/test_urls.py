@@ -2,7 +2,7 @@ import pytest
 from fastapi import status
 from sqlalchemy import select
 
-from app.auth_service.views import verify_password
+from app.auth_service.password_hasher import verify_password
 from app.db.models import User
 from app.jwt_tokens.jwt_process import jwt_decode, jwt_encode
 
@@ -0,0 +1,73 @@
+from unittest.mock import AsyncMock
+
+import pytest
+
+from app.auth_service import credentials
+from app.auth_service.credentials import (
+    found_user,
+    found_user_credentials,
+    invalidate_credentials,
+    user_credentials,
+)
+from app.db.models import User
+from app.db.queries import UserCredentials
+
+
+@pytest.fixture
+def credentials_cache():
+    user_credentials.clear()
+    yield user_credentials
+    user_credentials.clear()
+
+
+@pytest.mark.asyncio
+@pytest.mark.usefixtures('reset_db')
+async def test_found_user(db_helper):
+    async with db_helper.session_factory() as session:
+        assert await found_user('user_1', session) is None
+
+        user = User(name='user_1', password=b'password_1')
+        session.add(user)
+        await session.commit()
+
+        assert await found_user('user_1', session) == UserCredentials(
+            user.id, 'user_1', b'password_1',
+        )
+
+
+@pytest.mark.asyncio
+@pytest.mark.usefixtures('reset_db')
+async def test_found_user_credentials(db_helper, credentials_cache):
+    async with db_helper.session_factory() as session:
+        assert await found_user_credentials('user_1', session) is None
+
+        user = User(name='user_1', password=b'password_1')
+        session.add(user)
+        await session.commit()
+
+        user_out = await found_user_credentials('user_1', session)
+
+    assert user_out == UserCredentials(user.id, 'user_1', b'password_1')
+    assert credentials_cache.get('user_1') == user_out
+
+
+@pytest.mark.asyncio
+async def test_found_user_credentials_from_cache(credentials_cache):
+    user = UserCredentials(1, 'user_1', b'password_1')
+    credentials_cache.set('user_1', user)
+
+    assert await found_user_credentials('user_1', session=None) == user
+
+
+@pytest.mark.asyncio
+async def test_invalidate_credentials(monkeypatch, credentials_cache):
+    redis_mock = AsyncMock()
+    monkeypatch.setattr(credentials, 'get_redis_client', lambda: redis_mock)
+    credentials_cache.set('user_1', UserCredentials(1, 'user_1'))
+
+    await invalidate_credentials('user_1')
+
+    assert credentials_cache.get('user_1') is None
+    redis_mock.invalidator.publish.assert_awaited_once_with(
+        'credentials', 'user_1',
+    )
@@ -0,0 +1,123 @@
+import asyncio
+import threading
+
+import pytest
+from fastapi import HTTPException, status
+
+from app.auth_service import password_hasher as password_hasher_module
+from app.auth_service.password_hasher import (
+    DEFAULT_ROUNDS,
+    PasswordHasher,
+    get_password_rounds,
+    hash_password,
+    needs_rehash,
+    verify_password,
+)
+from app.config import settings
+
+# Время на запуск задач в пуле потоков
+START_DELAY = 0.01
+# Минимальная стоимость bcrypt, чтобы тест не тратил время
+MIN_ROUNDS = 4
+# Соль и хеш bcrypt после стоимости
+SALT_AND_HASH = hash_password('password', MIN_ROUNDS).split(b'$')[-1]
+
+
+def make_hash(rounds):
+    return f'$2b${rounds:02d}$'.encode() + SALT_AND_HASH
+
+
+@pytest.mark.parametrize('password, confirm_password, is_verified', [
+    pytest.param('password', 'password', True, id='same_password'),
+    pytest.param('password', 'wrong_password', False, id='wrong_password'),
+    pytest.param('sdf231#&*!', 'sdf231#&*!', True, id='strong_password'),
+])
+def test_hash_and_verify_password(password, confirm_password, is_verified):
+    hashed_password = hash_password(password, MIN_ROUNDS)
+
+    assert verify_password(confirm_password, hashed_password) == is_verified
+
+
+@pytest.mark.parametrize('hashed_password, rounds', [
+    pytest.param(
+        hash_password('password', MIN_ROUNDS), MIN_ROUNDS, id='bcrypt_hash',
+    ),
+    pytest.param(
+        make_hash(DEFAULT_ROUNDS + 1), DEFAULT_ROUNDS + 1, id='other_rounds',
+    ),
+    pytest.param(b'password', None, id='not_bcrypt_hash'),
+])
+def test_get_password_rounds(hashed_password, rounds):
+    assert get_password_rounds(hashed_password) == rounds
+
+
+@pytest.mark.parametrize('rounds, hash_rounds, expected', [
+    pytest.param(DEFAULT_ROUNDS - 2, None, True, id='calibrated_higher'),
+    pytest.param(DEFAULT_ROUNDS, None, False, id='calibrated_same'),
+    pytest.param(DEFAULT_ROUNDS + 1, None, False, id='calibrated_lower'),
+    pytest.param(DEFAULT_ROUNDS + 1, DEFAULT_ROUNDS, True, id='pinned_lower'),
+    pytest.param(DEFAULT_ROUNDS, DEFAULT_ROUNDS, False, id='pinned_same'),
+])
+def test_needs_rehash(rounds, hash_rounds, expected, monkeypatch):
+    monkeypatch.setattr(settings, 'hash_rounds', hash_rounds)
+    monkeypatch.setattr(
+        password_hasher_module.password_hasher, 'rounds', DEFAULT_ROUNDS,
+    )
+
+    assert needs_rehash(make_hash(rounds)) == expected
+
+
+@pytest.fixture
+def hasher():
+    password_hasher = PasswordHasher(
+        executor_type='thread', max_workers=1, max_queue_size=1,
+    )
+    yield password_hasher
+    password_hasher.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_run(hasher):
+    result = await hasher.run(pow, 2, 10)
+
+    assert result == 1024
+    assert hasher.pending == 0
+
+
+@pytest.mark.asyncio
+async def test_run_queue_full(hasher):
+    release = threading.Event()
+    running = [
+        asyncio.ensure_future(hasher.run(release.wait))
+        for _ in range(2)
+    ]
+    await asyncio.sleep(START_DELAY)
+
+    with pytest.raises(HTTPException) as ex:
+        await hasher.run(release.wait)
+
+    release.set()
+    await asyncio.gather(*running)
+
+    assert ex.value.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+    assert ex.value.detail == 'Too many password hashing requests'
+    assert hasher.pending == 0
+
+
+@pytest.mark.parametrize('target_time, rounds', [
+    pytest.param(0, 4, id='min_rounds'),
+    pytest.param(1000, 6, id='max_rounds'),
+])
+@pytest.mark.asyncio
+async def test_calibrate(hasher, target_time, rounds):
+    calibrated_rounds = await hasher.calibrate(
+        target_time=target_time, min_rounds=4, max_rounds=6,
+    )
+
+    assert calibrated_rounds == rounds
+    assert hasher.rounds == rounds
+
+
+def test_unknown_executor_type():
+    with pytest.raises(ValueError):
+        PasswordHasher(executor_type='gpu', max_workers=1, max_queue_size=1)
@@ -0,0 +1,49 @@
+from unittest.mock import AsyncMock
+
+import pytest
+from fastapi import HTTPException, status
+
+from app.auth_service import similar_users
+from app.auth_service.schemas import SimilarUsersSchema
+from app.auth_service.similar_users import similar_users_view
+from app.auth_service.user_vector_index import IndexNotLoadedError
+
+
+@pytest.mark.parametrize('search, status_code', [
+    pytest.param(
+        IndexNotLoadedError(),
+        status.HTTP_503_SERVICE_UNAVAILABLE,
+        id='not_loaded',
+    ),
+    pytest.param(
+        ValueError('Vector dimension must be 2'),
+        status.HTTP_422_UNPROCESSABLE_ENTITY,
+        id='wrong_dimension',
+    ),
+])
+@pytest.mark.asyncio
+async def test_similar_users_view_fail(search, status_code, monkeypatch):
+    monkeypatch.setattr(
+        similar_users.user_vector_index,
+        'search',
+        AsyncMock(side_effect=search),
+    )
+
+    with pytest.raises(HTTPException) as ex:
+        await similar_users_view(SimilarUsersSchema(vector=[1, 0, 0]))
+
+    assert ex.value.status_code == status_code
+
+
+@pytest.mark.asyncio
+async def test_similar_users_view(monkeypatch):
+    search = AsyncMock(return_value=[(2, 0.9), (1, 0.5)])
+    monkeypatch.setattr(similar_users.user_vector_index, 'search', search)
+
+    query = SimilarUsersSchema(vector=[1, 0], limit=2)
+
+    result = await similar_users_view(query)
+
+    search.assert_awaited_once_with([1, 0], 2)
+    assert [user.user_id for user in result.users] == [2, 1]
+    assert [user.score for user in result.users] == [0.9, 0.5]
@@ -0,0 +1,230 @@
+import jwt
+import pytest
+from fastapi import HTTPException, status
+from fastapi.security import HTTPAuthorizationCredentials
+
+from app.auth_service.schemas import (
+    RefreshTokenSchema,
+    TokenBatchSchema,
+    TokenStatus,
+)
+from app.auth_service.token_views import (
+    check_token_status,
+    check_tokens_view,
+    create_refresh_token,
+    get_token,
+    refresh_view,
+    revoke_view,
+    token_pair_view,
+    validate_bearer_token,
+    validate_token,
+)
+from app.config import settings
+from app.db.models import User
+from app.jwt_tokens.jwt_process import jwt_decode, jwt_encode
+from app.jwt_tokens.keys import load_key
+
+
+@pytest.mark.parametrize('token, token_status', [
+    pytest.param(
+        jwt_encode(User(name='user_1')), TokenStatus.valid, id='valid',
+    ),
+    pytest.param(
+        jwt_encode(User(name='user_1'), expire_minutes=0),
+        TokenStatus.expired,
+        id='expired',
+    ),
+    pytest.param('invalid', TokenStatus.invalid, id='invalid'),
+])
+def test_check_token_status(token, token_status):
+    assert check_token_status(token) == token_status
+
+
+@pytest.mark.asyncio
+@pytest.mark.usefixtures('reset_db')
+async def test_check_tokens_view(db_helper, redis_mock):
+    users = [
+        User(name=f'user_{i}', password=b'password') for i in range(3)
+    ]
+    async with db_helper.session_factory() as session:
+        session.add_all(users)
+        await session.commit()
+
+        await redis_mock.set_token(jwt_encode(users[0]), users[0].id)
+        await redis_mock.set_token(
+            jwt_encode(users[1], expire_minutes=0), users[1].id,
+        )
+        await redis_mock.set_token('token', 100)
+
+        result = await check_tokens_view(
+            TokenBatchSchema(
+                user_ids=[user.id for user in users] + [100],
+                tokens=[jwt_encode(users[0]), 'invalid'],
+            ),
+            redis_mock,
+            session,
+        )
+
+    assert result.users == {
+        users[0].id: TokenStatus.valid,
+        users[1].id: TokenStatus.expired,
+        users[2].id: TokenStatus.not_found,
+        100: TokenStatus.not_found,
+    }
+    assert result.tokens == [TokenStatus.valid, TokenStatus.invalid]
+
+
+@pytest.mark.asyncio
+async def test_validate_token_success():
+    user = User(name='user_1', password=b'password_1')
+    token = jwt_encode(user)
+
+    await validate_token(token)
+
+
+@pytest.mark.asyncio
+async def test_validate_token_invalid():
+    with pytest.raises(HTTPException) as ex:
+        await validate_token('invalid')
+
+    assert ex.value.status_code == status.HTTP_401_UNAUTHORIZED
+    assert ex.value.detail == 'invalid token'
+
+
+@pytest.mark.asyncio
+async def test_validate_token_expired():
+    user = User(name='user_1', password=b'password_1')
+    token = jwt_encode(user, expire_minutes=0)
+
+    with pytest.raises(HTTPException) as ex:
+        await validate_token(token)
+
+    assert ex.value.status_code == status.HTTP_401_UNAUTHORIZED
+    assert ex.value.detail == 'token expired'
+
+
+@pytest.mark.asyncio
+async def test_get_token(redis_mock):
+    await redis_mock.set_token('token', 1)
+
+    token = await get_token(user_id=1, redis_client=redis_mock)
+
+    assert token == 'token'
+
+
+@pytest.mark.asyncio
+async def test_get_token_no_token(redis_mock):
+    with pytest.raises(HTTPException) as ex:
+        await get_token(user_id=1, redis_client=redis_mock)
+
+    assert ex.value.status_code == status.HTTP_404_NOT_FOUND
+    assert ex.value.detail == 'Token not found'
+
+
+def sign_claims(claims):
+    """Токен с произвольными claims, подписанный ключом сервиса."""
+    return jwt.encode(
+        claims,
+        load_key(settings.jwt_private, settings.crypto_algorithm),
+        algorithm=settings.crypto_algorithm,
+    )
+
+
+@pytest.mark.asyncio
+async def test_validate_bearer_token_success():
+    token = jwt_encode(User(id=1, name='user_1'))
+
+    claims = await validate_bearer_token(
+        HTTPAuthorizationCredentials(scheme='Bearer', credentials=token),
+    )
+
+    assert claims.user_id == 1
+    assert claims.username == 'user_1'
+
+
+@pytest.mark.parametrize('token, detail', [
+    pytest.param(
+        jwt_encode(User(id=1, name='user_1'), expire_minutes=0),
+        'token expired',
+        id='expired',
+    ),
+    pytest.param('invalid', 'invalid token', id='invalid'),
+    pytest.param(
+        jwt_encode(User(name='user_1')), 'invalid token', id='no_user_id',
+    ),
+    pytest.param(
+        sign_claims({'sub': 1, 'username': 'user_1'}),
+        'invalid token',
+        id='int_user_id',
+    ),
+    pytest.param(
+        sign_claims({'sub': '1'}), 'invalid token', id='no_username',
+    ),
+])
+@pytest.mark.asyncio
+async def test_validate_bearer_token_fail(token, detail):
+    with pytest.raises(HTTPException) as ex:
+        await validate_bearer_token(
+            HTTPAuthorizationCredentials(scheme='Bearer', credentials=token),
+        )
+
+    assert ex.value.status_code == status.HTTP_401_UNAUTHORIZED
+    assert ex.value.detail == detail
+
+
+@pytest.mark.asyncio
+async def test_token_pair_view(redis_mock):
+    user = User(id=1, name='user_1', password=b'password_1')
+
+    token_pair = await token_pair_view(user, redis_mock)
+
+    assert jwt_decode(token_pair.access_token)['sub'] == '1'
+    assert await redis_mock.pop_refresh_token(
+        token_pair.refresh_token,
+    ) == (1, 'user_1')
+
+
+@pytest.mark.asyncio
+async def test_refresh_view(redis_mock):
+    user = User(id=1, name='user_1', password=b'password_1')
+    refresh_token = await create_refresh_token(user, redis_mock)
+
+    token_pair = await refresh_view(
+        RefreshTokenSchema(refresh_token=refresh_token), redis_mock,
+    )
+
+    decoded_token = jwt_decode(token_pair.access_token)
+    assert decoded_token['sub'] == '1'
+    assert decoded_token['username'] == 'user_1'
+    assert await redis_mock.get_token(1) == token_pair.access_token
+    assert token_pair.refresh_token != refresh_token
+
+
+@pytest.mark.asyncio
+async def test_refresh_view_reused(redis_mock):
+    user = User(id=1, name='user_1', password=b'password_1')
+    refresh_in = RefreshTokenSchema(
+        refresh_token=await create_refresh_token(user, redis_mock),
+    )
+    await refresh_view(refresh_in, redis_mock)
+
+    with pytest.raises(HTTPException) as ex:
+        await refresh_view(refresh_in, redis_mock)
+
+    assert ex.value.status_code == status.HTTP_401_UNAUTHORIZED
+    assert ex.value.detail == 'invalid refresh token'
+
+
+@pytest.mark.asyncio
+async def test_refresh_view_revoked(redis_mock):
+    user = User(id=1, name='user_1', password=b'password_1')
+    refresh_in = RefreshTokenSchema(
+        refresh_token=await create_refresh_token(user, redis_mock),
+    )
+
+    await revoke_view(refresh_in, redis_mock)
+
+    with pytest.raises(HTTPException) as ex:
+        await refresh_view(refresh_in, redis_mock)
+
+    assert ex.value.status_code == status.HTTP_401_UNAUTHORIZED
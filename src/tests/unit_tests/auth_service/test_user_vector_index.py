@@ -0,0 +1,264 @@
+import asyncio
+
+import numpy as np
+import pytest
+from prometheus_client import REGISTRY
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import Session
+
+from app.auth_service import user_vector_index as user_vector_index_module
+from app.auth_service.user_vector_index import (
+    IndexNotLoadedError,
+    UserVectorIndex,
+)
+from app.auth_service.user_vector_store import UserVectorStore
+from app.backoff import Backoff
+from app.db.models import Base, User
+from app.vector_index import build_index, save_index
+
+# Косинус между векторами [1, 0] и [1, 0.1]
+NEAR_SCORE = 0.995
+SCORE_TOLERANCE = 1e-3
+REFRESH_INTERVAL = 0.01
+REFRESH_WAITS = 100
+
+
+@pytest.fixture
+def saved_index_path(tmp_path):
+    path = tmp_path / 'index'
+    user_ids = np.array([1, 2])
+    vectors = np.array([[1, 0], [0, 1]])
+    save_index(build_index(user_ids, vectors, ivf_threshold=10), path)
+    return path
+
+
+@pytest.fixture
+def db_vectors():
+    return {1: [1, 0], 2: [0, 1]}
+
+
+def make_vector_index(path, db_vectors, max_age=60, backoff=None):
+    """Индекс, читающий векторы пользователей из словаря вместо БД."""
+    store = UserVectorStore(path, ivf_threshold=10, max_age=max_age)
+
+    async def stream_rows(db_request):
+        for user_id, vector in db_vectors.items():
+            if len(db_request.selected_columns) == 1:
+                yield (user_id,)
+            else:
+                yield (user_id, np.array(vector, dtype=np.float32))
+
+    store.stream_rows = stream_rows
+    if backoff is None:
+        return UserVectorIndex(store)
+    return UserVectorIndex(store, backoff)
+
+
+@pytest.fixture
+def vector_index(saved_index_path, db_vectors):
+    return make_vector_index(saved_index_path, db_vectors)
+
+
+@pytest.mark.asyncio
+async def test_search_not_loaded(vector_index):
+    with pytest.raises(IndexNotLoadedError):
+        await vector_index.search([1, 0], 1)
+
+
+@pytest.mark.asyncio
+async def test_search(vector_index):
+    await vector_index.load()
+
+    found = await vector_index.search([1, 0.1], 2)
+
+    assert [user_id for user_id, _ in found] == [1, 2]
+    assert found[0][1] == pytest.approx(NEAR_SCORE, abs=SCORE_TOLERANCE)
+
+
+@pytest.mark.asyncio
+async def test_search_wrong_dimension(vector_index):
+    await vector_index.load()
+
+    with pytest.raises(ValueError):
+        await vector_index.search([1, 0, 0], 1)
+
+
+@pytest.mark.asyncio
+async def test_updates_during_loading(vector_index, monkeypatch):
+    loaded = asyncio.Event()
+    read_or_build = vector_index.store.read_or_build
+
+    async def slow_read_or_build(scope):
+        await loaded.wait()
+        return await read_or_build(scope)
+
+    monkeypatch.setattr(
+        vector_index.store, 'read_or_build', slow_read_or_build,
+    )
+    loader = asyncio.create_task(vector_index.load())
+    await asyncio.sleep(0)
+
+    vector_index.update(3, [1, 1])
+    vector_index.update(1, None)
+    loaded.set()
+    await loader
+
+    found = await vector_index.search([1, 0], 5)
+    assert [user_id for user_id, _ in found] == [3, 2]
+
+
+@pytest.mark.asyncio
+async def test_load_without_vectors(tmp_path):
+    vector_index = make_vector_index(tmp_path / 'index', {})
+    await vector_index.load()
+
+    assert not await vector_index.search([1, 0], 1)
+    vector_index.update(1, [1, 0])
+    assert await vector_index.search([1, 0], 1) == [(1, 1)]
+
+
+@pytest.mark.asyncio
+async def test_save(vector_index, saved_index_path, db_vectors):
+    await vector_index.load()
+    vector_index.update(3, [1, 1])
+    db_vectors[3] = [1, 1]
+
+    await vector_index.stop()
+
+    reloaded = make_vector_index(saved_index_path, db_vectors)
+    await reloaded.load()
+    assert len(reloaded.index) == 3
+
+
+@pytest.mark.asyncio
+async def test_load_reconciles_saved_index(saved_index_path, db_vectors):
+    # Пользователь 3 верифицирован другим сервисом, 1 удалён
+    db_vectors[3] = [1, 1]
+    db_vectors.pop(1)
+    vector_index = make_vector_index(saved_index_path, db_vectors)
+
+    await vector_index.load()
+
+    found = await vector_index.search([1, 0], 5)
+    assert [user_id for user_id, _ in found] == [3, 2]
+
+
+@pytest.mark.asyncio
+async def test_load_rebuilds_stale_index(saved_index_path, db_vectors):
+    db_vectors[1] = [0, 1]
+    vector_index = make_vector_index(saved_index_path, db_vectors, max_age=0)
+
+    await vector_index.load()
+
+    found = await vector_index.search([0, 1], 1)
+    assert found[0] == (1, pytest.approx(1))
+
+
+@pytest.mark.asyncio
+async def test_load_retries(tmp_path, db_vectors):
+    vector_index = make_vector_index(
+        tmp_path / 'index', db_vectors, backoff=Backoff(0, 0),
+    )
+    stream_rows = vector_index.store.stream_rows
+    errors = [OSError('DB is down')]
+
+    async def failing_stream_rows(db_request):
+        if errors:
+            raise errors.pop()
+        async for row in stream_rows(db_request):
+            yield row
+
+    vector_index.store.stream_rows = failing_stream_rows
+    await vector_index.load()
+
+    assert vector_index.is_loaded
+    assert len(vector_index.index) == 2
+
+
+@pytest.mark.asyncio
+async def test_build_skips_other_dimension(tmp_path, db_vectors):
+    skipped = 'lebedev_auth_vector_index_skipped_total'
+    skipped_before = REGISTRY.get_sample_value(skipped) or 0
+    db_vectors[3] = [1, 0, 0]
+    vector_index = make_vector_index(tmp_path / 'index', db_vectors)
+
+    await vector_index.load()
+
+    assert vector_index.is_loaded
+    assert vector_index.index.dimension == 2
+    assert len(vector_index.index) == 2
+    assert REGISTRY.get_sample_value(skipped) - skipped_before == 1
+
+
+@pytest.mark.asyncio
+async def test_refresh_applies_external_writes(vector_index, db_vectors):
+    vector_index.refresh_interval = REFRESH_INTERVAL
+    vector_index.start_loading()
+    db_vectors[3] = [1, 1]
+    db_vectors.pop(1)
+
+    for _ in range(REFRESH_WAITS):
+        await asyncio.sleep(REFRESH_INTERVAL)
+        if vector_index.is_loaded and 3 in vector_index.index.index.ids:
+            break
+
+    found = await vector_index.search([1, 0], 5)
+    assert [user_id for user_id, _ in found] == [3, 2]
+    await vector_index.stop()
+
+
+@pytest.mark.asyncio
+async def test_refresh_builds_missing_index(tmp_path):
+    db_vectors = {}
+    vector_index = make_vector_index(tmp_path / 'index', db_vectors)
+    await vector_index.load()
+    assert vector_index.index is None
+
+    db_vectors[1] = [1, 0]
+    await vector_index.refresh()
+
+    found = await vector_index.search([1, 0], 1)
+    assert found == [(1, pytest.approx(1))]
+
+
+@pytest.fixture
+def sqlite_session():
+    engine = create_engine('sqlite://')
+
+    schema = User.__table__.schema
+
+    @event.listens_for(engine, 'connect')
+    def attach_schema(dbapi_connection, connection_record):
+        dbapi_connection.execute(f"ATTACH DATABASE ':memory:' AS {schema}")
+
+    Base.metadata.create_all(engine, tables=[User.__table__])
+    with Session(engine) as session:
+        yield session
+    engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_session_events(vector_index, sqlite_session, monkeypatch):
+    await vector_index.load()
+    monkeypatch.setattr(
+        user_vector_index_module, 'user_vector_index', vector_index,
+    )
+
+    sqlite_session.add(
+        User(id=3, name='user_3', password=b'', verification_vector=[1, 1]),
+    )
+    sqlite_session.flush()
+    assert len(vector_index.index) == 2
+    sqlite_session.commit()
+    assert len(vector_index.index) == 3
+
+    user = sqlite_session.get(User, 3)
+    user.verification_vector = [2, 0]
+    sqlite_session.flush()
+    sqlite_session.rollback()
+    found = await vector_index.search([1, 1], 1)
+    assert found[0][0] == 3
+
+    sqlite_session.delete(sqlite_session.get(User, 3))
+    sqlite_session.commit()
+    assert len(vector_index.index) == 2
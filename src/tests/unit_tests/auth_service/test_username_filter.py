@@ -0,0 +1,74 @@
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+from redis.exceptions import RedisError
+
+from app.auth_service.username_filter import UsernameFilter
+from app.bloom_filter import BloomFilter
+
+ERROR_RATE = 0.01
+# Семь битов имени и бит отметки о полной загрузке общего фильтра
+INCOMPLETE_BITS = (1, 1, 1, 1, 1, 1, 1, 0)
+ALL_BITS = (1, 1, 1, 1, 1, 1, 1, 1)
+MISSING_BITS = (1, 0, 1, 1, 1, 1, 1, 1)
+
+
+def make_filter(shared_client=None, is_loaded=True):
+    username_filter = UsernameFilter(
+        bloom=BloomFilter(capacity=100, error_rate=ERROR_RATE),
+        shared_client=shared_client,
+        redis_key='usernames',
+    )
+    username_filter.is_loaded = is_loaded
+    return username_filter
+
+
+@pytest.mark.parametrize('is_loaded, username, might_exist', [
+    pytest.param(False, 'user_2', True, id='not_loaded'),
+    pytest.param(True, 'user_1', True, id='added'),
+    pytest.param(True, 'user_2', False, id='not_added'),
+])
+@pytest.mark.asyncio
+async def test_might_exist(is_loaded, username, might_exist):
+    username_filter = make_filter(is_loaded=is_loaded)
+    await username_filter.add('user_1')
+
+    assert await username_filter.might_exist(username, 'auth') == might_exist
+
+
+@pytest.mark.parametrize('bits, might_exist, is_rebuilt', [
+    pytest.param(None, True, True, id='no_shared_filter'),
+    pytest.param(INCOMPLETE_BITS, True, True, id='incomplete'),
+    pytest.param(ALL_BITS, True, False, id='added_by_other'),
+    pytest.param(MISSING_BITS, False, False, id='not_added'),
+    pytest.param(RedisError(), True, False, id='redis_error'),
+])
+@pytest.mark.asyncio
+async def test_might_exist_shared(bits, might_exist, is_rebuilt, monkeypatch):
+    shared_client = AsyncMock()
+    shared_client.get_bits.side_effect = [bits]
+    username_filter = make_filter(shared_client)
+    start_rebuilding = Mock()
+    monkeypatch.setattr(username_filter, 'start_rebuilding', start_rebuilding)
+
+    assert await username_filter.might_exist('user_1', 'auth') == might_exist
+    shared_client.get_bits.assert_awaited_once_with(
+        username_filter.redis_key,
+        [
+            *username_filter.bloom.positions('user_1'),
+            username_filter.complete_position,
+        ],
+    )
+    assert start_rebuilding.called == is_rebuilt
+
+
+@pytest.mark.asyncio
+async def test_add_shared():
+    shared_client = AsyncMock()
+    username_filter = make_filter(shared_client)
+
+    await username_filter.add('user_1')
+
+    shared_client.set_bits.assert_awaited_once_with(
+        username_filter.redis_key, username_filter.bloom.positions('user_1'),
+    )
@@ -1,3 +1,5 @@
+import asyncio
+
 import pytest
 from fastapi import HTTPException, status
 from sqlalchemy import select
@@ -6,16 +8,12 @@ from app.auth_service import views
 from app.auth_service.views import (
     auth_view,
     create_and_put_token,
-    found_user,
-    get_token,
-    hash_password,
     is_token_expired,
     register_view,
     validate_auth_user,
-    validate_token,
-    verify_password,
 )
 from app.db.models import User
+from app.db.queries import UserCredentials
 from app.jwt_tokens.jwt_process import jwt_encode
 from src.app.auth_service.schemas import UserSchema
 
@@ -42,7 +40,7 @@ def mock_verify_password(monkeypatch):
 
 @pytest.fixture
 def mock_hash_password(monkeypatch):
-    def get_password_in_bytes(password):
+    def get_password_in_bytes(password, rounds=None):
         return bytes(password, 'utf-8')
 
     monkeypatch.setattr(views, 'hash_password', get_password_in_bytes)
@@ -55,20 +53,6 @@ async def get_users(session):
     return list(users)
 
 
-@pytest.mark.parametrize('password, confirm_password, is_verified', [
-    pytest.param('password', 'password', True, id='same_password'),
-    pytest.param('password', 'wrong_password', False, id='wrong_password'),
-    pytest.param('sdf231#&*!', 'sdf231#&*!', True, id='strong_password'),
-])
-@pytest.mark.asyncio
-async def test_hash_and_verify_password(
-    password, confirm_password, is_verified,
-):
-    hashed_password = hash_password(password)
-
-    assert verify_password(confirm_password, hashed_password) == is_verified
-
-
 @pytest.mark.parametrize('username, password', user_password_params)
 @pytest.mark.asyncio
 @pytest.mark.usefixtures('mock_hash_password', 'reset_db',)
@@ -84,7 +68,7 @@ async def test_register(
     assert len(users) == 1
     assert len(redis_mock.get_cache()) == 1
     user = users[0]
-    token = redis_mock.get_token(user.id)
+    token = await redis_mock.get_token(user.id)
 
     assert user.name == username
     assert user.password == bytes(password, 'utf-8')
@@ -105,26 +89,13 @@ async def test_register_many_users(mock_token, db_helper, redis_mock):
 
     for i in range(10):
         user = users[i]
-        token = redis_mock.get_token(user.id)
+        token = await redis_mock.get_token(user.id)
 
         assert user.name == f'user_{i}'
         assert user.password == bytes(f'password_{i}', 'utf-8')
         assert token == mock_token
 
 
-@pytest.mark.asyncio
-@pytest.mark.usefixtures('mock_hash_password', 'reset_db')
-async def test_found_user(db_helper):
-    async with db_helper.session_factory() as session:
-        assert await found_user('user_1', session) is None
-
-        user = User(name='user_1', password=b'password_1')
-        session.add(user)
-        await session.commit()
-
-        assert await found_user('user_1', session) == user
-
-
 @pytest.mark.parametrize(
     'username, password, second_password',
     [
@@ -159,6 +130,28 @@ async def test_register_fail_user_exists(
     assert ex.value.detail == 'Username already exists'
 
 
+@pytest.mark.asyncio
+@pytest.mark.usefixtures('mock_hash_password', 'mock_token', 'reset_db')
+async def test_register_concurrent(db_helper, redis_mock):
+    async def register():
+        async with db_helper.session_factory() as session:
+            return await register_view(
+                UserSchema(name='user_1', password='password'),
+                redis_mock,
+                session,
+            )
+
+    results = await asyncio.gather(
+        register(), register(), return_exceptions=True,
+    )
+
+    errors = [
+        result for result in results if isinstance(result, HTTPException)
+    ]
+    assert len(errors) == 1
+    assert errors[0].status_code == status.HTTP_409_CONFLICT
+
+
 @pytest.mark.parametrize('username, password', user_password_params)
 @pytest.mark.asyncio
 @pytest.mark.usefixtures('reset_db', 'mock_verify_password')
@@ -172,7 +165,7 @@ async def test_validate_auth_user_success(username, password, db_helper):
             session,
         )
 
-    assert user_out == user
+    assert user_out == UserCredentials(user.id, user.name, user.password)
 
 
 @pytest.mark.parametrize('username, password', user_password_params)
@@ -222,7 +215,7 @@ async def test_create_and_put_token(
     token = await create_and_put_token(user, redis_mock)
 
     assert token == mock_token
-    assert redis_mock.get_token(user.id) == token
+    assert await redis_mock.get_token(user.id) == token
 
 
 @pytest.mark.asyncio
@@ -258,87 +251,10 @@ async def test_auth_token(
 ):
     user = User(id=1, name=username, password=bytes(password, 'utf-8'))
     old_token = jwt_encode(user=user, expire_minutes=expire_minutes)
-    redis_mock.set_token(old_token, user.id)
+    await redis_mock.set_token(old_token, user.id)
 
     token = await auth_view(user, redis_mock)
 
-    assert redis_mock.get_token(user.id) == token
+    assert await redis_mock.get_token(user.id) == token
     is_token_equal = (token == old_token)
     assert is_token_equal == is_token_old  # noqa: WPS309
-
-
-@pytest.mark.asyncio
-async def test_validate_token_success():
-    user = User(name='user_1', password=b'password_1')
-    token = jwt_encode(user)
-
-    await validate_token(token)
-
-
-@pytest.mark.asyncio
-async def test_validate_token_invalid():
-    with pytest.raises(HTTPException) as ex:
-        await validate_token('invalid')
-
-    assert ex.value.status_code == status.HTTP_401_UNAUTHORIZED
-    assert ex.value.detail == 'invalid token'
-
-
-@pytest.mark.asyncio
-async def test_validate_token_expired():
-    user = User(name='user_1', password=b'password_1')
-    token = jwt_encode(user, expire_minutes=0)
-
-    with pytest.raises(HTTPException) as ex:
-        await validate_token(token)
-
-    assert ex.value.status_code == status.HTTP_401_UNAUTHORIZED
-    assert ex.value.detail == 'token expired'
-
-
-@pytest.mark.asyncio
-@pytest.mark.parametrize('username, password', user_password_params)
-@pytest.mark.usefixtures('reset_db')
-async def test_get_token(username, password, db_helper, redis_mock):
-    user = User(name=username, password=bytes(password, 'utf-8'))
-    async with db_helper.session_factory() as session:
-        session.add(user)
-        await session.commit()
-
-        redis_mock.set_token('token', user.id)
-
-        token = await get_token(
-            user_id=user.id, redis_client=redis_mock, session=session,
-        )
-
-    assert token == 'token'
-
-
-@pytest.mark.asyncio
-@pytest.mark.usefixtures('reset_db')
-async def test_get_token_no_user(db_helper, redis_mock):
-    async with db_helper.session_factory() as session:
-        with pytest.raises(HTTPException) as ex:
-            await get_token(
-                user_id=1, redis_client=redis_mock, session=session,
-            )
-
-    assert ex.value.status_code == status.HTTP_404_NOT_FOUND
-    assert ex.value.detail == 'Token not found'
-
-
-@pytest.mark.asyncio
-@pytest.mark.usefixtures('reset_db')
-async def test_get_token_no_token(db_helper, redis_mock):
-    user = User(name='user_1', password=b'password_1')
-    async with db_helper.session_factory() as session:
-        session.add(user)
-        await session.commit()
-
-        with pytest.raises(HTTPException) as ex:
-            await get_token(
-                user_id=user.id, redis_client=redis_mock, session=session,
-            )
-
-    assert ex.value.status_code == status.HTTP_404_NOT_FOUND
-    assert ex.value.detail == 'Token not found'
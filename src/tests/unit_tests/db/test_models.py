@@ -1,5 +1,7 @@
 import pytest
 import sqlalchemy
+from sqlalchemy import select
+from sqlalchemy.orm import undefer
 
 from app.db.models import User
 
@@ -50,3 +52,27 @@ async def test_user_model_fail(pyload, error_msg, db_helper):
             await session.commit()
 
     assert error_msg in str(ex.value)
+
+
+def test_user_verification_vector_deferred():
+    assert 'verification_vector' not in str(select(User))
+    assert 'verification_vector' in str(
+        select(User).options(undefer(User.verification_vector)),
+    )
+
+
+@pytest.mark.usefixtures('reset_db')
+@pytest.mark.asyncio
+async def test_user_verification_vector(db_helper):
+    async with db_helper.session_factory() as session:
+        user = User(
+            name='user_1', password=b'password', verification_vector=[0.5, 1],
+        )
+        session.add(user)
+        await session.commit()
+
+        vector = await session.scalar(
+            select(User.verification_vector).where(User.id == user.id),
+        )
+
+    assert vector.tolist() == [0.5, 1]
@@ -0,0 +1,130 @@
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+from sqlalchemy import select
+
+from app.db.models import User
+from app.db.queries import (
+    UserCredentials,
+    credentials_by_name,
+    execute_read,
+    get_user_credentials,
+    insert_user,
+    user_exists,
+)
+from app.db.replicas import REPLICAS, ReplicaSet
+
+
+@pytest.mark.usefixtures('reset_db')
+@pytest.mark.asyncio
+async def test_get_user_credentials(db_helper):
+    async with db_helper.session_factory() as session:
+        assert await get_user_credentials('user_1', session) is None
+
+        user = User(name='user_1', password=b'password')
+        session.add(user)
+        await session.commit()
+
+        credentials = await get_user_credentials('user_1', session)
+
+    assert credentials == UserCredentials(user.id, 'user_1', b'password')
+    assert isinstance(credentials, UserCredentials)
+
+
+def make_result(rows):
+    if isinstance(rows, Exception):
+        return rows
+    result = Mock()
+    result.all.return_value = rows
+    return result
+
+
+def make_session(replicas, *results):
+    session = Mock()
+    session.info = {REPLICAS: replicas}
+    session.execute = AsyncMock(side_effect=map(make_result, results))
+    session.rollback = AsyncMock()
+    return session
+
+
+@pytest.fixture
+def replica():
+    replica = Mock()
+    replica.sync_engine.pool.name = 'replica_0'
+    return replica
+
+
+@pytest.mark.asyncio
+async def test_execute_read_without_replicas():
+    session = make_session(ReplicaSet([]), [(1,)])
+
+    assert await execute_read(session, 'statement') == [(1,)]
+    session.execute.assert_awaited_once_with('statement', None)
+
+
+@pytest.mark.asyncio
+async def test_execute_read_replica(replica):
+    session = make_session(ReplicaSet([replica]), [(1,)])
+
+    rows = await execute_read(session, 'statement', {'id': 1}, min_rows=1)
+
+    assert rows == [(1,)]
+    session.execute.assert_awaited_once_with(
+        'statement', {'id': 1}, bind_arguments={'bind': replica.sync_engine},
+    )
+
+
+@pytest.mark.asyncio
+async def test_execute_read_replica_lag(replica):
+    session = make_session(ReplicaSet([replica]), [], [(1,)])
+
+    assert await execute_read(session, 'statement', min_rows=1) == [(1,)]
+    session.execute.assert_awaited_with('statement', None)
+
+
+@pytest.mark.asyncio
+async def test_execute_read_replica_error(replica):
+    replicas = ReplicaSet([replica])
+    session = make_session(replicas, OSError(), [(1,)])
+
+    assert await execute_read(session, 'statement') == [(1,)]
+    session.rollback.assert_awaited_once()
+    assert replicas.choose() is None
+
+
+@pytest.mark.asyncio
+async def test_get_user_credentials_prebuilt_statement():
+    session = make_session(ReplicaSet([]), [], [])
+
+    await get_user_credentials('user_1', session)
+    await get_user_credentials('user_2', session)
+
+    first_call, second_call = session.execute.await_args_list
+    assert first_call.args[0] is credentials_by_name
+    assert second_call.args[0] is credentials_by_name
+    assert first_call.args[1] == {'username': 'user_1'}
+    assert second_call.args[1] == {'username': 'user_2'}
+
+
+@pytest.mark.asyncio
+@pytest.mark.usefixtures('reset_db')
+async def test_user_exists(db_helper):
+    async with db_helper.session_factory() as session:
+        assert not await user_exists('user_1', session)
+        await insert_user('user_1', b'password_1', session)
+
+        assert await user_exists('user_1', session)
+
+
+@pytest.mark.asyncio
+@pytest.mark.usefixtures('reset_db')
+async def test_insert_user(db_helper):
+    async with db_helper.session_factory() as session:
+        user_id = await insert_user('user_1', b'password_1', session)
+        duplicate_id = await insert_user('user_1', b'password_2', session)
+        users = (await session.scalars(select(User))).all()
+
+    assert duplicate_id is None
+    assert [(user.id, user.password) for user in users] == [
+        (user_id, b'password_1'),
+    ]
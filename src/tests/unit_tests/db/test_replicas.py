@@ -0,0 +1,62 @@
+import time
+from unittest.mock import Mock
+
+import pytest
+
+from app.db.replicas import ReplicaSet
+
+RETRY_AFTER = 10
+
+
+def make_engine(name, checked_out=0):
+    engine = Mock()
+    engine.sync_engine.pool.name = name
+    engine.sync_engine.pool.checkedout.return_value = checked_out
+    return engine
+
+
+@pytest.fixture
+def engines():
+    return [make_engine('replica_0', 3), make_engine('replica_1', 1)]
+
+
+def test_round_robin(engines):
+    replicas = ReplicaSet(engines)
+
+    assert [replicas.choose() for _ in range(3)] == [
+        engines[0], engines[1], engines[0],
+    ]
+
+
+def test_least_connections(engines):
+    replicas = ReplicaSet(engines, balancing='least_connections')
+
+    assert replicas.choose() is engines[1]
+
+
+def test_unknown_balancing(engines):
+    with pytest.raises(ValueError):
+        ReplicaSet(engines, balancing='random')
+
+
+@pytest.mark.parametrize('balancing', ['round_robin', 'least_connections'])
+def test_mark_unhealthy(engines, balancing, monkeypatch):
+    replicas = ReplicaSet(
+        engines, balancing=balancing, retry_after=RETRY_AFTER,
+    )
+
+    replicas.mark_unhealthy(engines[1])
+    assert {replicas.choose() for _ in range(3)} == {engines[0]}
+
+    replicas.mark_unhealthy(engines[0])
+    assert replicas.choose() is None
+
+    now = time.monotonic()
+    monkeypatch.setattr(time, 'monotonic', lambda: now + RETRY_AFTER + 1)
+    assert replicas.is_healthy(0)
+    assert replicas.is_healthy(1)
+    assert replicas.choose() is not None
+
+
+def test_no_replicas():
+    assert ReplicaSet([]).choose() is None
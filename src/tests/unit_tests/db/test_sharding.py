@@ -0,0 +1,183 @@
+from collections import Counter
+from unittest.mock import Mock
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import func, select, text
+from sqlalchemy.dialects.postgresql import insert
+
+from app.db.db_helper import DatabaseHelper
+from app.db.models import User
+from app.db.queries import get_user_credentials, insert_user
+from app.db.rebalance import (
+    RebalanceError,
+    init_shards,
+    move_bucket,
+    rebalance,
+)
+from app.db.sharding import (
+    BUCKETS,
+    MAX_SHARDS,
+    SHARD_RING,
+    ShardRing,
+    create_user_id_sequence,
+    get_moved_buckets,
+    get_name_bucket,
+    new_user_values,
+    route_by_name,
+)
+from tests.conftest import TEST_DB_URL
+
+shard_ids = ['shard_0', 'shard_1', 'shard_2']
+# Номер пользователя внутри корзины
+USER_NUMBER = 12345
+USERS_COUNT = 20
+
+
+def make_session(ring=None):
+    session = Mock()
+    session.info = {SHARD_RING: ring}
+    return session
+
+
+def test_ring_distribution():
+    ring = ShardRing(shard_ids)
+
+    shard_sizes = Counter(ring.bucket_shards)
+
+    assert set(shard_sizes) == set(shard_ids)
+    assert min(shard_sizes.values()) > BUCKETS / len(shard_ids) / 2
+    assert ShardRing(shard_ids).bucket_shards == ring.bucket_shards
+
+
+def test_moved_buckets():
+    ring = ShardRing(shard_ids)
+    new_ring = ShardRing([*shard_ids, 'shard_3'])
+
+    moved_buckets = get_moved_buckets(ring, new_ring)
+
+    assert {new for _, new in moved_buckets.values()} == {'shard_3'}
+    assert len(moved_buckets) < BUCKETS / 2
+
+
+@pytest.mark.parametrize('username', ['user_1', 'admin', ''])
+def test_shard_for_id(username):
+    ring = ShardRing(shard_ids)
+    user_id = USER_NUMBER * BUCKETS + get_name_bucket(username)
+
+    assert ring.shard_for_id(user_id) == ring.shard_for_name(username)
+    assert ring.identity_chooser(User, (user_id,)) == [
+        ring.shard_for_name(username),
+    ]
+    assert ring.shard_chooser(User, User(name=username)) == (
+        ring.shard_for_name(username)
+    )
+
+
+@pytest.mark.parametrize('shard_count', [0, MAX_SHARDS + 1])
+def test_ring_shard_count(shard_count):
+    with pytest.raises(ValueError):
+        ShardRing([f'shard_{index}' for index in range(shard_count)])
+
+
+def test_route_without_shards():
+    session = make_session()
+    statement = Mock()
+
+    assert route_by_name(statement, session, 'user_1') is statement
+    assert not new_user_values(session, 'user_1')
+
+
+def test_route_with_shards():
+    session = make_session(ShardRing(shard_ids))
+    statement = Mock()
+
+    route_by_name(statement, session, 'user_1')
+
+    statement.options.assert_called_once()
+    assert list(new_user_values(session, 'user_1')) == ['id']
+
+
+def test_user_id_sequence():
+    sequence = create_user_id_sequence(2)
+
+    assert (sequence.start, sequence.increment) == (3, MAX_SHARDS)
+
+
+@pytest_asyncio.fixture
+async def schema_shards():
+    schemas = ['test_shard_0', 'test_shard_1']
+    sharded_db_helper = DatabaseHelper(
+        url=TEST_DB_URL,
+        shard_urls=[TEST_DB_URL, TEST_DB_URL],
+        shard_schemas=schemas,
+    )
+    await init_shards(sharded_db_helper.shards)
+    yield sharded_db_helper
+    async with sharded_db_helper.engine.begin() as conn:
+        for schema in schemas:
+            await conn.execute(text(f'DROP SCHEMA IF EXISTS {schema} CASCADE'))
+    await sharded_db_helper.engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_schema_shards(schema_shards):
+    usernames = [f'user_{index}' for index in range(USERS_COUNT)]
+
+    # Регистрация при одном шарде, затем добавление второго
+    async with schema_shards.session_factory(
+        info={SHARD_RING: ShardRing(['shard_0'])},
+    ) as session:
+        user_ids = [
+            await insert_user(username, b'password', session)
+            for username in usernames
+        ]
+    await rebalance(schema_shards.shards, old_shard_count=1, batch_size=5)
+
+    async with schema_shards.session_factory() as session:
+        for username, user_id in zip(usernames, user_ids):
+            credentials = await get_user_credentials(username, session)
+            user = await session.get(User, user_id)
+
+            assert credentials.id == user_id
+            assert user.name == username
+
+
+async def insert_on_shard(engine, user_id, username, password):
+    async with engine.begin() as conn:
+        await conn.execute(insert(User.__table__).values(
+            id=user_id, name=username, password=password,
+        ))
+
+
+@pytest.mark.asyncio
+async def test_move_bucket_replaces_stale_copy(schema_shards):
+    source, target = schema_shards.shards.values()
+    user_id = 7 * BUCKETS + 3
+    await insert_on_shard(source, user_id, 'user', b'new')
+    # Копия, оставшаяся после сбоя до удаления со старого шарда
+    await insert_on_shard(target, user_id, 'user', b'old')
+
+    moved = await move_bucket(3, source, target, batch_size=5)
+
+    assert moved == 1
+    async with target.connect() as conn:
+        password = await conn.scalar(
+            select(User.password).where(User.id == user_id),
+        )
+    assert password == b'new'
+    async with source.connect() as conn:
+        assert await conn.scalar(select(func.count(User.id))) == 0
+
+
+@pytest.mark.asyncio
+async def test_move_bucket_name_conflict(schema_shards):
+    source, target = schema_shards.shards.values()
+    await insert_on_shard(source, 7 * BUCKETS + 3, 'user', b'source')
+    await insert_on_shard(target, 8 * BUCKETS + 3, 'user', b'target')
+
+    with pytest.raises(RebalanceError):
+        await move_bucket(3, source, target, batch_size=5)
+
+    async with source.connect() as conn:
+        assert await conn.scalar(select(func.count(User.id))) == 1
@@ -0,0 +1,52 @@
+import numpy as np
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from app.db.types import Float32Vector, pack_vector, unpack_vector
+
+dialect = postgresql.dialect()
+VECTOR = (0.5, -1.25, 0)
+# Три значения float32 по четыре байта
+PACKED_SIZE = 12
+
+
+@pytest.mark.parametrize(
+    'vector',
+    [
+        pytest.param(list(VECTOR), id='list'),
+        pytest.param(np.array(VECTOR, dtype='f8'), id='float64'),
+        pytest.param(np.array(VECTOR, dtype='>f4'), id='big_endian'),
+    ],
+)
+def test_pack_vector(vector):
+    packed = pack_vector(vector)
+
+    assert len(packed) == PACKED_SIZE
+    assert unpack_vector(packed).tolist() == list(VECTOR)
+
+
+def test_unpack_vector_without_copy():
+    packed = pack_vector([1, 2, 3])
+
+    vector = unpack_vector(packed)
+
+    assert vector.base is packed
+    assert not vector.flags.writeable
+
+
+def test_float32_vector_type():
+    vector_type = Float32Vector()
+
+    packed = vector_type.process_bind_param([1, 2], dialect)
+    vector = vector_type.process_result_value(packed, dialect)
+
+    assert packed == pack_vector([1, 2])
+    assert vector.dtype == np.float32
+    assert vector.tolist() == [1, 2]
+
+
+def test_float32_vector_type_none():
+    vector_type = Float32Vector()
+
+    assert vector_type.process_bind_param(None, dialect) is None
+    assert vector_type.process_result_value(None, dialect) is None
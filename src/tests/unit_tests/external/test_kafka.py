@@ -1,9 +1,150 @@
+import asyncio
+import hashlib
+
 import pytest
+import pytest_asyncio
+from fastapi import HTTPException, status
+
+from app.config import settings
+from app.external import kafka
+from app.external.kafka import compress, verify_view
+from app.external.kafka_publisher import KafkaPublisher
+from app.photo_storage import LocalPhotoStorage
+from tests.conftest import make_upload
+from tests.fake_kafka import RETRY_DELAY, FakeKafkaProducer, make_outbox
 
-from app.external.kafka import compress
+# Время на подтверждение брокером и отметку об отправке
+DELIVERY_WAIT = 0.01
 
 
 @pytest.mark.asyncio
 async def test_compress():
     compressed = await compress('test')
     assert isinstance(compressed, bytes)
+
+
+@pytest_asyncio.fixture
+async def fake_producer(monkeypatch):
+    monkeypatch.setattr(settings, 'kafka_outbox_enabled', False)
+    producer = FakeKafkaProducer()
+    publisher = KafkaPublisher(
+        producer,
+        topic='faces',
+        handoff_size=10,
+        max_queue_size=10,
+    )
+    monkeypatch.setattr(kafka, 'publisher', publisher)
+    await publisher.start()
+    yield producer
+    await publisher.stop()
+
+
+@pytest.fixture(params=[True, False], ids=['async', 'sync'])
+def publish_async(request, monkeypatch):
+    monkeypatch.setattr(settings, 'kafka_publish_async', request.param)
+    return request.param
+
+
+async def wait_for_delivery():
+    await kafka.publisher.queue.join()
+    await asyncio.sleep(DELIVERY_WAIT)
+
+
+@pytest.fixture
+def storage(tmp_path):
+    return LocalPhotoStorage(str(tmp_path))
+
+
+@pytest.mark.asyncio
+@pytest.mark.usefixtures('publish_async')
+async def test_verify_view(fake_producer, storage):
+    response = await verify_view(make_upload(), 1, storage)
+    await wait_for_delivery()
+
+    assert response == {'message': 'File saved successfully'}
+    path = storage.get_path(hashlib.sha256(b'photo').hexdigest())
+    assert path.read_bytes() == b'photo'
+    assert fake_producer.messages == [
+        ('faces', await compress('1'), await compress(str(path))),
+    ]
+
+
+@pytest.mark.asyncio
+@pytest.mark.usefixtures('publish_async')
+async def test_verify_view_duplicate(fake_producer, storage):
+    await verify_view(make_upload(), 1, storage)
+    await wait_for_delivery()
+
+    response = await verify_view(make_upload(), 1, storage)
+    await verify_view(make_upload(), 2, storage)
+    await wait_for_delivery()
+
+    assert response == {'message': 'File already submitted'}
+    assert len(fake_producer.messages) == 2
+
+
+@pytest.mark.asyncio
+async def test_verify_view_send_error(fake_producer, storage, monkeypatch):
+    monkeypatch.setattr(settings, 'kafka_publish_async', False)
+    fake_producer.errors.append(OSError('broker is down'))
+
+    with pytest.raises(HTTPException) as ex:
+        await verify_view(make_upload(), 1, storage)
+    response = await verify_view(make_upload(), 1, storage)
+
+    assert ex.value.status_code == status.HTTP_500_INTERNAL_SERVER_ERROR
+    assert response == {'message': 'File saved successfully'}
+
+
+@pytest.mark.asyncio
+async def test_verify_view_async_send_error(fake_producer, storage):
+    fake_producer.errors.append(OSError('broker is down'))
+
+    response = await verify_view(make_upload(), 1, storage)
+    await wait_for_delivery()
+
+    assert response == {'message': 'File saved successfully'}
+    digest = hashlib.sha256(b'photo').hexdigest()
+    assert not await storage.is_submitted(1, digest)
+
+
+@pytest.mark.asyncio
+async def test_verify_view_too_large(fake_producer, storage):
+    upload = make_upload(size=settings.upload_max_size + 1)
+
+    with pytest.raises(HTTPException) as ex:
+        await verify_view(upload, 1, storage)
+
+    assert ex.value.status_code == status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+    assert not list(storage.tmp_dir.iterdir())
+    await wait_for_delivery()
+    assert not fake_producer.messages
+
+
+@pytest_asyncio.fixture
+async def fake_outbox(fake_producer, tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, 'kafka_outbox_enabled', True)
+    outbox = make_outbox(
+        tmp_path / 'outbox.sqlite3', kafka.publisher, batch_size=10,
+    )
+    monkeypatch.setattr(kafka, 'outbox', outbox)
+    await asyncio.to_thread(outbox.journal.open)
+    yield outbox
+    outbox.journal.close()
+
+
+@pytest.mark.asyncio
+async def test_verify_view_outbox_broker_down(
+    fake_producer, fake_outbox, storage,
+):
+    fake_producer.errors.append(OSError('broker is down'))
+
+    response = await verify_view(make_upload(), 1, storage)
+
+    assert response == {'message': 'File saved successfully'}
+    digest = hashlib.sha256(b'photo').hexdigest()
+    assert await storage.is_submitted(1, digest)
+    assert await fake_outbox.flush() == 0
+    await asyncio.sleep(RETRY_DELAY * 2)
+    assert await fake_outbox.flush() == 1
+    assert len(fake_producer.messages) == 1
@@ -0,0 +1,137 @@
+import asyncio
+
+import pytest
+from prometheus_client import REGISTRY
+
+from app.external.kafka_publisher import (
+    KafkaPublisher,
+    PublishQueueFullError,
+    PublishStoppedError,
+)
+from tests.fake_kafka import FakeKafkaProducer
+
+LATENCY = 0.01
+
+
+def get_handoff_count():
+    return REGISTRY.get_sample_value('lebedev_auth_kafka_handoff_size_count')
+
+
+@pytest.fixture
+def producer():
+    return FakeKafkaProducer(latency=LATENCY)
+
+
+def make_publisher(producer, handoff_size=100, max_queue_size=10):
+    return KafkaPublisher(
+        producer,
+        topic='faces',
+        handoff_size=handoff_size,
+        max_queue_size=max_queue_size,
+        stop_timeout=0.1,
+    )
+
+
+@pytest.mark.asyncio
+async def test_publish_returns_before_delivery(producer):
+    publisher = make_publisher(producer)
+    await publisher.start()
+
+    delivery = publisher.publish(b'key', b'value')
+
+    assert not delivery.done()
+    assert len(publisher.unconfirmed) == 1
+    metadata = await delivery
+    assert metadata.offset == 0
+    assert producer.messages == [('faces', b'key', b'value')]
+    assert not publisher.unconfirmed
+    await publisher.stop()
+
+
+@pytest.mark.parametrize('handoff_size, handoffs', [
+    pytest.param(100, 1, id='one_handoff'),
+    pytest.param(2, 3, id='full_handoffs'),
+])
+@pytest.mark.asyncio
+async def test_publish_handoffs(producer, handoff_size, handoffs):
+    publisher = make_publisher(producer, handoff_size=handoff_size)
+    await publisher.start()
+    handoff_count = get_handoff_count() or 0
+
+    deliveries = [
+        publisher.publish(b'key', str(index).encode()) for index in range(5)
+    ]
+    await asyncio.gather(*deliveries)
+
+    assert get_handoff_count() - handoff_count == handoffs
+    assert [value for _, _, value in producer.messages] == [
+        b'0', b'1', b'2', b'3', b'4',
+    ]
+    await publisher.stop()
+
+
+@pytest.mark.asyncio
+async def test_publish_delivery_error(producer):
+    producer.errors.append(OSError('broker is down'))
+    publisher = make_publisher(producer)
+    await publisher.start()
+
+    failed = publisher.publish(b'key', b'first')
+    delivered = publisher.publish(b'key', b'second')
+
+    with pytest.raises(OSError):
+        await failed
+    assert (await delivered).offset == 0
+    assert not publisher.unconfirmed
+    await publisher.stop()
+
+
+@pytest.mark.asyncio
+async def test_publish_queue_full(producer):
+    publisher = make_publisher(producer, max_queue_size=1)
+
+    publisher.publish(b'key', b'first')
+
+    with pytest.raises(PublishQueueFullError):
+        publisher.publish(b'key', b'second')
+    await publisher.start()
+    await publisher.stop()
+
+
+@pytest.mark.asyncio
+async def test_stop_waits_for_delivery(producer):
+    publisher = make_publisher(producer)
+    await publisher.start()
+    delivery = publisher.publish(b'key', b'value')
+
+    await publisher.stop()
+
+    assert delivery.done()
+    assert producer.messages == [('faces', b'key', b'value')]
+    assert not producer.is_started
+
+
+@pytest.mark.asyncio
+async def test_stop_times_out(producer):
+    producer.latency = 10
+    publisher = make_publisher(producer)
+    await publisher.start()
+    delivery = publisher.publish(b'key', b'value')
+
+    await asyncio.wait_for(publisher.stop(), 1)
+
+    with pytest.raises(PublishStoppedError):
+        await delivery
+    assert not publisher.unconfirmed
+
+
+@pytest.mark.asyncio
+async def test_stop_not_started(producer):
+    publisher = make_publisher(producer)
+    delivery = publisher.publish(b'key', b'value')
+
+    await asyncio.wait_for(publisher.stop(), 1)
+
+    with pytest.raises(PublishStoppedError):
+        await delivery
+    assert publisher.queue.empty()
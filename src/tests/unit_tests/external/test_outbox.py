@@ -0,0 +1,159 @@
+import asyncio
+import sqlite3
+
+import pytest
+import pytest_asyncio
+from prometheus_client import REGISTRY
+
+from app.backoff import Backoff
+from app.external.kafka_publisher import KafkaPublisher
+from tests.fake_kafka import (
+    FAST_BACKOFF,
+    RETRY_DELAY,
+    FakeKafkaProducer,
+    make_outbox,
+)
+
+# Повтор не наступает за время теста
+SLOW_BACKOFF = Backoff(10, 60)
+WAITS_COUNT = 100
+
+
+@pytest.fixture
+def producer():
+    return FakeKafkaProducer()
+
+
+def make_test_outbox(path, producer, backoff=SLOW_BACKOFF):
+    publisher = KafkaPublisher(
+        producer,
+        topic='faces',
+        handoff_size=10,
+        max_queue_size=10,
+    )
+    return make_outbox(path, publisher, backoff=backoff)
+
+
+@pytest_asyncio.fixture
+async def outbox(tmp_path, producer):
+    outbox = make_test_outbox(tmp_path / 'outbox.sqlite3', producer)
+    outbox.journal.open()
+    await outbox.publisher.start()
+    yield outbox
+    await outbox.stop()
+
+
+async def wait_for_messages(producer, count=1):
+    for _ in range(WAITS_COUNT):
+        if len(producer.messages) >= count:
+            return
+        await asyncio.sleep(RETRY_DELAY)
+
+
+def get_rows(outbox):
+    return outbox.journal.connection.execute(
+        'SELECT key, attempts FROM outbox ORDER BY id',
+    ).fetchall()
+
+
+@pytest.mark.asyncio
+async def test_append_survives_reopen(tmp_path, producer):
+    outbox = make_test_outbox(tmp_path / 'outbox.sqlite3', producer)
+    outbox.journal.open()
+    await outbox.append(b'1', b'photo')
+    outbox.journal.close()
+
+    reopened = make_test_outbox(tmp_path / 'outbox.sqlite3', producer)
+    reopened.journal.open()
+
+    assert get_rows(reopened) == [(b'1', 0)]
+    reopened.journal.close()
+
+
+@pytest.mark.asyncio
+async def test_flush_sends_batch(outbox, producer):
+    for key in (b'1', b'2', b'3'):
+        await outbox.append(key, b'photo')
+
+    assert await outbox.flush() == 2
+    assert await outbox.flush() == 1
+    assert await outbox.flush() == 0
+    assert [message[1] for message in producer.messages] == [b'1', b'2', b'3']
+    assert not get_rows(outbox)
+
+
+@pytest.mark.asyncio
+async def test_flush_reschedules_failed(outbox, producer):
+    retries = REGISTRY.get_sample_value('lebedev_auth_outbox_retries_total')
+    producer.errors.append(OSError('broker is down'))
+    await outbox.append(b'1', b'photo')
+    await outbox.append(b'2', b'photo')
+
+    assert await outbox.flush() == 1
+    assert get_rows(outbox) == [(b'1', 1)]
+    assert await outbox.flush() == 0
+    assert len(producer.messages) == 1
+    retries_after = REGISTRY.get_sample_value(
+        'lebedev_auth_outbox_retries_total',
+    )
+    assert retries_after - (retries or 0) == 1
+
+
+@pytest.mark.asyncio
+async def test_update_metrics(outbox):
+    await outbox.update_metrics()
+    assert REGISTRY.get_sample_value('lebedev_auth_outbox_backlog') == 0
+    age = 'lebedev_auth_outbox_oldest_age_seconds'
+    assert REGISTRY.get_sample_value(age) == 0
+
+    await outbox.append(b'1', b'photo')
+    await asyncio.sleep(RETRY_DELAY)
+    await outbox.update_metrics()
+
+    assert REGISTRY.get_sample_value('lebedev_auth_outbox_backlog') == 1
+    assert REGISTRY.get_sample_value(age) > 0
+
+
+@pytest.mark.asyncio
+async def test_run_waits_for_broker(tmp_path, producer):
+    producer.start_errors.append(OSError('broker is down'))
+    outbox = make_test_outbox(
+        tmp_path / 'outbox.sqlite3', producer, FAST_BACKOFF,
+    )
+    await outbox.start()
+
+    await outbox.append(b'1', b'photo')
+    await wait_for_messages(producer)
+
+    assert producer.is_started
+    assert len(producer.messages) == 1
+    await outbox.stop()
+    assert not producer.is_started
+
+
+@pytest.mark.asyncio
+async def test_run_survives_journal_error(tmp_path, producer, monkeypatch):
+    outbox = make_test_outbox(
+        tmp_path / 'outbox.sqlite3', producer, FAST_BACKOFF,
+    )
+    get_backlog = outbox.journal.get_backlog
+    errors = [sqlite3.OperationalError('disk I/O error')]
+
+    def failing_get_backlog():
+        if errors:
+            raise errors.pop()
+        return get_backlog()
+
+    monkeypatch.setattr(outbox.journal, 'get_backlog', failing_get_backlog)
+    await outbox.start()
+    for _ in range(WAITS_COUNT):
+        if not errors:
+            break
+        await asyncio.sleep(RETRY_DELAY)
+
+    await outbox.append(b'1', b'photo')
+    await wait_for_messages(producer)
+
+    assert not errors
+    assert len(producer.messages) == 1
+    await outbox.stop()
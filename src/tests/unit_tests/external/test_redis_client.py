@@ -0,0 +1,136 @@
+from unittest.mock import AsyncMock
+
+import pytest
+
+from app.config import settings
+from app.db.models import User
+from app.external.redis_client import RedisClient, RedisPoolConfig
+from app.jwt_tokens.jwt_process import jwt_encode
+
+REDIS_PORT = 6379
+POOL_TIMEOUT = 0.5
+
+
+@pytest.fixture
+def redis_client():
+    redis_client = RedisClient('localhost', REDIS_PORT, 1)
+    redis_client.client = AsyncMock()
+    redis_client.invalidator.client = redis_client.client
+    return redis_client
+
+
+@pytest.mark.asyncio
+async def test_redis_client_pool():
+    redis_client = RedisClient(
+        'localhost',
+        REDIS_PORT,
+        1,
+        RedisPoolConfig(max_connections=5, pool_timeout=POOL_TIMEOUT),
+    )
+
+    assert redis_client.pool.max_connections == 5
+    assert redis_client.pool.timeout == POOL_TIMEOUT
+
+    await redis_client.close()
+
+
+@pytest.mark.parametrize('instance_id, cached_token', [
+    pytest.param('other', None, id='other_instance'),
+    pytest.param(None, b'token', id='same_instance'),
+])
+@pytest.mark.asyncio
+async def test_handle_invalidation(instance_id, cached_token):
+    redis_client = RedisClient('localhost', REDIS_PORT, 1)
+    redis_client.token_cache.set(1, b'token')
+    instance_id = instance_id or redis_client.instance_id
+
+    redis_client.invalidator.handle(f'{instance_id}:token:1'.encode())
+
+    assert redis_client.token_cache.get(1) == cached_token
+    await redis_client.close()
+
+
+@pytest.mark.parametrize('message', [
+    pytest.param(b'garbage', id='no_separators'),
+    pytest.param(b'other:token:user', id='bad_key'),
+    pytest.param(b'\xff', id='not_utf8'),
+])
+@pytest.mark.asyncio
+async def test_handle_invalidation_malformed(message):
+    redis_client = RedisClient('localhost', REDIS_PORT, 1)
+    redis_client.token_cache.set(1, b'token')
+
+    redis_client.invalidator.handle(message)
+    assert redis_client.token_cache.get(1) == b'token'
+
+    redis_client.invalidator.handle(b'other:token:1')
+    assert redis_client.token_cache.get(1) is None
+    await redis_client.close()
+
+
+@pytest.mark.asyncio
+async def test_get_token_from_local_cache():
+    redis_client = RedisClient('localhost', REDIS_PORT, 1)
+    redis_client.token_cache.set(1, b'token')
+
+    assert await redis_client.get_token(1) == b'token'
+    await redis_client.close()
+
+
+@pytest.mark.parametrize('expire_minutes, ttl', [
+    pytest.param(10, 10 * 60, id='valid_token'),
+    pytest.param(
+        None, settings.jwt_auth_token_expiry_minutes * 60, id='not_jwt_token',
+    ),
+])
+@pytest.mark.asyncio
+async def test_set_token_ttl(expire_minutes, ttl, redis_client):
+    token = 'token'  # noqa: S105
+    if expire_minutes is not None:
+        token = jwt_encode(User(name='user'), expire_minutes=expire_minutes)
+
+    await redis_client.set_token(token, 1)
+
+    set_call = redis_client.client.set
+    set_call.assert_awaited_once()
+    assert set_call.await_args.kwargs['ex'] in {ttl, ttl + 1}
+    assert redis_client.token_cache.get(1) == token
+
+
+@pytest.mark.asyncio
+async def test_set_expired_token(redis_client):
+    redis_client.token_cache.set(1, b'old_token')
+    token = jwt_encode(User(name='user'), expire_minutes=0)
+
+    await redis_client.set_token(token, 1)
+
+    redis_client.client.set.assert_not_awaited()
+    redis_client.client.delete.assert_awaited_once_with('t:1')
+    assert redis_client.token_cache.get(1) is None
+
+
+@pytest.mark.asyncio
+async def test_get_tokens(redis_client):
+    redis_client.client.mget.return_value = [b'token_2', None]
+    redis_client.token_cache.set(1, b'token_1')
+
+    tokens = await redis_client.get_tokens([1, 2, 3])
+
+    redis_client.client.mget.assert_awaited_once_with(['t:2', 't:3'])
+    assert tokens == {1: b'token_1', 2: b'token_2'}
+    assert redis_client.token_cache.get(2) == b'token_2'
+
+
+@pytest.mark.asyncio
+async def test_refresh_token(redis_client):
+    redis_client.client.getdel.return_value = b'1:user:name'
+
+    await redis_client.set_refresh_token('refresh', 1, 'user:name')
+    user_data = await redis_client.pop_refresh_token('refresh')
+
+    key, user_data_stored = redis_client.client.set.await_args.args
+    assert key.startswith('r:')
+    assert 'refresh' not in key
+    assert user_data_stored == '1:user:name'
+    redis_client.client.getdel.assert_awaited_once_with(key)
+    assert user_data == (1, 'user:name')
@@ -0,0 +1,54 @@
+import jwt
+import pytest
+
+from app.config import settings
+from app.db.models import User
+from app.jwt_tokens import jwks
+from app.jwt_tokens.jwks import get_jwks, get_key_id
+from app.jwt_tokens.jwt_process import jwt_decode, jwt_encode
+from app.jwt_tokens.keys import generate_key_pair
+
+
+@pytest.fixture
+def retired_private_key(monkeypatch):
+    private_pem, public_pem = generate_key_pair('RS256')
+    monkeypatch.setattr(settings, 'jwt_retired_public_keys', [public_pem])
+    jwks.get_public_keys.cache_clear()
+    jwks.get_verification_keys.cache_clear()
+    yield private_pem
+    jwks.get_public_keys.cache_clear()
+    jwks.get_verification_keys.cache_clear()
+
+
+def test_key_id_same_for_private_and_public_key():
+    assert get_key_id(settings.jwt_private) == get_key_id(settings.jwt_public)
+
+
+def test_jwks():
+    keys = get_jwks()['keys']
+
+    assert len(keys) == 1
+    assert keys[0]['kid'] == get_key_id(settings.jwt_public)
+    assert keys[0]['alg'] == settings.crypto_algorithm
+    assert 'd' not in keys[0]
+
+
+def test_decode_token_signed_by_retired_key(retired_private_key):
+    token = jwt_encode(
+        User(id=1, name='user'), private_key=retired_private_key,
+    )
+
+    assert len(get_jwks()['keys']) == 2
+    assert jwt_decode(token)['sub'] == '1'
+
+
+def test_decode_token_unknown_key_id(retired_private_key, monkeypatch):
+    token = jwt_encode(
+        User(id=1, name='user'), private_key=retired_private_key,
+    )
+    jwks.get_public_keys.cache_clear()
+    jwks.get_verification_keys.cache_clear()
+    monkeypatch.setattr(settings, 'jwt_retired_public_keys', [])
+
+    with pytest.raises(jwt.InvalidTokenError):
+        jwt_decode(token)
@@ -1,7 +1,15 @@
+import jwt
 import pytest
 
 from app.db.models import User
-from app.jwt_tokens.jwt_process import jwt_decode, jwt_encode
+from app.jwt_tokens import jwt_process
+from app.jwt_tokens.jwt_process import (
+    decoded_tokens,
+    jwt_decode,
+    jwt_decode_cached,
+    jwt_encode,
+)
+from app.jwt_tokens.keys import generate_key_pair, load_key
 
 pyload_without_name_params = [
     pytest.param({'some': 'payload'}, id='some_payload'),
@@ -44,3 +52,81 @@ def test_jwt_decode(user):
     assert 'password' not in decode_data
     assert 'exp' in decode_data
     assert 'iat' in decode_data
+
+
+@pytest.mark.parametrize('user, sub', [
+    pytest.param(User(id=1, name='user_1'), '1', id='saved_user'),
+    pytest.param(User(name='user_1'), None, id='not_saved_user'),
+])
+def test_jwt_encode_sub(user, sub):
+    token = jwt_encode(user)
+
+    assert jwt_decode(token).get('sub') == sub
+
+
+@pytest.mark.parametrize('algorithm', ['RS256', 'ES256', 'EdDSA'])
+def test_jwt_algorithms(algorithm):
+    private_pem, public_pem = generate_key_pair(algorithm)
+    token = jwt_encode(
+        User(id=1, name='user_1'),
+        private_key=private_pem,
+        algorithm=algorithm,
+    )
+
+    decode_data = jwt_decode(token, public_key=public_pem, algorithm=algorithm)
+
+    assert decode_data['username'] == 'user_1'
+
+
+def test_load_key_parsed_once():
+    private_pem, _ = generate_key_pair('EdDSA')
+
+    assert load_key(private_pem, 'EdDSA') is load_key(private_pem, 'EdDSA')
+
+
+@pytest.mark.parametrize('algorithm', ['HS256', 'none'])
+def test_unsupported_algorithm(algorithm):
+    with pytest.raises(ValueError):
+        jwt_encode(User(name='user_1'), algorithm=algorithm)
+
+
+@pytest.fixture
+def decode_calls(monkeypatch):
+    calls = []
+
+    def counted_jwt_decode(token):
+        calls.append(token)
+        return jwt_decode(token)
+
+    decoded_tokens.clear()
+    monkeypatch.setattr(jwt_process, 'jwt_decode', counted_jwt_decode)
+    yield calls
+    decoded_tokens.clear()
+
+
+def test_jwt_decode_cached(decode_calls):
+    token = jwt_encode(User(id=1, name='user_1'))
+
+    first_claims = jwt_decode_cached(token)
+    second_claims = jwt_decode_cached(token.encode())
+
+    assert first_claims == second_claims
+    assert first_claims['sub'] == '1'
+    assert len(decode_calls) == 1
+
+
+@pytest.mark.parametrize('token, error', [
+    pytest.param(
+        jwt_encode(User(name='user_1'), expire_minutes=0),
+        jwt.ExpiredSignatureError,
+        id='expired',
+    ),
+    pytest.param('invalid', jwt.InvalidTokenError, id='invalid'),
+])
+def test_jwt_decode_cached_fail(decode_calls, token, error):
+    for _ in range(2):
+        with pytest.raises(error):
+            jwt_decode_cached(token)
+
+    assert len(decode_calls) == 2
+    assert not decoded_tokens
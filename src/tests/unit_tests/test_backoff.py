@@ -0,0 +1,13 @@
+import pytest
+
+from app.backoff import Backoff
+
+
+@pytest.mark.parametrize('attempts, delay', [
+    pytest.param(0, 1, id='first'),
+    pytest.param(3, 8, id='doubled'),
+    pytest.param(6, 60, id='max'),
+    pytest.param(10 ** 6, 60, id='many_attempts'),
+])
+def test_get_delay(attempts, delay):
+    assert Backoff(min_delay=1, max_delay=60).get_delay(attempts) == delay
@@ -0,0 +1,43 @@
+import pytest
+
+from app.bloom_filter import BloomFilter
+
+ERROR_RATE = 0.01
+# Размер фильтра на 1000 элементов с ошибкой ERROR_RATE
+EXPECTED_SIZE = 9586
+EXPECTED_BYTES = 1199
+CHECKS_COUNT = 10000
+
+
+@pytest.fixture
+def bloom():
+    return BloomFilter(capacity=1000, error_rate=ERROR_RATE)
+
+
+def test_bloom_filter_size(bloom):
+    assert bloom.size == EXPECTED_SIZE
+    assert bloom.hash_count == 7
+    assert bloom.memory_bytes == EXPECTED_BYTES
+
+
+def test_bloom_filter_contains(bloom):
+    positions = bloom.add('user_1')
+
+    assert 'user_1' in bloom
+    assert 'user_2' not in bloom
+    assert positions == bloom.positions('user_1')
+    assert bloom.count == 1
+
+
+def test_bloom_filter_error_rate(bloom):
+    usernames = [f'user_{index}' for index in range(1000)]
+    for username in usernames:
+        bloom.add(username)
+
+    false_positives = sum(
+        f'other_{index}' in bloom for index in range(CHECKS_COUNT)
+    )
+
+    assert all(username in bloom for username in usernames)
+    assert false_positives / CHECKS_COUNT < 2 * ERROR_RATE
+    assert bloom.estimated_error_rate == pytest.approx(ERROR_RATE, rel=0.1)
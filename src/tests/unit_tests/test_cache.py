@@ -0,0 +1,63 @@
+import time
+
+import pytest
+
+from app.cache import TTLCache
+
+# Время, когда истекли все записи кеша
+FAR_FUTURE = float('inf')
+
+
+@pytest.fixture
+def cache():
+    return TTLCache(name='test', max_size=2, ttl=60)
+
+
+def test_get_set(cache):
+    cache.set('key', 'value')
+
+    assert cache.get('key') == 'value'
+    assert cache.get('other_key') is None
+
+
+@pytest.mark.parametrize('expire_in, cached_value', [
+    pytest.param(-1, None, id='already_expired'),
+    pytest.param(10, 'value', id='not_expired'),
+    pytest.param(1000, 'value', id='longer_than_ttl'),
+])
+def test_set_expire_at(cache, expire_in, cached_value):
+    cache.set('key', 'value', expire_at=time.time() + expire_in)
+
+    assert cache.get('key') == cached_value
+
+
+def test_expired_entry(cache, monkeypatch):
+    cache.set('key', 'value', expire_at=time.time() + 10)
+    monkeypatch.setattr(time, 'time', lambda: FAR_FUTURE)
+
+    assert cache.get('key') is None
+    assert not cache
+
+
+def test_lru_eviction(cache):
+    cache.set('first', 1)
+    cache.set('second', 2)
+    cache.get('first')
+    cache.set('third', 3)
+
+    assert len(cache) == 2
+    assert cache.get('second') is None
+    assert cache.get('first') == 1
+    assert cache.get('third') == 3
+
+
+def test_pop_and_clear(cache):
+    cache.set('first', 1)
+    cache.set('second', 2)
+
+    cache.pop('first')
+    assert cache.get('first') is None
+    assert cache.get('second') == 2
+
+    cache.clear()
+    assert not cache
@@ -0,0 +1,69 @@
+import hashlib
+
+import pytest
+
+from app.config import settings
+from app.photo_storage import LocalPhotoStorage
+from app.uploads import UploadTooLargeError
+from tests.conftest import make_upload
+
+DIGEST = hashlib.sha256(b'photo').hexdigest()
+USER_ID = 1001
+
+
+@pytest.fixture
+def storage(tmp_path):
+    return LocalPhotoStorage(str(tmp_path))
+
+
+def test_get_path(storage, tmp_path):
+    assert storage.get_path('abcdef') == tmp_path / 'photos/ab/cd/abcdef'
+
+
+def test_get_mark_path(storage, tmp_path):
+    mark_path = storage.get_mark_path(USER_ID, 'abcdef')
+
+    assert mark_path == tmp_path / f'users/001/{USER_ID}/abcdef'
+
+
+@pytest.mark.asyncio
+async def test_save(storage):
+    photo = await storage.save(make_upload())
+
+    assert photo.digest == DIGEST
+    assert photo.path == str(storage.get_path(DIGEST))
+    assert storage.get_path(DIGEST).read_bytes() == b'photo'
+    assert not list(storage.tmp_dir.iterdir())
+
+
+@pytest.mark.asyncio
+async def test_save_same_content(storage):
+    first_photo = await storage.save(make_upload(filename='first.jpg'))
+    second_photo = await storage.save(make_upload(filename='second.jpg'))
+    other_photo = await storage.save(make_upload(b'other'))
+
+    assert first_photo == second_photo
+    assert other_photo.path != first_photo.path
+    assert not list(storage.tmp_dir.iterdir())
+
+
+@pytest.mark.asyncio
+async def test_save_error_keeps_no_files(storage):
+    upload = make_upload()
+    upload.size = settings.upload_max_size + 1
+
+    with pytest.raises(UploadTooLargeError):
+        await storage.save(upload)
+
+    assert not list(storage.tmp_dir.iterdir())
+
+
+@pytest.mark.asyncio
+async def test_mark_submitted(storage):
+    assert not await storage.is_submitted(1, DIGEST)
+
+    await storage.mark_submitted(1, DIGEST)
+    await storage.mark_submitted(1, DIGEST)
+
+    assert await storage.is_submitted(1, DIGEST)
+    assert not await storage.is_submitted(2, DIGEST)
@@ -0,0 +1,45 @@
+import hashlib
+import os
+from unittest.mock import AsyncMock
+
+import pytest
+
+from app.uploads import UploadTooLargeError, save_upload
+from tests.conftest import make_upload
+
+DATA_SIZE = 10240
+DATA = os.urandom(DATA_SIZE)
+
+
+@pytest.mark.asyncio
+async def test_save_upload(tmp_path):
+    upload = make_upload(DATA)
+    upload.read = AsyncMock(wraps=upload.read)
+    file_path = tmp_path / 'photo.jpg'
+
+    digest = await save_upload(
+        upload, str(file_path), chunk_size=1000, max_size=len(DATA),
+    )
+
+    assert digest == hashlib.sha256(DATA).hexdigest()
+    assert file_path.read_bytes() == DATA
+    assert all(call.args == (1000,) for call in upload.read.await_args_list)
+
+
+@pytest.mark.parametrize('size', [
+    pytest.param(None, id='unknown_size'),
+    pytest.param(len(DATA), id='known_size'),
+])
+@pytest.mark.asyncio
+async def test_save_upload_too_large(size, tmp_path):
+    file_path = tmp_path / 'photo.jpg'
+
+    with pytest.raises(UploadTooLargeError):
+        await save_upload(
+            make_upload(DATA, size=size),
+            str(file_path),
+            chunk_size=1000,
+            max_size=len(DATA) - 1,
+        )
+
+    assert not file_path.exists()
@@ -0,0 +1,154 @@
+import numpy as np
+import pytest
+
+from app.vector_index import (
+    BruteForceIndex,
+    build_index,
+    load_index,
+    normalize,
+    save_index,
+    top_k,
+    train_ivf,
+)
+
+POINTS_COUNT = 500
+DIMENSION = 16
+CLUSTERS_COUNT = 8
+NOISE = 0.2
+QUERIES_COUNT = 20
+# Косинус между векторами [1, 0] и [1, 0.1]
+NEAR_SCORE = 0.995
+SCORE_TOLERANCE = 1e-3
+
+
+@pytest.fixture
+def vectors():
+    rng = np.random.default_rng(0)
+    centers = rng.normal(size=(CLUSTERS_COUNT, DIMENSION))
+    points = centers[rng.integers(0, CLUSTERS_COUNT, POINTS_COUNT)]
+    return normalize(points + rng.normal(scale=NOISE, size=points.shape))
+
+
+@pytest.fixture
+def ids():
+    return np.arange(POINTS_COUNT) * 10
+
+
+def test_top_k():
+    ids = np.array([1, 2, 3, 4])
+    scores = np.array([0.1, 0.9, 0.5, 0.7])
+
+    best_ids, best_scores = top_k(ids, scores, 3)
+
+    assert best_ids.tolist() == [2, 4, 3]
+    assert best_scores.tolist() == [0.9, 0.7, 0.5]
+
+
+def test_top_k_more_than_size():
+    scores = np.array([0.1, 0.9])
+
+    ids, _ = top_k(np.array([1, 2]), scores, 10)
+
+    assert ids.tolist() == [2, 1]
+
+
+def test_brute_force_index():
+    index = BruteForceIndex(2)
+    index.add(1, normalize([1, 0]))
+    index.add(2, normalize([0, 1]))
+    index.add(3, normalize([1, 1]))
+
+    ids, scores = index.search(normalize([1, 0.1]), 2)
+
+    assert ids.tolist() == [1, 3]
+    assert scores[0] == pytest.approx(NEAR_SCORE, abs=SCORE_TOLERANCE)
+
+
+def test_brute_force_index_replace_and_remove():
+    index = BruteForceIndex(2)
+    index.add(1, normalize([1, 0]))
+    index.add(2, normalize([0, 1]))
+    index.add(3, normalize([1, 1]))
+
+    index.add(1, normalize([0, 1]))
+    index.remove(2)
+    index.remove(4)
+    found_ids, _ = index.search(normalize([0, 1]), 1)
+
+    assert len(index) == 2
+    assert 2 not in index.positions
+    assert found_ids.tolist() == [1]
+
+
+def test_ivf_index_all_probes_exact(ids, vectors):
+    flat = BruteForceIndex(DIMENSION, ids, vectors)
+    ivf = train_ivf(
+        ids, vectors, n_lists=CLUSTERS_COUNT, n_probe=CLUSTERS_COUNT,
+    )
+
+    for query in vectors[:QUERIES_COUNT]:
+        ivf_ids, _ = ivf.search(query, 5)
+        flat_ids, _ = flat.search(query, 5)
+        assert ivf_ids.tolist() == flat_ids.tolist()
+
+
+def test_ivf_index_update(ids, vectors):
+    ivf = train_ivf(ids, vectors, n_lists=CLUSTERS_COUNT, n_probe=1)
+    user_id = int(ids[0])
+
+    ivf.add(user_id, -vectors[0])
+    ivf.add(1, vectors[1])
+    ivf.remove(int(ids[2]))
+    found_ids, _ = ivf.search(-vectors[0], 1)
+
+    assert len(ivf) == POINTS_COUNT
+    assert found_ids.tolist() == [user_id]
+    assert sum(user_id in lst.positions for lst in ivf.lists) == 1
+
+
+@pytest.mark.parametrize('ivf_threshold, kind', [
+    pytest.param(1000, 'flat', id='small'),
+    pytest.param(100, 'ivf', id='large'),
+])
+def test_build_index(ids, vectors, ivf_threshold, kind):
+    index = build_index(ids, vectors * 3, ivf_threshold, ivf_probes=2)
+
+    found_ids, _ = index.search(vectors[0], 1)
+
+    assert index.kind == kind
+    assert len(index) == POINTS_COUNT
+    assert found_ids.tolist() == [0]
+
+
+@pytest.mark.parametrize('ivf_threshold', [
+    pytest.param(1000, id='flat'),
+    pytest.param(100, id='ivf'),
+])
+def test_save_and_load_index(ids, vectors, ivf_threshold, tmp_path):
+    index = build_index(ids, vectors, ivf_threshold, ivf_probes=2)
+    path = tmp_path / 'index'
+    save_index(index, path)
+    save_index(index, path)
+
+    loaded = load_index(path)
+
+    assert loaded.kind == index.kind
+    assert isinstance(loaded.vectors, np.ndarray)
+    for query in vectors[:QUERIES_COUNT]:
+        loaded_ids, _ = loaded.search(query, 3)
+        ids, _ = index.search(query, 3)
+        assert loaded_ids.tolist() == ids.tolist()
+
+
+def test_loaded_index_is_memory_mapped(ids, vectors, tmp_path):
+    path = tmp_path / 'index'
+    save_index(build_index(ids, vectors, ivf_threshold=1000), path)
+
+    loaded = load_index(path)
+    loaded.add(1, vectors[1])
+    loaded.add(int(ids[0]), vectors[1])
+
+    assert isinstance(load_index(path).vectors, np.memmap)
+    assert not isinstance(loaded.vectors, np.memmap)
+    assert len(loaded) == POINTS_COUNT + 1
+    assert len(load_index(path)) == POINTS_COUNT